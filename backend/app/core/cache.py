@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import time
+import logging
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+class TwoTierCache:
+    """In-process LRU in front of a MongoDB collection with a TTL index.
+
+    The MongoDB tier is shared by all workers and survives restarts. Values
+    must be BSON-serializable. MongoDB errors are logged and treated as misses
+    so the cache never fails a request.
+    """
+
+    def __init__(self, collection_name: str, max_size: int, ttl: float):
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self.memory = TTLCache(max_size, ttl)
+        self._stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    def _collection(self):
+        if db.database is None:
+            return None
+        return db.database[self.collection_name]
+
+    async def ensure_indexes(self):
+        """Let MongoDB expire entries on their own"""
+        collection = self._collection()
+        if collection is not None:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None:
+            self._stats["memory_hits"] += 1
+            return value
+
+        doc = None
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Cache read error ({self.collection_name}): {e}")
+
+        if not doc:
+            self._stats["misses"] += 1
+            return None
+
+        # Keep the memory copy no longer than the shared one
+        remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+        self.memory.set(key, doc["value"], ttl=min(self.ttl, remaining))
+        self._stats["mongo_hits"] += 1
+        return doc["value"]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        self._stats["writes"] += 1
+
+        collection = self._collection()
+        if collection is None:
+            return
+        try:
+            now = datetime.utcnow()
+            await collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "expires_at": now + timedelta(seconds=ttl), "updated_at": now}},
+                upsert=True
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Cache write error ({self.collection_name}): {e}")
+
+    async def delete(self, key: str):
+        self.memory.delete(key)
+        collection = self._collection()
+        if collection is not None:
+            try:
+                await collection.delete_one({"_id": key})
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Cache delete error ({self.collection_name}): {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["memory_hits"] + self._stats["mongo_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["mongo_hits"]
+        return {
+            **self._stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": self.memory.get_stats()
+        }
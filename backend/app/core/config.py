@@ -27,14 +27,111 @@ class Settings(BaseSettings):
     IBM_API_KEY: str = os.getenv("IBM_API_KEY", "")
     IBM_PROJECT_ID: str = os.getenv("IBM_PROJECT_ID", "")
     IBM_API_URL: str = os.getenv("IBM_API_URL", "https://us-south.ml.cloud.ibm.com")
+    # Refresh the IAM token this many seconds before expiry (blocking) and
+    # start a background refresh once it is within the larger window
+    IBM_TOKEN_REFRESH_MARGIN_SECONDS: int = int(os.getenv("IBM_TOKEN_REFRESH_MARGIN_SECONDS", 60))
+    IBM_TOKEN_BACKGROUND_REFRESH_SECONDS: int = int(os.getenv("IBM_TOKEN_BACKGROUND_REFRESH_SECONDS", 600))
+    
+    # Granite response cache (in-process LRU in front of MongoDB)
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    
+    # Granite circuit breaker and concurrency limit
+    GRANITE_BREAKER_FAILURE_RATE: float = float(os.getenv("GRANITE_BREAKER_FAILURE_RATE", 0.5))
+    GRANITE_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("GRANITE_BREAKER_SLOW_CALL_SECONDS", 10))
+    GRANITE_BREAKER_OPEN_SECONDS: float = float(os.getenv("GRANITE_BREAKER_OPEN_SECONDS", 30))
+    GRANITE_MAX_CONCURRENT: int = int(os.getenv("GRANITE_MAX_CONCURRENT", 20))
+    # Streams hold their slot until the last token, so they get their own limit
+    GRANITE_MAX_CONCURRENT_STREAMS: int = int(os.getenv("GRANITE_MAX_CONCURRENT_STREAMS", 20))
+    GRANITE_MAX_QUEUE: int = int(os.getenv("GRANITE_MAX_QUEUE", 100))
+    GRANITE_QUEUE_WAIT_SECONDS: float = float(os.getenv("GRANITE_QUEUE_WAIT_SECONDS", 2))
+    
+    # Questions matching a local advisory with at least this confidence (0-1)
+    # are answered without calling the LLM
+    KB_DIRECT_ANSWER_CONFIDENCE: float = float(os.getenv("KB_DIRECT_ANSWER_CONFIDENCE", 0.75))
+    # When the LLM is unavailable, the best advisory is only offered from this
+    # confidence up; weaker matches get the generic fallback message
+    KB_FALLBACK_MIN_CONFIDENCE: float = float(os.getenv("KB_FALLBACK_MIN_CONFIDENCE", 0.45))
+    
+    # How Malayalam turns are answered: "translate" (ml->en, LLM, en->ml) or
+    # "native" (LLM prompted to answer in Malayalam directly)
+    CHAT_PIPELINE_MODE: str = os.getenv("CHAT_PIPELINE_MODE", "translate")
+    
+    # Chat answers the LLM cannot deliver within this budget get a provisional
+    # fallback answer that is upgraded in the background
+    CHAT_LATENCY_BUDGET_SECONDS: float = float(os.getenv("CHAT_LATENCY_BUDGET_SECONDS", 3))
     
     # Amazon Translate
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
+    TRANSLATE_MAX_WORKERS: int = int(os.getenv("TRANSLATE_MAX_WORKERS", 16))
+    TRANSLATE_MAX_QUEUE: int = int(os.getenv("TRANSLATE_MAX_QUEUE", 200))
+    TRANSLATE_QUEUE_WAIT_SECONDS: float = float(os.getenv("TRANSLATE_QUEUE_WAIT_SECONDS", 5))
+    # Below this confidence (0-1) the offline detector defers to AWS Comprehend
+    LANGUAGE_DETECTION_MIN_CONFIDENCE: float = float(os.getenv("LANGUAGE_DETECTION_MIN_CONFIDENCE", 0.7))
+    TRANSLATION_CACHE_MAX_ENTRIES: int = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", 10000))
+    TRANSLATION_CACHE_TTL_SECONDS: int = int(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", 30 * 24 * 3600))
     
     # Weather API
     WEATHER_API_KEY: str = os.getenv("WEATHER_API_KEY", "")
+    # Coordinates are snapped to a grid of this many degrees (0.05 is ~5.5 km)
+    # so nearby farms share cached weather
+    WEATHER_GRID_DEGREES: float = float(os.getenv("WEATHER_GRID_DEGREES", 0.05))
+    WEATHER_CURRENT_TTL_SECONDS: int = int(os.getenv("WEATHER_CURRENT_TTL_SECONDS", 600))
+    WEATHER_FORECAST_TTL_SECONDS: int = int(os.getenv("WEATHER_FORECAST_TTL_SECONDS", 3600))
+    WEATHER_CACHE_MAX_ENTRIES: int = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", 5000))
+    # Background refresh of every active farm location; the rate stays below
+    # the OpenWeatherMap quota to leave room for live traffic
+    WEATHER_PREFETCH_ENABLED: bool = os.getenv("WEATHER_PREFETCH_ENABLED", "true").lower() == "true"
+    WEATHER_PREFETCH_INTERVAL_SECONDS: int = int(os.getenv("WEATHER_PREFETCH_INTERVAL_SECONDS", 1800))
+    WEATHER_PREFETCH_CONCURRENCY: int = int(os.getenv("WEATHER_PREFETCH_CONCURRENCY", 5))
+    WEATHER_PREFETCH_RATE_PER_MINUTE: float = float(os.getenv("WEATHER_PREFETCH_RATE_PER_MINUTE", 45))
+    # Oldest prefetched forecast still served; prefetched current conditions
+    # are only served within WEATHER_CURRENT_TTL_SECONDS
+    WEATHER_SNAPSHOT_MAX_AGE_SECONDS: int = int(os.getenv("WEATHER_SNAPSHOT_MAX_AGE_SECONDS", 3 * 3600))
+    # Scheduled weather alert rules over all active farms
+    ALERT_ENGINE_ENABLED: bool = os.getenv("ALERT_ENGINE_ENABLED", "true").lower() == "true"
+    ALERT_ENGINE_INTERVAL_SECONDS: int = int(os.getenv("ALERT_ENGINE_INTERVAL_SECONDS", 6 * 3600))
+    ALERT_ENGINE_WRITE_BATCH: int = int(os.getenv("ALERT_ENGINE_WRITE_BATCH", 1000))
+    
+    # Expired and deleted alerts move to alerts_archive; the TTL index on
+    # expires_at removes anything the archiver misses after the grace period
+    ALERT_ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("ALERT_ARCHIVE_INTERVAL_SECONDS", 900))
+    ALERT_ARCHIVE_BATCH: int = int(os.getenv("ALERT_ARCHIVE_BATCH", 1000))
+    ALERT_EXPIRY_GRACE_SECONDS: int = int(os.getenv("ALERT_EXPIRY_GRACE_SECONDS", 24 * 3600))
+    ALERT_ARCHIVE_RETENTION_DAYS: int = int(os.getenv("ALERT_ARCHIVE_RETENTION_DAYS", 365))
+    # Recount of the per-user alert counters, run by the archiver
+    ALERT_COUNTER_RECONCILE_SECONDS: int = int(os.getenv("ALERT_COUNTER_RECONCILE_SECONDS", 3600))
+    
+    # Alert push channel: "local" hooks reach clients on the same worker;
+    # "change_stream" watches MongoDB (replica set required) to reach all of them
+    ALERT_EVENTS_SOURCE: str = os.getenv("ALERT_EVENTS_SOURCE", "local")
+    ALERT_STREAM_QUEUE_SIZE: int = int(os.getenv("ALERT_STREAM_QUEUE_SIZE", 100))
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("ALERT_STREAM_HEARTBEAT_SECONDS", 15))
+    
+    # Full recount interval for the admin analytics snapshot
+    ANALYTICS_REFRESH_SECONDS: int = int(os.getenv("ANALYTICS_REFRESH_SECONDS", 900))
+    
+    # Admin role lookups cached per worker; role changes invalidate this worker's
+    # entry at once and other workers' entries within the TTL, so it is capped
+    ADMIN_ROLE_CACHE_TTL_SECONDS: float = min(float(os.getenv("ADMIN_ROLE_CACHE_TTL_SECONDS", 30)), 60)
+    ADMIN_ROLE_CACHE_SIZE: int = int(os.getenv("ADMIN_ROLE_CACHE_SIZE", 1000))
+    
+    # Admin bulk export: documents per cursor batch and bytes per streamed chunk
+    ADMIN_EXPORT_BATCH_SIZE: int = int(os.getenv("ADMIN_EXPORT_BATCH_SIZE", 1000))
+    ADMIN_EXPORT_CHUNK_BYTES: int = int(os.getenv("ADMIN_EXPORT_CHUNK_BYTES", 64 * 1024))
+    
+    # Batch forecast endpoint limits
+    WEATHER_BATCH_MAX_LOCATIONS: int = int(os.getenv("WEATHER_BATCH_MAX_LOCATIONS", 1000))
+    WEATHER_BATCH_CONCURRENCY: int = int(os.getenv("WEATHER_BATCH_CONCURRENCY", 20))
+    
+    # Outbound HTTP client pools
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", 30))
+    IBM_IAM_MAX_CONNECTIONS: int = int(os.getenv("IBM_IAM_MAX_CONNECTIONS", 5))
+    IBM_GRANITE_MAX_CONNECTIONS: int = int(os.getenv("IBM_GRANITE_MAX_CONNECTIONS", 50))
+    WEATHER_MAX_CONNECTIONS: int = int(os.getenv("WEATHER_MAX_CONNECTIONS", 20))
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,27 @@
+from collections import deque
+from typing import Dict, Any
+
+class LatencyStats:
+    """Rolling window of latency samples in milliseconds"""
+
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, ms: float):
+        self._samples.append(ms)
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return count and percentiles over the current window"""
+        if not self._samples:
+            return {"count": self.count, "avg_ms": 0, "p50_ms": 0, "p95_ms": 0, "max_ms": 0}
+
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(samples) / len(samples), 1),
+            "p50_ms": round(samples[len(samples) // 2], 1),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            "max_ms": round(samples[-1], 1)
+        }
@@ -0,0 +1,214 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QueueTimeoutError(Exception):
+    """Raised when a call waited too long for a concurrency slot"""
+
+class CircuitBreaker:
+    """Trip on a high failure or slow-call rate over the last N calls.
+
+    While open, callers are told to skip the upstream. After the cool-down a
+    limited number of probe calls are let through (half-open); a healthy probe
+    closes the circuit and a failed or slow one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self._calls = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._stats = {"successes": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    def is_open(self) -> bool:
+        """True while the circuit is open and the cool-down has not elapsed"""
+        return self.state == self.OPEN and time.monotonic() < self._opened_at + self.open_seconds
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go to the upstream, reserving a probe slot if half-open"""
+        if self.state == self.OPEN:
+            if time.monotonic() < self._opened_at + self.open_seconds:
+                self._stats["rejected"] += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) must not wedge the circuit
+            if time.monotonic() >= self._opened_at + 2 * self.open_seconds:
+                self._half_open_calls = 0
+                self._opened_at = time.monotonic() - self.open_seconds
+            if self._half_open_calls >= self.half_open_max_calls:
+                self._stats["rejected"] += 1
+                return False
+            self._half_open_calls += 1
+
+        return True
+
+    def record_success(self, duration: float):
+        self._record(False, duration)
+
+    def record_failure(self, duration: float):
+        self._record(True, duration)
+
+    def _record(self, failed: bool, duration: float):
+        slow = duration >= self.slow_call_seconds
+        self._stats["failures" if failed else "successes"] += 1
+        if slow:
+            self._stats["slow_calls"] += 1
+
+        if self.state == self.HALF_OPEN:
+            if failed or slow:
+                self._open()
+            else:
+                self.state = self.CLOSED
+                self._calls.clear()
+                logger.info(f"Circuit '{self.name}' closed")
+            return
+
+        self._calls.append((failed, slow))
+        if len(self._calls) < self.min_calls:
+            return
+
+        failure_rate = sum(1 for f, _ in self._calls if f) / len(self._calls)
+        slow_rate = sum(1 for _, s in self._calls if s) / len(self._calls)
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self._stats["opened"] += 1
+        logger.warning(f"Circuit '{self.name}' opened")
+
+    def get_stats(self) -> Dict[str, Any]:
+        retry_in = 0
+        if self.state == self.OPEN:
+            retry_in = max(0, round(self._opened_at + self.open_seconds - time.monotonic(), 1))
+        return {**self._stats, "state": self.state, "retry_in": retry_in}
+
+class ConcurrencyLimiter:
+    """Bound in-flight calls; callers queue for a slot up to a wait timeout"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_queue_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._in_flight = 0
+        self._stats = {"acquired": 0, "rejected": 0, "timed_out": 0}
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise QueueTimeoutError(f"'{self.name}' queue is full")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise QueueTimeoutError(f"Timed out waiting for a '{self.name}' slot")
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._stats["acquired"] += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "max_concurrent": self.max_concurrent
+        }
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight call.
+
+    Waiters share the result or the exception. The shared call is shielded,
+    so a cancelled waiter does not cancel it for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(fn())
+        self._in_flight[key] = future
+        self._stats["calls"] += 1
+
+        def _done(f: asyncio.Future):
+            self._in_flight.pop(key, None)
+            if not f.cancelled():
+                f.exception()  # mark retrieved in case every waiter went away
+
+        future.add_done_callback(_done)
+        return await asyncio.shield(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._in_flight)}
+
+class RateLimiter:
+    """Space calls evenly to stay under an upstream's per-minute quota"""
+
+    def __init__(self, name: str, per_minute: float):
+        self.name = name
+        self.interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._stats = {"calls": 0, "delayed": 0}
+
+    async def wait(self):
+        now = time.monotonic()
+        delay = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        self._stats["calls"] += 1
+        if delay > 0:
+            self._stats["delayed"] += 1
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "per_minute": round(60.0 / self.interval, 1)}
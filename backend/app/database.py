@@ -1,5 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timedelta
 from app.core.config import settings
+from app.models.alert import PRIORITY_RANK
+from app.services import scheme_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,4 +33,76 @@ async def close_mongo_connection():
     """Close database connection"""
     if db.client:
         db.client.close()
-        logger.info("📊 Disconnected from MongoDB")
\ No newline at end of file
+        logger.info("📊 Disconnected from MongoDB")
+
+async def ensure_indexes():
+    """Create the indexes the alert and admin queries rely on"""
+    database = db.database
+    
+    # Alert listing only touches active alerts, so index just those: the index
+    # stays the size of the live set however much history accumulates. The
+    # keys match the listing sort, _id included for the page cursor.
+    await database.alerts.create_index(
+        [("user_id", 1), ("priority_rank", 1), ("created_at", -1), ("_id", -1)],
+        name="active_alerts_by_user",
+        partialFilterExpression={"is_active": True}
+    )
+    await _backfill_priority_rank(database)
+    
+    # Expired alerts are archived by the alert archiver; the TTL index removes
+    # any it missed once the grace period has passed
+    await _backfill_expires_at(database)
+    await database.alerts.create_index(
+        "expires_at", name="alert_expiry", expireAfterSeconds=settings.ALERT_EXPIRY_GRACE_SECONDS
+    )
+    # Generated alerts are upserted by content fingerprint, once per window
+    await database.alerts.create_index(
+        "fingerprint", name="alert_fingerprint", unique=True,
+        partialFilterExpression={"fingerprint": {"$exists": True}}
+    )
+    await database.broadcast_alerts.create_index(
+        "fingerprint", unique=True, partialFilterExpression={"fingerprint": {"$exists": True}}
+    )
+    await database.alerts_archive.create_index(
+        "archived_at", expireAfterSeconds=settings.ALERT_ARCHIVE_RETENTION_DAYS * 24 * 3600
+    )
+    
+    # Broadcast alerts are matched on their targeting predicate at read time
+    await database.broadcast_alerts.create_index([
+        ("is_active", 1), ("target.district", 1), ("target.crop", 1), ("target.soil_type", 1), ("created_at", -1)
+    ])
+    await database.broadcast_alerts.create_index(
+        "expires_at", expireAfterSeconds=settings.ALERT_EXPIRY_GRACE_SECONDS
+    )
+    # One read/dismiss state per user and broadcast, dropped once long unused
+    await database.alert_states.create_index([("user_id", 1), ("alert_id", 1)], unique=True)
+    await database.alert_states.create_index(
+        "updated_at", expireAfterSeconds=settings.ALERT_ARCHIVE_RETENTION_DAYS * 24 * 3600
+    )
+    
+    # Per-farmer lookups batched by the admin farmers overview
+    await database.farms.create_index([("user_id", 1), ("is_active", 1)])
+    await database.activities.create_index([("user_id", 1), ("is_deleted", 1), ("created_at", -1)])
+    await database.scheme_applications.create_index("user_id")
+    
+    # Scheme trend and status counters, one document per (scheme, month, status)
+    await database.scheme_application_stats.create_index(
+        [("scheme_id", 1), ("month", 1), ("status", 1)], unique=True
+    )
+    await scheme_stats.backfill(database)
+    logger.info("📊 MongoDB indexes ensured")
+
+async def _backfill_priority_rank(database):
+    """Give alerts stored before priority_rank existed their rank"""
+    for priority, rank in PRIORITY_RANK.items():
+        await database.alerts.update_many(
+            {"priority": priority, "priority_rank": {"$exists": False}},
+            {"$set": {"priority_rank": rank}}
+        )
+
+async def _backfill_expires_at(database):
+    """Give alerts stored without an expiry the model's default 7 days"""
+    await database.alerts.update_many(
+        {"expires_at": {"$exists": False}},
+        {"$set": {"expires_at": datetime.utcnow() + timedelta(days=7)}}
+    )
@@ -8,10 +8,20 @@ from slowapi.errors import RateLimitExceeded
 import os
 from dotenv import load_dotenv
 
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes
 from app.routers import farm, chat, alerts, weather, auth, schemes, market, admin
 from app.middleware.auth import get_current_user_id
 from app.core.config import settings
+from app.services.llm_service import granite_service
+from app.services.http_client import http_clients
+from app.services.knowledge_base import knowledge_base
+from app.services.translation_service import translation_service
+from app.services.weather_service import weather_service
+from app.services.weather_prefetch import weather_prefetcher
+from app.services.alert_engine import alert_engine
+from app.services.alert_archiver import alert_archiver
+from app.services.alert_events import alert_events
+from app.services.analytics import analytics_snapshot
 
 load_dotenv()
 
@@ -49,9 +59,29 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    await ensure_indexes()
+    await http_clients.start()
+    await granite_service.response_cache.ensure_indexes()
+    await translation_service.cache.ensure_indexes()
+    await weather_service.ensure_indexes()
+    knowledge_base.build()
+    if settings.WEATHER_PREFETCH_ENABLED:
+        weather_prefetcher.start()
+    if settings.ALERT_ENGINE_ENABLED:
+        alert_engine.start()
+    alert_archiver.start()
+    alert_events.start()
+    analytics_snapshot.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await weather_prefetcher.stop()
+    await alert_engine.stop()
+    await alert_archiver.stop()
+    await alert_events.stop()
+    await analytics_snapshot.stop()
+    await http_clients.close()
+    translation_service.close()
     await close_mongo_connection()
 
 # Health check
@@ -63,6 +93,41 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+# Service metrics
+@app.get("/metrics")
+async def service_metrics():
+    return {
+        "llm": {
+            "iam_token": granite_service.token_manager.get_stats(),
+            "response_cache": granite_service.response_cache.get_stats(),
+            "circuit_breaker": granite_service.circuit_breaker.get_stats(),
+            "concurrency": granite_service.limiter.get_stats(),
+            "stream_concurrency": granite_service.stream_limiter.get_stats(),
+            "retrieval": granite_service.retrieval_stats
+        },
+        "knowledge_base": knowledge_base.get_stats(),
+        "translation": {
+            "cache": translation_service.cache.get_stats(),
+            "executor": translation_service.limiter.get_stats(),
+            "language_detection": translation_service.detection_stats
+        },
+        "weather": {**weather_service.get_stats(), "prefetch": weather_prefetcher.get_stats()},
+        "alert_engine": alert_engine.get_stats(),
+        "alert_archiver": alert_archiver.get_stats(),
+        "alert_events": alert_events.get_stats(),
+        "analytics_snapshot": analytics_snapshot.get_stats(),
+        "admin_role_cache": admin.role_cache.get_stats(),
+        "chat_hedging": chat.hedge_metrics,
+        "chat_pipelines": {
+            name: {**{k: v for k, v in stats.items() if k != "latency"}, "latency": stats["latency"].snapshot()}
+            for name, stats in chat.pipeline_metrics.items()
+        },
+        "chat_stream": {
+            name: stats.snapshot() for name, stats in chat.stream_metrics.items()
+        },
+        "http_clients": http_clients.get_stats()
+    }
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(farm.router, prefix="/api/farm", tags=["farm"])
@@ -18,6 +18,9 @@ class PyObjectId(ObjectId):
     def __modify_schema__(cls, field_schema):
         field_schema.update(type="string")
 
+# Stored as priority_rank so alerts sort high -> medium -> low
+PRIORITY_RANK = {"high": 1, "medium": 2, "low": 3}
+
 class AlertBase(BaseModel):
     type: str = Field(..., regex="^(weather|price|scheme|irrigation|pest|fertilizer|harvest)$")
     priority: str = Field(..., regex="^(high|medium|low)$")
@@ -40,4 +43,25 @@ class Alert(AlertBase):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+        json_encoders = {ObjectId: str}
+
+class BroadcastAlertCreate(AlertBase):
+    # Targeting predicate; an unset field matches every farmer
+    district: Optional[str] = Field(None, min_length=1, max_length=100)
+    target_crop: Optional[str] = Field(None, regex="^(paddy|coconut|rubber|banana|brinjal|pepper|cardamom|ginger|turmeric)$")
+    target_soil_type: Optional[str] = Field(None, regex="^(laterite|alluvial|coastal|forest)$")
+    expires_in_days: int = Field(7, ge=1, le=90)
+
+class BroadcastAlert(AlertBase):
+    """A single alert shown to every farmer matching `target`"""
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    target: dict = {}
+    created_by: str
+    is_active: bool = True
+    expires_at: datetime = Field(default_factory=lambda: datetime.utcnow() + timedelta(days=7))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
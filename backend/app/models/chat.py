@@ -31,6 +31,10 @@ class MessageCreate(MessageBase):
 class Message(MessageBase):
     id: str = Field(default_factory=lambda: str(ObjectId()))
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Set on a quick fallback answer that is replaced once the LLM answer arrives
+    is_provisional: bool = False
+    # Set on a streamed answer that was cut off by an error or a disconnect
+    is_incomplete: bool = False
 
 class ChatSessionBase(BaseModel):
     session_id: str
@@ -54,9 +58,11 @@ class ChatSession(ChatSessionBase):
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=2000)
     session_id: Optional[str] = None
-    language: str = Field(default="en", regex="^(en|ml)$")
+    language: str = Field(default="en", regex="^(en|ml|auto)$")
     has_image: bool = False
     image_url: Optional[str] = None
+    latency_budget: Optional[float] = Field(None, gt=0, le=30)
+    pipeline: Optional[str] = Field(None, regex="^(translate|native)$")
 
 class ChatResponse(BaseModel):
     user_message: Message
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class WeatherLocation(BaseModel):
+    location: Optional[str] = Field(None, min_length=1, max_length=100)
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+
+class WeatherBatchRequest(BaseModel):
+    locations: List[WeatherLocation]
+    days: int = Field(5, ge=1, le=5)
@@ -1,23 +1,77 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Path, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.database import get_database
 from app.middleware.auth import get_current_user_id
+from app.models.alert import BroadcastAlertCreate, PRIORITY_RANK
+from app.services.alert_events import alert_events
+from app.services.alert_engine import alert_fingerprint
+from app.services.analytics import analytics_snapshot, bucket
+from app.services import admin_export, scheme_stats
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
+import asyncio
 import logging
 import time
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+# Roles behind verify_admin_access, so dashboard fan-out calls do not re-read
+# the same user on every request. Only the role is kept, never the profile.
+role_cache = TTLCache(settings.ADMIN_ROLE_CACHE_SIZE, settings.ADMIN_ROLE_CACHE_TTL_SECONDS)
+
+def invalidate_admin_role(user_id: str):
+    """Drop a user's cached role after it changes"""
+    role_cache.delete(user_id)
+
 async def verify_admin_access(user_id: str = Depends(get_current_user_id), db = Depends(get_database)):
     """Verify that the current user has admin access"""
-    user = await db.users.find_one({"mobile": user_id})
-    if not user or user.get("role") != "admin":
+    cached = role_cache.get(user_id)
+    if cached is None:
+        user = await db.users.find_one({"mobile": user_id}, {"role": 1})
+        if user:
+            cached = {"role": user.get("role")}
+            role_cache.set(user_id, cached)
+    if not cached or cached["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    return user
+    return {"mobile": user_id, "role": cached["role"]}
+
+def _days_since(value) -> float:
+    """Days elapsed since a datetime or a Unix timestamp"""
+    if isinstance(value, datetime):
+        return (datetime.utcnow() - value).total_seconds() / 86400
+    return (time.time() - value) / 86400
+
+async def _farms_by_user(db, user_ids: List[str]) -> dict:
+    """Active farm per user, in one $in query"""
+    farms = {}
+    async for farm in db.farms.find({"user_id": {"$in": user_ids}, "is_active": True}):
+        farms.setdefault(farm["user_id"], farm)
+    return farms
+
+async def _activity_stats_by_user(db, user_ids: List[str]) -> dict:
+    """Activity count and latest activity time per user, in one aggregation"""
+    pipeline = [
+        {"$match": {"user_id": {"$in": user_ids}, "is_deleted": False}},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}, "last_activity": {"$max": "$created_at"}}}
+    ]
+    stats = await db.activities.aggregate(pipeline).to_list(length=len(user_ids))
+    return {item["_id"]: item for item in stats}
+
+async def _scheme_counts_by_user(db, user_ids: List[str]) -> dict:
+    """Scheme application count per user, in one aggregation"""
+    pipeline = [
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+    ]
+    counts = await db.scheme_applications.aggregate(pipeline).to_list(length=len(user_ids))
+    return {item["_id"]: item["count"] for item in counts}
 
 @router.get("/farmers")
 @limiter.limit("30/minute")
@@ -41,38 +95,26 @@ async def get_farmers_overview(
         if status:
             query["status"] = status
         
-        # Get farmers with their farm data
+        # Get farmers, then their farm, activity and scheme data in one batch of queries
         farmers = await db.users.find(query).skip(skip).limit(limit).to_list(length=limit)
+        farmer_ids = [farmer.get("mobile", str(farmer["_id"])) for farmer in farmers]
+        
+        farms, activity_stats, scheme_counts, total = await asyncio.gather(
+            _farms_by_user(db, farmer_ids),
+            _activity_stats_by_user(db, farmer_ids),
+            _scheme_counts_by_user(db, farmer_ids),
+            db.users.count_documents(query)
+        )
         
         # Enrich with farm and activity data
         enriched_farmers = []
-        for farmer in farmers:
-            farmer_id = farmer.get("mobile", str(farmer["_id"]))
-            
-            # Get farm data
-            farm = await db.farms.find_one({"user_id": farmer_id, "is_active": True})
-            
-            # Get activity count
-            activities_count = await db.activities.count_documents({
-                "user_id": farmer_id,
-                "is_deleted": False
-            })
-            
-            # Get scheme applications count
-            schemes_count = await db.scheme_applications.count_documents({
-                "user_id": farmer_id
-            })
+        for farmer, farmer_id in zip(farmers, farmer_ids):
+            farm = farms.get(farmer_id)
+            activity = activity_stats.get(farmer_id, {})
+            last_activity = activity.get("last_activity")
             
             # Determine status based on last activity
-            last_activity = await db.activities.find_one(
-                {"user_id": farmer_id, "is_deleted": False},
-                sort=[("created_at", -1)]
-            )
-            
-            days_since_activity = 999
-            if last_activity:
-                days_since_activity = (time.time() - last_activity.get("created_at", 0)) / 86400
-            
+            days_since_activity = _days_since(last_activity) if last_activity else 999
             status = "active" if days_since_activity <= 7 else "inactive"
             
             enriched_farmer = {
@@ -91,14 +133,12 @@ async def get_farmers_overview(
                     "soil_type": farm.get("soil_type") if farm else None,
                     "location": farm.get("location") if farm else None
                 },
-                "activities_count": activities_count,
-                "schemes_applied": schemes_count,
-                "last_activity": last_activity.get("created_at") if last_activity else None
+                "activities_count": activity.get("count", 0),
+                "schemes_applied": scheme_counts.get(farmer_id, 0),
+                "last_activity": last_activity
             }
             enriched_farmers.append(enriched_farmer)
         
-        total = await db.users.count_documents(query)
-        
         return {
             "success": True,
             "data": enriched_farmers,
@@ -115,6 +155,29 @@ async def get_farmers_overview(
         logger.error(f"Get farmers overview error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.get("/export/{dataset}")
+@limiter.limit("5/minute")
+async def export_data(
+    request: Request,
+    dataset: str = Path(..., regex="^(farmers|activities|applications)$"),
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    gzip: bool = Query(True),
+    admin_user = Depends(verify_admin_access),
+    db = Depends(get_database)
+):
+    """Stream a full extract of farmers, activities or scheme applications"""
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d}.{format}" + (".gz" if gzip else "")
+    if gzip:
+        media_type = "application/gzip"
+    else:
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    
+    return StreamingResponse(
+        admin_export.stream(db, dataset, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/analytics")
 @limiter.limit("30/minute")
 async def get_admin_analytics(
@@ -124,59 +187,37 @@ async def get_admin_analytics(
 ):
     """Get analytics data for admin dashboard"""
     try:
-        # Total farmers
-        total_farmers = await db.users.count_documents({"role": "farmer"})
-        
-        # Active farmers (logged in within last 30 days)
-        thirty_days_ago = time.time() - (30 * 24 * 60 * 60)
-        active_farmers = await db.users.count_documents({
-            "role": "farmer",
-            "last_login": {"$gte": thirty_days_ago}
-        })
-        
-        # Total land area
-        pipeline = [
-            {"$match": {"is_active": True}},
-            {"$group": {"_id": None, "total_land": {"$sum": "$land_size"}}}
-        ]
-        land_result = await db.farms.aggregate(pipeline).to_list(length=1)
-        total_land_area = land_result[0]["total_land"] if land_result else 0
+        # Maintained by write-time counters and a periodic recount
+        snapshot = await analytics_snapshot.get()
+        total_farmers = snapshot["total_farmers"]
         
         # Average activities per farmer
-        total_activities = await db.activities.count_documents({"is_deleted": False})
-        avg_activities = total_activities / total_farmers if total_farmers > 0 else 0
+        avg_activities = snapshot["total_activities"] / total_farmers if total_farmers > 0 else 0
         
         # Scheme utilization
-        total_applications = await db.scheme_applications.count_documents({})
-        approved_applications = await db.scheme_applications.count_documents({"status": "approved"})
-        scheme_utilization = (approved_applications / total_applications * 100) if total_applications > 0 else 0
+        total_applications = snapshot["total_applications"]
+        scheme_utilization = (snapshot["approved_applications"] / total_applications * 100) if total_applications > 0 else 0
         
         # Alert response rate (mock calculation)
         alert_response_rate = 72  # Mock value
         
-        # District-wise distribution
-        district_pipeline = [
-            {"$match": {"role": "farmer"}},
-            {"$group": {"_id": "$district", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        district_data = await db.users.aggregate(district_pipeline).to_list(length=20)
-        
-        # Crop distribution
-        crop_pipeline = [
-            {"$match": {"is_active": True}},
-            {"$group": {"_id": "$current_crop", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        crop_data = await db.farms.aggregate(crop_pipeline).to_list(length=20)
+        # District-wise and crop distribution, largest first
+        district_data = [
+            {"_id": district, "count": count}
+            for district, count in sorted(snapshot["by_district"].items(), key=lambda item: -item[1]) if count > 0
+        ][:20]
+        crop_data = [
+            {"_id": crop, "count": count}
+            for crop, count in sorted(snapshot["by_crop"].items(), key=lambda item: -item[1]) if count > 0
+        ][:20]
         
         return {
             "success": True,
             "data": {
                 "overview": {
                     "total_farmers": total_farmers,
-                    "active_farmers": active_farmers,
-                    "total_land_area": round(total_land_area, 2),
+                    "active_farmers": snapshot["active_farmers"],
+                    "total_land_area": round(snapshot["total_land_area"], 2),
                     "average_activities_per_farmer": round(avg_activities, 1),
                     "scheme_utilization": round(scheme_utilization, 1),
                     "alert_response_rate": alert_response_rate
@@ -184,7 +225,9 @@ async def get_admin_analytics(
                 "distributions": {
                     "by_district": district_data,
                     "by_crop": crop_data
-                }
+                },
+                "refreshed_at": snapshot["refreshed_at"],
+                "updated_at": snapshot["updated_at"]
             }
         }
     except HTTPException:
@@ -202,39 +245,41 @@ async def get_schemes_analytics(
 ):
     """Get government schemes analytics"""
     try:
-        # Scheme-wise applications
+        # Both views read the per-(scheme, month, status) counters, not the applications
         scheme_pipeline = [
             {"$group": {
                 "_id": "$scheme_id",
-                "total_applications": {"$sum": 1},
-                "approved": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, 1, 0]}},
-                "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
-                "rejected": {"$sum": {"$cond": [{"$eq": ["$status", "rejected"]}, 1, 0]}}
+                "total_applications": {"$sum": "$count"},
+                "approved": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, "$count", 0]}},
+                "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, "$count", 0]}},
+                "rejected": {"$sum": {"$cond": [{"$eq": ["$status", "rejected"]}, "$count", 0]}}
             }},
-            {"$sort": {"total_applications": -1}}
+            {"$sort": {"total_applications": -1}},
+            {"$limit": 20}
         ]
         
-        scheme_stats = await db.scheme_applications.aggregate(scheme_pipeline).to_list(length=20)
-        
-        # Monthly application trends
         monthly_pipeline = [
-            {"$group": {
-                "_id": {
-                    "year": {"$year": {"$dateFromString": {"dateString": {"$toString": "$applied_date"}}}},
-                    "month": {"$month": {"$dateFromString": {"dateString": {"$toString": "$applied_date"}}}}
-                },
-                "applications": {"$sum": 1}
-            }},
-            {"$sort": {"_id.year": -1, "_id.month": -1}},
+            {"$group": {"_id": "$month", "applications": {"$sum": "$count"}}},
+            {"$sort": {"_id": -1}},
             {"$limit": 12}
         ]
         
-        monthly_trends = await db.scheme_applications.aggregate(monthly_pipeline).to_list(length=12)
+        scheme_statistics, months = await asyncio.gather(
+            db.scheme_application_stats.aggregate(scheme_pipeline).to_list(length=20),
+            db.scheme_application_stats.aggregate(monthly_pipeline).to_list(length=12)
+        )
+        monthly_trends = [
+            {
+                "_id": {"year": int(item["_id"][:4]), "month": int(item["_id"][5:7])},
+                "applications": item["applications"]
+            }
+            for item in months
+        ]
         
         return {
             "success": True,
             "data": {
-                "scheme_statistics": scheme_stats,
+                "scheme_statistics": scheme_statistics,
                 "monthly_trends": monthly_trends
             }
         }
@@ -244,6 +289,43 @@ async def get_schemes_analytics(
         logger.error(f"Get schemes analytics error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.patch("/schemes/applications/{application_id}/status")
+@limiter.limit("30/minute")
+async def update_application_status(
+    request: Request,
+    application_id: str,
+    status: str = Query(..., regex="^(pending|approved|rejected)$"),
+    admin_user = Depends(verify_admin_access),
+    db = Depends(get_database)
+):
+    """Approve or reject a scheme application"""
+    try:
+        from bson import ObjectId
+
+        # Matching on the old status makes concurrent reviews move the counters once
+        application = await db.scheme_applications.find_one_and_update(
+            {"_id": ObjectId(application_id), "status": {"$ne": status}},
+            {"$set": {"status": status, "reviewed_by": admin_user["mobile"], "reviewed_at": datetime.utcnow()}}
+        )
+        if not application:
+            if not await db.scheme_applications.find_one({"_id": ObjectId(application_id)}, {"_id": 1}):
+                raise HTTPException(status_code=404, detail="Application not found")
+            return {"success": True, "message": "Status unchanged", "status": status}
+
+        month = application.get("month_bucket")
+        if month:
+            await scheme_stats.record(db, application["scheme_id"], month, application["status"], -1)
+            await scheme_stats.record(db, application["scheme_id"], month, status, 1)
+        approved_change = (status == "approved") - (application["status"] == "approved")
+        await analytics_snapshot.increment({"approved_applications": approved_change})
+
+        return {"success": True, "message": "Application status updated", "status": status}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update application status error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.get("/alerts/monitoring")
 @limiter.limit("30/minute")
 async def get_alerts_monitoring(
@@ -286,6 +368,92 @@ async def get_alerts_monitoring(
         logger.error(f"Get alerts monitoring error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.post("/alerts/broadcast")
+@limiter.limit("10/minute")
+async def create_broadcast_alert(
+    request: Request,
+    alert_data: BroadcastAlertCreate,
+    admin_user = Depends(verify_admin_access),
+    db = Depends(get_database)
+):
+    """Create one alert shown to every farmer matching the target"""
+    try:
+        alert_dict = alert_data.dict(exclude={"district", "target_crop", "target_soil_type", "expires_in_days"})
+        target = {
+            field: value for field, value in (
+                ("district", alert_data.district),
+                ("crop", alert_data.target_crop),
+                ("soil_type", alert_data.target_soil_type)
+            ) if value is not None
+        }
+        now = datetime.utcnow()
+        alert_dict.update({
+            "target": target,
+            "created_by": admin_user["mobile"],
+            "priority_rank": PRIORITY_RANK[alert_data.priority],
+            "is_active": True,
+            "expires_at": now + timedelta(days=alert_data.expires_in_days),
+            "created_at": now
+        })
+        
+        # A resubmitted notice for the same target on the same day is stored once
+        fingerprint = alert_fingerprint(
+            target.get("district"), target.get("crop"), target.get("soil_type"),
+            alert_data.type, alert_data.title, alert_data.message,
+            window=timedelta(days=1), at=now
+        )
+        result = await db.broadcast_alerts.update_one(
+            {"fingerprint": fingerprint},
+            {"$setOnInsert": alert_dict},
+            upsert=True
+        )
+        broadcast = await db.broadcast_alerts.find_one({"fingerprint": fingerprint})
+        if result.upserted_id is None:
+            return {"success": True, "message": "Broadcast alert already exists", "data": broadcast}
+        alert_events.notify_broadcast(broadcast)
+        
+        return {"success": True, "message": "Broadcast alert created", "data": broadcast}
+    except Exception as e:
+        logger.error(f"Create broadcast alert error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.patch("/users/{mobile}/role")
+@limiter.limit("10/minute")
+async def update_user_role(
+    request: Request,
+    mobile: str,
+    role: str = Query(..., regex="^(farmer|admin)$"),
+    admin_user = Depends(verify_admin_access),
+    db = Depends(get_database)
+):
+    """Grant or revoke admin access; admins cannot change their own role"""
+    try:
+        if mobile == admin_user["mobile"]:
+            raise HTTPException(status_code=400, detail="Cannot change your own role")
+        
+        previous = await db.users.find_one_and_update(
+            {"mobile": mobile},
+            {"$set": {"role": role, "role_updated_by": admin_user["mobile"], "role_updated_at": datetime.utcnow()}},
+            projection={"role": 1, "district": 1}
+        )
+        if previous is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        invalidate_admin_role(mobile)
+        
+        # The dashboard counts farmers only, so promotions and demotions move them
+        farmer_change = (role == "farmer") - (previous.get("role") == "farmer")
+        await analytics_snapshot.increment({
+            "total_farmers": farmer_change,
+            f"by_district.{bucket(previous.get('district'))}": farmer_change
+        })
+        
+        return {"success": True, "message": "Role updated", "role": role}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update user role error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.get("/farmers/{farmer_id}/details")
 @limiter.limit("30/minute")
 async def get_farmer_details(
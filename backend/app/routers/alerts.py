@@ -3,9 +3,18 @@ from typing import Optional
 from app.models.alert import Alert, AlertCreate
 from app.database import get_database
 from app.middleware.auth import get_current_user_id
+from app.services.alert_engine import alert_engine
+from app.services import alert_counters
+from app.services.alert_events import alert_events
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from bson import ObjectId
+from pymongo import UpdateOne
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
+import asyncio
+import json
 import logging
 from datetime import datetime
 
@@ -13,11 +22,120 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+async def _user_target(db, user_id: str) -> dict:
+    """The user's values for the fields broadcasts are targeted on"""
+    user = await db.users.find_one({"mobile": user_id}, {"district": 1}) or {}
+    farm = await db.farms.find_one(
+        {"user_id": user_id, "is_active": True}, {"current_crop": 1, "soil_type": 1}
+    ) or {}
+    return {
+        "district": user.get("district"),
+        "crop": farm.get("current_crop"),
+        "soil_type": farm.get("soil_type")
+    }
+
+def _broadcast_query(target: dict) -> dict:
+    """Broadcast alerts whose targeting matches the user's district and farm"""
+    # {"$in": [None, value]} also matches documents where the field is unset
+    return {
+        "is_active": True,
+        "expires_at": {"$gt": datetime.utcnow()},
+        **{f"target.{field}": {"$in": [None, value]} for field, value in target.items()}
+    }
+
+async def _broadcast_states(db, user_id: str) -> dict:
+    """The user's read and dismiss state for each broadcast, by alert id"""
+    states = db.alert_states.find({"user_id": user_id}, {"alert_id": 1, "is_read": 1, "is_dismissed": 1})
+    return {state["alert_id"]: state async for state in states}
+
+def _hidden_ids(states: dict, unread_only: bool = False) -> list:
+    """Broadcasts to leave out: dismissed ones, and read ones too when unread_only"""
+    return [
+        alert_id for alert_id, state in states.items()
+        if state.get("is_dismissed") or (unread_only and state.get("is_read"))
+    ]
+
+# The broadcast helpers take the user's query and states already resolved, so
+# one request looks up the user's target and broadcast states only once
+
+async def _get_broadcasts(db, query: dict, states: dict, unread_only: bool = False,
+                          after: Optional[dict] = None, limit: int = 0) -> list:
+    """Broadcasts matching query with the user's read state, dismissed ones removed"""
+    query = {**query, "_id": {"$nin": _hidden_ids(states, unread_only)}, **(after or {})}
+    
+    broadcasts = await db.broadcast_alerts.find(query).sort(ALERT_SORT).limit(limit).to_list(length=limit or None)
+    for alert in broadcasts:
+        alert["is_read"] = states.get(alert["_id"], {}).get("is_read", False)
+        alert["is_broadcast"] = True
+    return broadcasts
+
+async def _broadcast_counts(db, query: dict, states: dict, filters: Optional[dict] = None,
+                            unread_only: bool = False) -> dict:
+    """Count the user's undismissed broadcasts in one aggregation.
+
+    "total" counts those matching the listing filters (and unread, when
+    unread_only); "unread" counts every unread one, for the badge.
+    """
+    read_ids = [alert_id for alert_id, state in states.items() if state.get("is_read")]
+    unread = {"$eq": [{"$in": ["$_id", read_ids]}, False]}
+    listed = [{"$eq": [f"${field}", value]} for field, value in (filters or {}).items()]
+    if unread_only:
+        listed.append(unread)
+    
+    counts = await db.broadcast_alerts.aggregate([
+        {"$match": {**query, "_id": {"$nin": _hidden_ids(states)}}},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": {"$cond": [{"$and": listed}, 1, 0]}} if listed else {"$sum": 1},
+            "unread": {"$sum": {"$cond": [unread, 1, 0]}}
+        }}
+    ]).to_list(length=1)
+    counts = counts[0] if counts else {}
+    return {"total": counts.get("total", 0), "unread": counts.get("unread", 0)}
+
+async def _set_broadcast_state(db, user_id: str, alert_ids: list, fields: dict):
+    """Record per-user read or dismiss state for broadcast alerts"""
+    if not alert_ids:
+        return
+    now = datetime.utcnow()
+    await db.alert_states.bulk_write([
+        UpdateOne(
+            {"user_id": user_id, "alert_id": alert_id},
+            {"$set": {**fields, "updated_at": now}},
+            upsert=True
+        )
+        for alert_id in alert_ids
+    ], ordered=False)
+
+# Listing order, shared by personal and broadcast alerts: highest priority
+# first (high=1, medium=2, low=3), then newest, with _id breaking ties so
+# every alert has a unique position for the page cursor
+ALERT_SORT = [("priority_rank", 1), ("created_at", -1), ("_id", -1)]
+
+def _alert_sort_key(alert: dict):
+    return (alert["priority_rank"], -alert["created_at"].timestamp(), -int(str(alert["_id"]), 16))
+
+def _encode_cursor(alert: dict) -> str:
+    return f"{alert['priority_rank']}_{alert['created_at'].isoformat()}_{alert['_id']}"
+
+def _after_cursor(cursor: str) -> dict:
+    """Query for the alerts that sort after the cursor position"""
+    try:
+        rank, created_at, alert_id = cursor.split("_")
+        rank, created_at, alert_id = int(rank), datetime.fromisoformat(created_at), ObjectId(alert_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"priority_rank": {"$gt": rank}},
+        {"priority_rank": rank, "created_at": {"$lt": created_at}},
+        {"priority_rank": rank, "created_at": created_at, "_id": {"$lt": alert_id}}
+    ]}
+
 @router.get("/")
 @limiter.limit("30/minute")
 async def get_alerts(
     request: Request,
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
@@ -25,45 +143,117 @@ async def get_alerts(
     user_id: str = Depends(get_current_user_id),
     db = Depends(get_database)
 ):
-    """Get alerts"""
+    """Get alerts, a page at a time; pass the returned next_cursor for the next page"""
     try:
-        skip = (page - 1) * limit
+        after = _after_cursor(cursor) if cursor else {}
         
-        query = {"user_id": user_id, "is_active": True}
+        filters = {}
         if type:
-            query["type"] = type
+            filters["type"] = type
         if priority:
-            query["priority"] = priority
+            filters["priority"] = priority
+        
+        query = {"user_id": user_id, "is_active": True, **filters}
         if unread_only:
             query["is_read"] = False
         
-        alerts = await db.alerts.find(query).sort([
-            ("priority", 1),  # High priority first (assuming high=1, medium=2, low=3)
-            ("created_at", -1)
-        ]).skip(skip).limit(limit).to_list(length=limit)
+        # Each source reads at most limit + 1 alerts past the cursor, however deep
+        # the page; personal alerts are served by the partial active-alerts index
+        personal_alerts, counts, target, states = await asyncio.gather(
+            db.alerts.find({**query, **after}).sort(ALERT_SORT).limit(limit + 1).to_list(length=limit + 1),
+            alert_counters.get_counts(db, user_id),
+            _user_target(db, user_id),
+            _broadcast_states(db, user_id)
+        )
+        broadcast_query = _broadcast_query(target)
+        broadcasts, broadcast_counts = await asyncio.gather(
+            _get_broadcasts(db, {**broadcast_query, **filters}, states, unread_only, after, limit + 1),
+            _broadcast_counts(db, broadcast_query, states, filters, unread_only)
+        )
+        
+        merged = sorted(personal_alerts + broadcasts, key=_alert_sort_key)
+        alerts = merged[:limit]
+        next_cursor = _encode_cursor(alerts[-1]) if len(merged) > limit else None
+        
+        # Unfiltered totals come from the counter document
+        if filters:
+            total = await db.alerts.count_documents(query)
+        else:
+            total = counts["unread"] if unread_only else counts["total"]
+        total += broadcast_counts["total"]
         
-        total = await db.alerts.count_documents(query)
-        unread_count = await db.alerts.count_documents({
-            "user_id": user_id,
-            "is_active": True,
-            "is_read": False
-        })
+        unread_count = counts["unread"] + broadcast_counts["unread"]
         
         return {
             "success": True,
             "data": alerts,
             "unread_count": unread_count,
             "pagination": {
-                "page": page,
                 "limit": limit,
                 "total": total,
-                "pages": (total + limit - 1) // limit
+                "pages": (total + limit - 1) // limit,
+                "next_cursor": next_cursor
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get alerts error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+@router.get("/stream")
+@limiter.limit("10/minute")
+async def stream_alerts(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Push new alerts and unread count changes as server-sent events"""
+    try:
+        counts, target, states = await asyncio.gather(
+            alert_counters.get_counts(db, user_id),
+            _user_target(db, user_id),
+            _broadcast_states(db, user_id)
+        )
+        broadcast_unread = (await _broadcast_counts(db, _broadcast_query(target), states))["unread"]
+    except Exception as e:
+        logger.error(f"Stream alerts error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+    
+    subscription = alert_events.subscribe(
+        user_id,
+        target,
+        personal_unread=counts["unread"],
+        broadcast_unread=broadcast_unread,
+        read_broadcasts=_hidden_ids(states, unread_only=True)
+    )
+    
+    async def event_stream():
+        try:
+            yield _sse_event("unread_count", {"unread_count": subscription.unread_count})
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse_event(event, data)
+        finally:
+            alert_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.patch("/{alert_id}/read")
 @limiter.limit("30/minute")
 async def mark_alert_as_read(
@@ -74,17 +264,25 @@ async def mark_alert_as_read(
 ):
     """Mark alert as read"""
     try:
-        from bson import ObjectId
-        
         result = await db.alerts.update_one(
             {"_id": ObjectId(alert_id), "user_id": user_id, "is_active": True},
             {"$set": {"is_read": True}}
         )
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Alert not found")
+        if result.modified_count:
+            await alert_counters.increment(db, user_id, unread=-1)
+            await alert_events.notify_unread_changed(user_id)
+        elif result.matched_count == 0:
+            query = _broadcast_query(await _user_target(db, user_id))
+            broadcast = await db.broadcast_alerts.find_one({"_id": ObjectId(alert_id), **query}, {"_id": 1})
+            if not broadcast:
+                raise HTTPException(status_code=404, detail="Alert not found")
+            await _set_broadcast_state(db, user_id, [broadcast["_id"]], {"is_read": True})
+            alert_events.notify_broadcasts_read(user_id, [broadcast["_id"]])
         
         return {"success": True, "message": "Alert marked as read"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Mark alert as read error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
@@ -98,10 +296,20 @@ async def mark_all_alerts_as_read(
 ):
     """Mark all alerts as read"""
     try:
-        await db.alerts.update_many(
+        result = await db.alerts.update_many(
             {"user_id": user_id, "is_active": True, "is_read": False},
             {"$set": {"is_read": True}}
         )
+        await alert_counters.increment(db, user_id, unread=-result.modified_count)
+        if result.modified_count:
+            await alert_events.notify_unread_changed(user_id)
+        
+        target, states = await asyncio.gather(_user_target(db, user_id), _broadcast_states(db, user_id))
+        broadcasts = await _get_broadcasts(db, _broadcast_query(target), states, unread_only=True)
+        unread_ids = [alert["_id"] for alert in broadcasts]
+        await _set_broadcast_state(db, user_id, unread_ids, {"is_read": True})
+        if unread_ids:
+            alert_events.notify_broadcasts_read(user_id, unread_ids)
         
         return {"success": True, "message": "All alerts marked as read"}
     except Exception as e:
@@ -122,50 +330,12 @@ async def generate_alerts(
         if not farm:
             raise HTTPException(status_code=404, detail="Farm profile not found")
         
-        # Generate sample alerts based on farm data
-        alerts_to_create = []
-        
-        # Weather alert
-        alerts_to_create.append({
-            "user_id": user_id,
-            "type": "weather",
-            "priority": "high",
-            "title": "Weather Alert",
-            "message": f"Rain expected in {farm.get('location', 'your area')}. Avoid applying fertilizers today.",
-            "location": farm.get("location"),
-            "crop": farm.get("current_crop")
-        })
-        
-        # Crop-specific alerts
-        crop = farm.get("current_crop")
-        if crop == "paddy":
-            alerts_to_create.append({
-                "user_id": user_id,
-                "type": "irrigation",
-                "priority": "medium",
-                "title": "Irrigation Reminder",
-                "message": "Maintain water level in paddy fields. Check for proper drainage.",
-                "location": farm.get("location"),
-                "crop": crop
-            })
-        elif crop == "coconut":
-            alerts_to_create.append({
-                "user_id": user_id,
-                "type": "pest",
-                "priority": "medium",
-                "title": "Pest Alert",
-                "message": "Check coconut trees for red palm weevil. Look for holes in trunk.",
-                "location": farm.get("location"),
-                "crop": crop
-            })
-        
-        # Insert alerts
-        if alerts_to_create:
-            result = await db.alerts.insert_many(alerts_to_create)
-            created_alerts = await db.alerts.find({
-                "_id": {"$in": result.inserted_ids}
-            }).to_list(length=len(result.inserted_ids))
-            
+        # Evaluate the weather and crop rules for this farm
+        alerts_to_create = await alert_engine.generate_for_farm(farm)
+        
+        # Insert alerts, skipping ones already generated in this window
+        created_alerts = await alert_engine.write_alerts(alerts_to_create)
+        if created_alerts:
             return {
                 "success": True,
                 "message": f"Generated {len(created_alerts)} alerts",
@@ -173,6 +343,8 @@ async def generate_alerts(
             }
         
         return {"success": True, "message": "No new alerts to generate"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Generate alerts error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
@@ -187,17 +359,31 @@ async def delete_alert(
 ):
     """Delete alert"""
     try:
-        from bson import ObjectId
-        
-        result = await db.alerts.update_one(
+        # The pre-update document tells whether an unread alert was removed
+        deleted = await db.alerts.find_one_and_update(
             {"_id": ObjectId(alert_id), "user_id": user_id, "is_active": True},
-            {"$set": {"is_active": False}}
+            {"$set": {"is_active": False}},
+            projection={"is_read": 1}
         )
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Alert not found")
+        if deleted:
+            await alert_counters.increment(
+                db, user_id, unread=0 if deleted.get("is_read") else -1, total=-1
+            )
+            if not deleted.get("is_read"):
+                await alert_events.notify_unread_changed(user_id)
+        else:
+            # Broadcasts are shared, so deleting one only dismisses it for this user
+            query = _broadcast_query(await _user_target(db, user_id))
+            broadcast = await db.broadcast_alerts.find_one({"_id": ObjectId(alert_id), **query}, {"_id": 1})
+            if not broadcast:
+                raise HTTPException(status_code=404, detail="Alert not found")
+            await _set_broadcast_state(db, user_id, [broadcast["_id"]], {"is_dismissed": True})
+            alert_events.notify_broadcasts_read(user_id, [broadcast["_id"]])
         
         return {"success": True, "message": "Alert deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Delete alert error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
\ No newline at end of file
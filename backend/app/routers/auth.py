@@ -4,6 +4,7 @@ from typing import Optional
 import hashlib
 import time
 from app.database import get_database
+from app.services.analytics import analytics_snapshot, bucket
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
@@ -99,6 +100,10 @@ async def signup(
         
         result = await db.users.insert_one(user_data)
         user_data["_id"] = str(result.inserted_id)
+        await analytics_snapshot.increment({
+            "total_farmers": 1,
+            f"by_district.{bucket(signup_data.district)}": 1
+        })
         
         # Mark OTP as verified
         await db.otps.update_one(
@@ -2,11 +2,19 @@ from fastapi import APIRouter, HTTPException, Depends
 from app.models.chat import ChatRequest, ChatResponse, Message
 from app.database import get_database
 from app.middleware.auth import get_current_user_id
-from app.services.llm_service import granite_service
+from app.services.llm_service import granite_service, GraniteUnavailableError
 from app.services.translation_service import translation_service
+from app.services.knowledge_base import is_malayalam
+from app.services.language_detection import MANGLISH
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+import asyncio
+import json
+import time
 import uuid
 import logging
 from datetime import datetime
@@ -15,6 +23,24 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+# Background LLM calls that outlived their request's latency budget
+_background_tasks = set()
+hedge_metrics = {"provisional": 0, "upgraded": 0, "abandoned": 0}
+
+# Per-pipeline latency from prompt preparation to answer, and how often each
+# had to fall back to the local answer
+pipeline_metrics = {
+    "en": {"latency": LatencyStats(), "turns": 0, "fallbacks": 0},
+    "ml_translate": {"latency": LatencyStats(), "turns": 0, "fallbacks": 0},
+    "ml_native": {"latency": LatencyStats(), "turns": 0, "fallbacks": 0, "retranslated": 0}
+}
+
+# Streaming latency, measured separately for the first token and the full answer
+stream_metrics = {
+    "time_to_first_token": LatencyStats(),
+    "total": LatencyStats()
+}
+
 @router.get("/history")
 @limiter.limit("30/minute")
 async def get_chat_history(
@@ -44,6 +70,138 @@ async def get_chat_history(
         logger.error(f"Get chat history error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+async def _get_or_create_session(db, user_id: str, session_id: str):
+    """Find the chat session, creating it on first message"""
+    chat = await db.chats.find_one({"user_id": user_id, "session_id": session_id})
+    if not chat:
+        chat = {
+            "user_id": user_id,
+            "session_id": session_id,
+            "messages": [],
+            "is_active": True,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        await db.chats.insert_one(chat)
+    return chat
+
+async def _get_farm_context(db, user_id: str) -> dict:
+    """Get farm context for better AI responses"""
+    farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
+    context = {}
+    if farm:
+        context = {
+            "current_crop": farm.get("current_crop"),
+            "soil_type": farm.get("soil_type"),
+            "location": farm.get("location")
+        }
+    return context
+
+async def _save_messages(db, user_id: str, session_id: str, messages: list):
+    """Append messages to the chat session"""
+    await db.chats.update_one(
+        {"user_id": user_id, "session_id": session_id},
+        {
+            "$push": {
+                "messages": {
+                    "$each": [message.dict() for message in messages],
+                    "$slice": -50  # Keep only last 50 messages
+                }
+            },
+            "$set": {"updated_at": datetime.utcnow()}
+        }
+    )
+
+def _choose_pipeline(chat_request: ChatRequest) -> str:
+    """Pick how a turn is answered.
+
+    English turns go straight to the LLM. Malayalam turns either use the
+    translate sandwich (ml->en, LLM, en->ml) or ask the LLM to answer in
+    Malayalam directly, per request or CHAT_PIPELINE_MODE. Manglish always
+    goes native: Amazon Translate garbles Latin-script text sent as "ml".
+    """
+    if chat_request.language == MANGLISH:
+        return "ml_native"
+    if chat_request.language != "ml":
+        return "en"
+    if not is_malayalam(chat_request.message):
+        return "ml_native"
+    mode = chat_request.pipeline or settings.CHAT_PIPELINE_MODE
+    return "ml_native" if mode == "native" else "ml_translate"
+
+async def _resolve_pipeline(chat_request: ChatRequest) -> str:
+    """Detect the language if asked to, then pick the pipeline"""
+    if not chat_request.language or chat_request.language == "auto":
+        chat_request.language = await translation_service.detect_language(chat_request.message)
+    pipeline = _choose_pipeline(chat_request)
+    if chat_request.language == MANGLISH:
+        # Manglish turns are answered and stored as Malayalam
+        chat_request.language = "ml"
+    return pipeline
+
+async def _prepare_prompt(message: str, pipeline: str) -> str:
+    """Translate the message to English when the pipeline needs it"""
+    if pipeline == "ml_translate":
+        return await translation_service.translate_text(message, "ml", "en")
+    return message
+
+async def _generate_answer(message_for_ai: str, context: dict, pipeline: str) -> str:
+    """Generate the LLM answer in the user's language"""
+    if pipeline == "ml_native":
+        text = await granite_service.generate(message_for_ai, context, language="ml")
+        if not is_malayalam(text):
+            # The model answered in English; translate rather than reply in the wrong language
+            pipeline_metrics["ml_native"]["retranslated"] += 1
+            text = await translation_service.translate_text(text, "en", "ml")
+        return text
+    
+    text = await granite_service.generate(message_for_ai, context)
+    if pipeline == "ml_translate":
+        text = await translation_service.translate_text(text, "en", "ml")
+    return text
+
+async def _fallback_answer(message_for_ai: str, context: dict, pipeline: str) -> str:
+    """Local knowledge base answer served when the LLM is unavailable or too slow"""
+    if pipeline == "ml_native":
+        return granite_service.get_fallback_response(message_for_ai, context, language="ml")
+    
+    text = granite_service.get_fallback_response(message_for_ai, context)
+    if pipeline == "ml_translate":
+        text = await translation_service.translate_text(text, "en", "ml")
+    return text
+
+def _run_in_background(coro):
+    """Run a coroutine detached from the request, keeping a reference until it finishes"""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _upgrade_provisional_answer(db, user_id: str, session_id: str, message_id: str, llm_task):
+    """Replace a provisional answer with the LLM answer once it arrives"""
+    update = {"messages.$.is_provisional": False}
+    try:
+        update["messages.$.content"] = await llm_task
+        hedge_metrics["upgraded"] += 1
+    except GraniteUnavailableError as e:
+        # No better answer is coming; the fallback becomes final
+        logger.error(f"Error calling IBM Granite API: {e}")
+        hedge_metrics["abandoned"] += 1
+    except Exception as e:
+        logger.error(f"Background answer error: {e}")
+        hedge_metrics["abandoned"] += 1
+    
+    try:
+        await db.chats.update_one(
+            {"user_id": user_id, "session_id": session_id, "messages.id": message_id},
+            {"$set": {**update, "updated_at": datetime.utcnow()}}
+        )
+    except Exception as e:
+        logger.error(f"Upgrade provisional answer error: {e}")
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
 @router.post("/message")
 @limiter.limit("20/minute")
 async def send_message(
@@ -57,32 +215,13 @@ async def send_message(
         session_id = chat_request.session_id or str(uuid.uuid4())
         
         # Find or create chat session
-        chat = await db.chats.find_one({"user_id": user_id, "session_id": session_id})
-        if not chat:
-            chat = {
-                "user_id": user_id,
-                "session_id": session_id,
-                "messages": [],
-                "is_active": True,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            await db.chats.insert_one(chat)
+        await _get_or_create_session(db, user_id, session_id)
         
         # Get farm context for better AI responses
-        farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
-        context = {}
-        if farm:
-            context = {
-                "current_crop": farm.get("current_crop"),
-                "soil_type": farm.get("soil_type"),
-                "location": farm.get("location")
-            }
+        context = await _get_farm_context(db, user_id)
         
-        # Detect language if not provided
-        if not chat_request.language or chat_request.language == "auto":
-            detected_lang = await translation_service.detect_language(chat_request.message)
-            chat_request.language = detected_lang
+        # Detect language if not provided, and choose how to answer
+        pipeline = await _resolve_pipeline(chat_request)
         
         # Create user message
         user_message = Message(
@@ -93,42 +232,45 @@ async def send_message(
             language=chat_request.language
         )
         
-        # Translate message to English for AI processing if needed
-        message_for_ai = chat_request.message
-        if chat_request.language == "ml":
-            message_for_ai = await translation_service.translate_text(
-                chat_request.message, "ml", "en"
-            )
+        # Translate message to English for AI processing if the pipeline needs it
+        started = time.perf_counter()
+        message_for_ai = await _prepare_prompt(chat_request.message, pipeline)
         
-        # Generate AI response
-        ai_response_text = await granite_service.generate_response(message_for_ai, context)
+        # Generate AI response, falling back to a quick answer if the LLM misses the budget
+        llm_task = asyncio.ensure_future(_generate_answer(message_for_ai, context, pipeline))
+        budget = chat_request.latency_budget or settings.CHAT_LATENCY_BUDGET_SECONDS
+        is_provisional = False
+        try:
+            ai_response_text = await asyncio.wait_for(asyncio.shield(llm_task), timeout=budget)
+        except GraniteUnavailableError as e:
+            logger.error(f"Error calling IBM Granite API: {e}")
+            ai_response_text = await _fallback_answer(message_for_ai, context, pipeline)
+            pipeline_metrics[pipeline]["fallbacks"] += 1
+        except asyncio.TimeoutError:
+            ai_response_text = await _fallback_answer(message_for_ai, context, pipeline)
+            pipeline_metrics[pipeline]["fallbacks"] += 1
+            is_provisional = True
         
-        # Translate AI response back to user's language if needed
-        if chat_request.language == "ml":
-            ai_response_text = await translation_service.translate_text(
-                ai_response_text, "en", "ml"
-            )
+        pipeline_metrics[pipeline]["turns"] += 1
+        pipeline_metrics[pipeline]["latency"].record((time.perf_counter() - started) * 1000)
         
         # Create AI message
         ai_message = Message(
             content=ai_response_text,
             sender="ai",
-            language=chat_request.language
+            language=chat_request.language,
+            is_provisional=is_provisional
         )
         
         # Update chat session
-        await db.chats.update_one(
-            {"user_id": user_id, "session_id": session_id},
-            {
-                "$push": {
-                    "messages": {
-                        "$each": [user_message.dict(), ai_message.dict()],
-                        "$slice": -50  # Keep only last 50 messages
-                    }
-                },
-                "$set": {"updated_at": datetime.utcnow()}
-            }
-        )
+        await _save_messages(db, user_id, session_id, [user_message, ai_message])
+        
+        if is_provisional:
+            # Keep the LLM call running; clients pick up the upgrade via /history
+            hedge_metrics["provisional"] += 1
+            _run_in_background(
+                _upgrade_provisional_answer(db, user_id, session_id, ai_message.id, llm_task)
+            )
         
         return {
             "success": True,
@@ -142,6 +284,107 @@ async def send_message(
         logger.error(f"Send message error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.post("/message/stream")
+@limiter.limit("20/minute")
+async def stream_message(
+    request: Request,
+    chat_request: ChatRequest,
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Send message and stream the AI response as server-sent events.
+
+    Emits a "session" event, one "token" event per generated chunk and a
+    final "done" event carrying the saved AI message and timings, or an
+    "error" event if generation fails part way. A reply cut off by an error
+    or a disconnect is saved with is_incomplete set.
+    """
+    try:
+        session_id = chat_request.session_id or str(uuid.uuid4())
+        await _get_or_create_session(db, user_id, session_id)
+        context = await _get_farm_context(db, user_id)
+        
+        pipeline = await _resolve_pipeline(chat_request)
+        
+        user_message = Message(
+            content=chat_request.message,
+            sender="user",
+            has_image=chat_request.has_image,
+            image_url=chat_request.image_url,
+            language=chat_request.language
+        )
+        
+        message_for_ai = await _prepare_prompt(chat_request.message, pipeline)
+    except Exception as e:
+        logger.error(f"Stream message error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+    
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        completed = False
+        ai_message = None
+        
+        try:
+            yield _sse_event("session", {"session_id": session_id, "user_message": user_message.dict()})
+            
+            if pipeline == "ml_translate":
+                # Translation needs the complete answer, so these replies arrive in one chunk
+                text = await granite_service.generate_response(message_for_ai, context)
+                text = await translation_service.translate_text(text, "en", "ml")
+                first_token_at = time.perf_counter()
+                chunks.append(text)
+                yield _sse_event("token", {"text": text})
+            else:
+                language = "ml" if pipeline == "ml_native" else "en"
+                async for text in granite_service.generate_response_stream(message_for_ai, context, language):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks.append(text)
+                    yield _sse_event("token", {"text": text})
+            completed = True
+        except Exception as e:
+            logger.error(f"Stream message error: {e}")
+            yield _sse_event("error", {"message": "Server error"})
+        finally:
+            # Save whatever the farmer was shown, even if generation failed or
+            # they disconnected; shielded so a cancelled stream still saves
+            messages = [user_message]
+            if chunks:
+                ai_message = Message(
+                    content="".join(chunks).strip(),
+                    sender="ai",
+                    language=chat_request.language,
+                    is_incomplete=not completed
+                )
+                messages.append(ai_message)
+            try:
+                await asyncio.shield(_save_messages(db, user_id, session_id, messages))
+            except Exception as e:
+                logger.error(f"Save streamed message error: {e}")
+        
+        if not completed:
+            return
+        
+        ttft_ms = (first_token_at - started) * 1000
+        total_ms = (time.perf_counter() - started) * 1000
+        stream_metrics["time_to_first_token"].record(ttft_ms)
+        stream_metrics["total"].record(total_ms)
+        
+        yield _sse_event("done", {
+            "ai_message": ai_message.dict() if ai_message else None,
+            "session_id": session_id,
+            "time_to_first_token_ms": round(ttft_ms, 1),
+            "total_ms": round(total_ms, 1)
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.delete("/history")
 @limiter.limit("5/minute")
 async def clear_chat_history(
@@ -3,15 +3,27 @@ from typing import List, Optional
 from app.models.farm import Farm, FarmCreate, FarmUpdate, Activity, ActivityCreate
 from app.database import get_database
 from app.middleware.auth import get_current_user_id
+from app.services.analytics import analytics_snapshot, bucket
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+def _farm_analytics_changes(old_farm: Optional[dict], new_farm: Optional[dict]) -> dict:
+    """Land area and crop counter changes when a farm profile is saved"""
+    changes = {}
+    for farm, sign in ((old_farm, -1), (new_farm, 1)):
+        if farm and farm.get("is_active"):
+            crop_key = f"by_crop.{bucket(farm.get('current_crop'))}"
+            changes["total_land_area"] = changes.get("total_land_area", 0) + sign * farm.get("land_size", 0)
+            changes[crop_key] = changes.get(crop_key, 0) + sign
+    return changes
+
 @router.get("/profile")
 @limiter.limit("30/minute")
 async def get_farm_profile(
@@ -55,9 +67,13 @@ async def create_farm_profile(
             farm = await db.farms.find_one({"user_id": user_id})
         else:
             # Create new farm
+            farm_dict["is_active"] = True
+            farm_dict["created_at"] = farm_dict["updated_at"] = datetime.utcnow()
             result = await db.farms.insert_one(farm_dict)
             farm = await db.farms.find_one({"_id": result.inserted_id})
         
+        await analytics_snapshot.increment(_farm_analytics_changes(existing_farm, farm))
+        
         return {"success": True, "message": "Farm profile saved successfully", "data": farm}
     except Exception as e:
         logger.error(f"Save farm profile error: {e}")
@@ -117,8 +133,12 @@ async def add_activity(
         activity_dict["user_id"] = user_id
         activity_dict["farm_id"] = farm["_id"]
         
+        activity_dict["is_deleted"] = False
+        activity_dict["created_at"] = datetime.utcnow()
+        
         result = await db.activities.insert_one(activity_dict)
         activity = await db.activities.find_one({"_id": result.inserted_id})
+        await analytics_snapshot.increment({"total_activities": 1})
         
         return {
             "success": True,
@@ -148,6 +168,8 @@ async def delete_activity(
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Activity not found")
+        if result.modified_count:
+            await analytics_snapshot.increment({"total_activities": -1})
         
         return {"success": True, "message": "Activity deleted successfully"}
     except Exception as e:
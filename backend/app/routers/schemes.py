@@ -2,9 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from app.database import get_database
 from app.middleware.auth import get_current_user_id
+from app.services.analytics import analytics_snapshot
+from app.services import scheme_stats
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -190,12 +193,15 @@ async def apply_for_scheme(
             raise HTTPException(status_code=400, detail="Complete farm setup to apply")
         
         # Create application
+        applied_at = datetime.utcnow()
         application_data = {
             "user_id": user_id,
             "scheme_id": scheme_id,
             "scheme_name": scheme["name_en"],
             "status": "pending",
             "applied_date": time.time(),
+            "applied_at": applied_at,
+            "month_bucket": scheme_stats.month_bucket(applied_at),
             "user_data": {
                 "name": user.get("name") if user else "Unknown",
                 "mobile": user_id,
@@ -209,6 +215,8 @@ async def apply_for_scheme(
         }
         
         result = await db.scheme_applications.insert_one(application_data)
+        await scheme_stats.record(db, scheme_id, application_data["month_bucket"], "pending")
+        await analytics_snapshot.increment({"total_applications": 1})
         
         return {
             "success": True,
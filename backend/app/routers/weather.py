@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from app.services.weather_service import weather_service
+from app.models.weather import WeatherBatchRequest
+from app.core.config import settings
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request
@@ -19,16 +21,13 @@ async def get_current_weather(
 ):
     """Get current weather"""
     try:
-        if not location and (not lat or not lon):
+        if not location and (lat is None or lon is None):
             raise HTTPException(
                 status_code=400,
                 detail="Location or coordinates are required"
             )
         
-        if not location:
-            location = f"{lat},{lon}"
-        
-        weather_data = await weather_service.get_current_weather(location)
+        weather_data = await weather_service.get_current_weather(location, lat=lat, lon=lon)
         
         return {"success": True, "data": weather_data}
     except Exception as e:
@@ -46,18 +45,48 @@ async def get_weather_forecast(
 ):
     """Get weather forecast"""
     try:
-        if not location and (not lat or not lon):
+        if not location and (lat is None or lon is None):
             raise HTTPException(
                 status_code=400,
                 detail="Location or coordinates are required"
             )
         
-        if not location:
-            location = f"{lat},{lon}"
-        
-        forecast_data = await weather_service.get_weather_forecast(location, days)
+        forecast_data = await weather_service.get_weather_forecast(location, days, lat=lat, lon=lon)
         
         return {"success": True, "data": forecast_data}
     except Exception as e:
         logger.error(f"Get weather forecast error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch weather forecast")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch weather forecast")
+
+@router.post("/batch")
+@limiter.limit("10/minute")
+async def get_weather_forecast_batch(
+    request: Request,
+    batch_request: WeatherBatchRequest
+):
+    """Get weather forecasts for many locations in one call"""
+    try:
+        if not batch_request.locations:
+            raise HTTPException(status_code=400, detail="At least one location is required")
+        if len(batch_request.locations) > settings.WEATHER_BATCH_MAX_LOCATIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.WEATHER_BATCH_MAX_LOCATIONS} locations per request"
+            )
+        if any(not item.location and (item.lat is None or item.lon is None) for item in batch_request.locations):
+            raise HTTPException(
+                status_code=400,
+                detail="Location or coordinates are required"
+            )
+        
+        forecasts = await weather_service.get_forecasts_batch(
+            [item.dict() for item in batch_request.locations],
+            batch_request.days
+        )
+        
+        return {"success": True, "data": forecasts}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get weather batch error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch weather forecasts")
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+import csv
+import io
+import json
+import logging
+import zlib
+
+from bson import ObjectId
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Each export lists its columns as (header, document path). Paths under "farm."
+# read the farmer's active farm, joined one cursor batch at a time.
+EXPORTS: Dict[str, Dict[str, Any]] = {
+    "farmers": {
+        "collection": "users",
+        "query": {"role": "farmer"},
+        "columns": [
+            ("id", "_id"), ("name", "name"), ("mobile", "mobile"), ("district", "district"),
+            ("panchayat", "panchayat"), ("location", "location"), ("created_at", "created_at"),
+            ("last_login", "last_login"), ("crop", "farm.current_crop"), ("land_size", "farm.land_size"),
+            ("land_unit", "farm.land_unit"), ("soil_type", "farm.soil_type"), ("irrigation", "farm.irrigation"),
+            ("farm_location", "farm.location")
+        ]
+    },
+    "activities": {
+        "collection": "activities",
+        "query": {"is_deleted": False},
+        "columns": [
+            ("id", "_id"), ("user_id", "user_id"), ("farm_id", "farm_id"), ("type", "type"),
+            ("crop", "crop"), ("location", "location"), ("notes", "notes"), ("created_at", "created_at")
+        ]
+    },
+    "applications": {
+        "collection": "scheme_applications",
+        "query": {},
+        "columns": [
+            ("id", "_id"), ("user_id", "user_id"), ("scheme_id", "scheme_id"), ("scheme_name", "scheme_name"),
+            ("status", "status"), ("applied_at", "applied_at"), ("district", "user_data.district"),
+            ("land_size", "farm_data.land_size"), ("crop", "farm_data.crop")
+        ]
+    }
+}
+
+FARM_PROJECTION = {
+    "user_id": 1, "current_crop": 1, "land_size": 1, "land_unit": 1, "soil_type": 1, "irrigation": 1, "location": 1
+}
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _lookup(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _csv_safe(value: Any) -> Any:
+    """Neutralize text a spreadsheet would run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+async def _join_farms(database, users: List[Dict[str, Any]]):
+    """Attach each farmer's active farm, in one $in query per batch"""
+    user_ids = [user.get("mobile") for user in users]
+    farms = {}
+    async for farm in database.farms.find({"user_id": {"$in": user_ids}, "is_active": True}, FARM_PROJECTION):
+        farms.setdefault(farm["user_id"], farm)
+    for user in users:
+        user["farm"] = farms.get(user.get("mobile"))
+
+async def _rows(database, dataset: str) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Export rows, one cursor batch at a time"""
+    spec = EXPORTS[dataset]
+    columns = spec["columns"]
+    projection = {path: 1 for _, path in columns if not path.startswith("farm.")}
+    batch_size = settings.ADMIN_EXPORT_BATCH_SIZE
+
+    # Sorting on _id keeps the scan on the primary key index
+    cursor = database[spec["collection"]].find(spec["query"], projection).sort("_id", 1).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield await _format_batch(database, dataset, batch)
+            batch = []
+    if batch:
+        yield await _format_batch(database, dataset, batch)
+
+async def _format_batch(database, dataset: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if dataset == "farmers":
+        await _join_farms(database, documents)
+    columns = EXPORTS[dataset]["columns"]
+    return [{header: _lookup(document, path) for header, path in columns} for document in documents]
+
+async def stream(database, dataset: str, export_format: str, compress: bool) -> AsyncIterator[bytes]:
+    """Encode an export as CSV or NDJSON, optionally gzipped, in bounded chunks"""
+    headers = [header for header, _ in EXPORTS[dataset]["columns"]]
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=headers) if export_format == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    # Headers are already sent, so a failure can only end the stream early
+    try:
+        async for rows in _rows(database, dataset):
+            for row in rows:
+                if writer:
+                    writer.writerow({header: _csv_safe(value) for header, value in row.items()})
+                else:
+                    buffer.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+            if buffer.tell() >= settings.ADMIN_EXPORT_CHUNK_BYTES:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+    except Exception as e:
+        logger.error(f"Export {dataset} error: {e}")
+        raise
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
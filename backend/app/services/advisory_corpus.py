@@ -0,0 +1,275 @@
+# Curated Kerala farm advisories used by the local knowledge base.
+# Each entry is a crop × problem × season answer in English and Malayalam;
+# "keywords" adds synonyms and common spellings farmers use.
+ADVISORY_CORPUS = [
+    {
+        "id": "paddy-stem-borer",
+        "crop": "paddy",
+        "problem": "pest",
+        "season": "monsoon",
+        "keywords": "stem borer dead heart white ear worm caterpillar insect tandu thurappan",
+        "text_en": "Paddy stem borer causes dead hearts and white ears. Install pheromone traps (5 per acre), release Trichogramma egg parasitoids and clip seedling tips before transplanting. Avoid excess nitrogen.",
+        "text_ml": "നെല്ലിലെ തണ്ടുതുരപ്പൻ പുഴു നടുനാമ്പ് വാട്ടവും വെൺകതിരും ഉണ്ടാക്കുന്നു. ഏക്കറിന് 5 ഫിറമോൺ കെണികൾ വയ്ക്കുക, ട്രൈക്കോഗ്രാമ മുട്ടപ്പരാദങ്ങളെ വിടുക, പറിച്ചുനടുന്നതിന് മുമ്പ് ഞാറിന്റെ തലപ്പ് മുറിക്കുക. അമിതമായി നൈട്രജൻ നൽകരുത്."
+    },
+    {
+        "id": "paddy-blast",
+        "crop": "paddy",
+        "problem": "disease",
+        "season": "all",
+        "keywords": "blast leaf spot fungus disease grey spots neck rot",
+        "text_en": "Paddy blast shows spindle-shaped spots with grey centres on the leaves. Grow resistant varieties, avoid excess nitrogen and spray Pseudomonas fluorescens (20 g per litre). Remove infected stubble after harvest.",
+        "text_ml": "നെല്ലിലെ ബ്ലാസ്റ്റ് രോഗം ഇലകളിൽ ചാരനിറമുള്ള നടുഭാഗത്തോടുകൂടിയ നീണ്ട പാടുകളായി കാണുന്നു. പ്രതിരോധശേഷിയുള്ള ഇനങ്ങൾ കൃഷി ചെയ്യുക, അമിത നൈട്രജൻ ഒഴിവാക്കുക, സ്യൂഡോമോണാസ് ഫ്ലൂറസെൻസ് (ലിറ്ററിന് 20 ഗ്രാം) തളിക്കുക. കൊയ്ത്തിന് ശേഷം രോഗം ബാധിച്ച കുറ്റികൾ നീക്കം ചെയ്യുക."
+    },
+    {
+        "id": "paddy-water",
+        "crop": "paddy",
+        "problem": "irrigation",
+        "season": "monsoon",
+        "keywords": "water level standing water irrigation drainage flood submergence rain",
+        "text_en": "Keep 2-5 cm of standing water in paddy fields from tillering to flowering. Drain the field 10 days before harvest. During heavy monsoon rain open the bunds so young seedlings are not submerged.",
+        "text_ml": "ചിനപ്പുപൊട്ടൽ മുതൽ പൂവിടൽ വരെ നെൽവയലിൽ 2-5 സെ.മീ വെള്ളം നിർത്തുക. കൊയ്ത്തിന് 10 ദിവസം മുമ്പ് വെള്ളം വാർത്തുകളയുക. കനത്ത മഴയിൽ ഇളം ഞാറ് മുങ്ങാതിരിക്കാൻ വരമ്പുകൾ തുറന്ന് വെള്ളം ഒഴുക്കിവിടുക."
+    },
+    {
+        "id": "paddy-fertilizer",
+        "crop": "paddy",
+        "problem": "fertilizer",
+        "season": "all",
+        "keywords": "fertilizer manure nitrogen urea lime nutrient valam",
+        "text_en": "For paddy apply lime at 250 kg per hectare during ploughing and organic manure at 5 tonnes per hectare. Split nitrogen: half at planting, a quarter at tillering and a quarter at panicle initiation. Do not apply fertilizer into flowing water.",
+        "text_ml": "നെല്ലിന് ഉഴവ് സമയത്ത് ഹെക്ടറിന് 250 കി.ഗ്രാം കുമ്മായവും 5 ടൺ ജൈവവളവും നൽകുക. നൈട്രജൻ പകുതി നടീൽ സമയത്തും കാൽഭാഗം ചിനപ്പുപൊട്ടുമ്പോഴും കാൽഭാഗം കതിരുരുവാകുമ്പോഴും നൽകുക. ഒഴുകുന്ന വെള്ളത്തിൽ വളം ഇടരുത്."
+    },
+    {
+        "id": "coconut-rhinoceros-beetle",
+        "crop": "coconut",
+        "problem": "pest",
+        "season": "all",
+        "keywords": "rhinoceros beetle kombanchelli crown frond cut insect pest",
+        "text_en": "Rhinoceros beetle bores into the crown and leaves V-shaped cuts on the fronds. Hook out the beetles, fill the top three leaf axils with neem cake mixed with sand (1:1) and treat manure pits with Metarhizium fungus.",
+        "text_ml": "കൊമ്പൻചെല്ലി തെങ്ങിന്റെ മണ്ടയിൽ തുരന്ന് ഓലകളിൽ V ആകൃതിയിലുള്ള മുറിവുകൾ ഉണ്ടാക്കുന്നു. ചെല്ലിക്കോൽ ഉപയോഗിച്ച് വണ്ടുകളെ പുറത്തെടുക്കുക, മുകളിലെ മൂന്ന് ഓലക്കവിളുകളിൽ വേപ്പിൻപിണ്ണാക്കും മണലും (1:1) നിറയ്ക്കുക, വളക്കുഴികളിൽ മെറ്റാറൈസിയം കുമിൾ പ്രയോഗിക്കുക."
+    },
+    {
+        "id": "coconut-red-palm-weevil",
+        "crop": "coconut",
+        "problem": "pest",
+        "season": "all",
+        "keywords": "red palm weevil chempan chelli trunk hole ooze insect pest",
+        "text_en": "Red palm weevil: look for holes in the trunk oozing brown fluid and chewed fibre. Avoid injuring the trunk, keep the crown clean, use pheromone traps and remove and destroy badly affected palms.",
+        "text_ml": "ചെമ്പൻചെല്ലി: തടിയിൽ തവിട്ടുനിറമുള്ള ദ്രാവകവും ചവച്ച നാരുകളും പുറത്തുവരുന്ന ദ്വാരങ്ങൾ ശ്രദ്ധിക്കുക. തടിയിൽ മുറിവുണ്ടാക്കരുത്, മണ്ട വൃത്തിയായി സൂക്ഷിക്കുക, ഫിറമോൺ കെണികൾ ഉപയോഗിക്കുക, ഗുരുതരമായി ബാധിച്ച തെങ്ങുകൾ മുറിച്ചുമാറ്റി നശിപ്പിക്കുക."
+    },
+    {
+        "id": "coconut-bud-rot",
+        "crop": "coconut",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "bud rot spindle leaf rotting yellowing kumpuchiyal disease bordeaux",
+        "text_en": "Bud rot appears during the monsoon as yellowing and rotting of the spindle leaf. Remove the rotten tissue, apply 10% Bordeaux paste and protect the crown. Spray 1% Bordeaux mixture on the crown before the southwest monsoon as prevention.",
+        "text_ml": "കൂമ്പുചീയൽ മഴക്കാലത്ത് നാമ്പോല മഞ്ഞളിച്ച് ചീഞ്ഞുപോകുന്നതായി കാണുന്നു. ചീഞ്ഞ ഭാഗങ്ങൾ നീക്കം ചെയ്ത് 10% ബോർഡോ കുഴമ്പ് പുരട്ടി മണ്ട സംരക്ഷിക്കുക. കാലവർഷത്തിന് മുമ്പ് പ്രതിരോധത്തിനായി മണ്ടയിൽ 1% ബോർഡോ മിശ്രിതം തളിക്കുക."
+    },
+    {
+        "id": "coconut-fertilizer",
+        "crop": "coconut",
+        "problem": "fertilizer",
+        "season": "monsoon",
+        "keywords": "fertilizer manure npk lime basin nutrient valam yield",
+        "text_en": "Give each adult coconut palm 50 kg of organic manure a year with lime in April-May. Apply NPK in two splits, one third in May-June and two thirds in September-October, in a basin 1.8 m around the palm.",
+        "text_ml": "കായ്ക്കുന്ന ഓരോ തെങ്ങിനും വർഷത്തിൽ 50 കി.ഗ്രാം ജൈവവളം ഏപ്രിൽ-മെയ് മാസത്തിൽ കുമ്മായത്തോടൊപ്പം നൽകുക. രാസവളം രണ്ട് തവണയായി, മൂന്നിലൊന്ന് മെയ്-ജൂണിലും മൂന്നിൽ രണ്ട് സെപ്റ്റംബർ-ഒക്ടോബറിലും തെങ്ങിന് ചുറ്റും 1.8 മീറ്റർ ചുറ്റളവിലുള്ള തടത്തിൽ നൽകുക."
+    },
+    {
+        "id": "coconut-summer-irrigation",
+        "crop": "coconut",
+        "problem": "irrigation",
+        "season": "summer",
+        "keywords": "water irrigation summer drought drip basin husk mulch",
+        "text_en": "In summer irrigate coconut palms every 4-5 days with about 200 litres per palm in the basin, or give 30-40 litres daily through drip. Mulch the basin with coconut husk to save moisture.",
+        "text_ml": "വേനൽക്കാലത്ത് 4-5 ദിവസത്തിലൊരിക്കൽ ഓരോ തെങ്ങിനും തടത്തിൽ ഏകദേശം 200 ലിറ്റർ വെള്ളം നൽകുക, അല്ലെങ്കിൽ തുള്ളിനനയിലൂടെ ദിവസവും 30-40 ലിറ്റർ നൽകുക. ഈർപ്പം നിലനിർത്താൻ തടത്തിൽ തൊണ്ട് കൊണ്ട് പുതയിടുക."
+    },
+    {
+        "id": "rubber-abnormal-leaf-fall",
+        "crop": "rubber",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "abnormal leaf fall leaves falling disease copper oxychloride bordeaux spray",
+        "text_en": "Abnormal leaf fall in rubber spreads during the southwest monsoon. Spray 1% Bordeaux mixture or oil-based copper oxychloride in May before the monsoon sets in.",
+        "text_ml": "റബ്ബറിലെ അകാല ഇലപൊഴിച്ചിൽ കാലവർഷക്കാലത്ത് പടരുന്നു. മഴ തുടങ്ങുന്നതിന് മുമ്പ് മെയ് മാസത്തിൽ 1% ബോർഡോ മിശ്രിതമോ എണ്ണ ചേർത്ത കോപ്പർ ഓക്സിക്ലോറൈഡോ തളിക്കുക."
+    },
+    {
+        "id": "rubber-tapping",
+        "crop": "rubber",
+        "problem": "harvest",
+        "season": "all",
+        "keywords": "tapping latex rain guard panel yield tap",
+        "text_en": "Tap rubber trees early in the morning when latex flow is highest. Fix rain guards to continue tapping in the monsoon, do not tap wet panels and rest the trees during peak summer leaf fall.",
+        "text_ml": "പാൽ ഒഴുക്ക് കൂടുതലുള്ള അതിരാവിലെ റബ്ബർ ടാപ്പ് ചെയ്യുക. മഴക്കാലത്ത് ടാപ്പിംഗ് തുടരാൻ റെയിൻ ഗാർഡ് ഘടിപ്പിക്കുക, നനഞ്ഞ പട്ടയിൽ ടാപ്പ് ചെയ്യരുത്, വേനലിൽ ഇല പൊഴിയുമ്പോൾ മരങ്ങൾക്ക് വിശ്രമം നൽകുക."
+    },
+    {
+        "id": "banana-pseudostem-weevil",
+        "crop": "banana",
+        "problem": "pest",
+        "season": "all",
+        "keywords": "pseudostem weevil stem borer gum holes insect pest vazha",
+        "text_en": "Banana pseudostem weevil makes holes in the stem with gummy exudate. Remove dried leaves, keep the field clean, set split pseudostem traps and apply neem cake at planting.",
+        "text_ml": "വാഴയിലെ തടതുരപ്പൻ പുഴു തടയിൽ പശ ഒലിക്കുന്ന ദ്വാരങ്ങൾ ഉണ്ടാക്കുന്നു. ഉണങ്ങിയ ഇലകൾ നീക്കം ചെയ്യുക, തോട്ടം വൃത്തിയായി സൂക്ഷിക്കുക, പിളർന്ന വാഴത്തട കെണികൾ വയ്ക്കുക, നടുമ്പോൾ വേപ്പിൻപിണ്ണാക്ക് ചേർക്കുക."
+    },
+    {
+        "id": "banana-nutrition-wind",
+        "crop": "banana",
+        "problem": "fertilizer",
+        "season": "monsoon",
+        "keywords": "fertilizer manure potash wind propping support toppling valam",
+        "text_en": "Give each banana plant 10 kg of organic manure at planting and nitrogen and potash in monthly splits until flowering. Prop the plants with poles before the monsoon winds to stop them toppling.",
+        "text_ml": "നടുമ്പോൾ ഓരോ വാഴയ്ക്കും 10 കി.ഗ്രാം ജൈവവളം നൽകുക, കുലയ്ക്കുന്നത് വരെ മാസംതോറും നൈട്രജനും പൊട്ടാഷും നൽകുക. കാലവർഷക്കാറ്റിൽ മറിഞ്ഞുവീഴാതിരിക്കാൻ മുമ്പേ താങ്ങുകാലുകൾ നൽകുക."
+    },
+    {
+        "id": "banana-sigatoka",
+        "crop": "banana",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "sigatoka leaf spot yellow streak brown spots disease",
+        "text_en": "Sigatoka leaf spot shows yellow streaks that turn into brown spots on banana leaves, mostly in the rainy months. Remove and burn affected leaves and spray Pseudomonas or 1% Bordeaux mixture.",
+        "text_ml": "സിഗട്ടോക്ക ഇലപ്പുള്ളി രോഗം വാഴയിലകളിൽ മഞ്ഞ വരകളായി തുടങ്ങി തവിട്ട് പാടുകളായി മാറുന്നു, കൂടുതലും മഴക്കാലത്ത്. ബാധിച്ച ഇലകൾ മുറിച്ച് കത്തിക്കുക, സ്യൂഡോമോണാസോ 1% ബോർഡോ മിശ്രിതമോ തളിക്കുക."
+    },
+    {
+        "id": "brinjal-shoot-fruit-borer",
+        "crop": "brinjal",
+        "problem": "pest",
+        "season": "all",
+        "keywords": "shoot fruit borer wilting shoot holes fruit worm insect pest vazhuthana",
+        "text_en": "Brinjal shoot and fruit borer causes wilting shoots and holes in the fruits. Clip and destroy affected shoots, use pheromone traps and spray 5% neem seed kernel extract every 10-15 days.",
+        "text_ml": "വഴുതനയിലെ തണ്ട്-കായ് തുരപ്പൻ പുഴു തളിരുകൾ വാടാനും കായ്കളിൽ ദ്വാരങ്ങൾക്കും കാരണമാകുന്നു. ബാധിച്ച തളിരുകൾ മുറിച്ച് നശിപ്പിക്കുക, ഫിറമോൺ കെണികൾ ഉപയോഗിക്കുക, 10-15 ദിവസത്തിലൊരിക്കൽ 5% വേപ്പിൻകുരു സത്ത് തളിക്കുക."
+    },
+    {
+        "id": "brinjal-bacterial-wilt",
+        "crop": "brinjal",
+        "problem": "disease",
+        "season": "all",
+        "keywords": "bacterial wilt sudden wilting laterite acidic soil disease",
+        "text_en": "Bacterial wilt makes brinjal plants wilt suddenly and is common in acidic laterite soil. Apply lime, grow resistant varieties such as Surya or Haritha and drench the soil with Pseudomonas fluorescens.",
+        "text_ml": "ബാക്ടീരിയൽ വാട്ടം വഴുതനച്ചെടികൾ പെട്ടെന്ന് വാടാൻ കാരണമാകുന്നു, അമ്ലത കൂടിയ വെട്ടുകൽ മണ്ണിൽ സാധാരണമാണ്. കുമ്മായം ചേർക്കുക, സൂര്യ, ഹരിത പോലുള്ള പ്രതിരോധ ഇനങ്ങൾ കൃഷി ചെയ്യുക, സ്യൂഡോമോണാസ് ഫ്ലൂറസെൻസ് മണ്ണിൽ ഒഴിക്കുക."
+    },
+    {
+        "id": "pepper-quick-wilt",
+        "crop": "pepper",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "quick wilt foot rot dhruthavaattam vine wilting yellowing drainage trichoderma",
+        "text_en": "Quick wilt (foot rot) of black pepper spreads in the monsoon. Improve drainage, apply Trichoderma-enriched cow dung at the base and spray 1% Bordeaux mixture on the vines before and during the monsoon.",
+        "text_ml": "കുരുമുളകിലെ ദ്രുതവാട്ടം കാലവർഷക്കാലത്ത് പടരുന്നു. നീർവാർച്ച മെച്ചപ്പെടുത്തുക, ചുവട്ടിൽ ട്രൈക്കോഡെർമ ചേർത്ത ചാണകം ഇടുക, മഴയ്ക്ക് മുമ്പും മഴക്കാലത്തും കൊടികളിൽ 1% ബോർഡോ മിശ്രിതം തളിക്കുക."
+    },
+    {
+        "id": "pepper-pollu-beetle",
+        "crop": "pepper",
+        "problem": "pest",
+        "season": "monsoon",
+        "keywords": "pollu beetle hollow berries insect pest neem",
+        "text_en": "Pollu beetle makes pepper berries hollow. Spray neem oil emulsion in July and September and keep the shade in the plantation light.",
+        "text_ml": "പൊള്ളുവണ്ട് കുരുമുളക് മണികൾ പൊള്ളയാക്കുന്നു. ജൂലൈയിലും സെപ്റ്റംബറിലും വേപ്പെണ്ണ എമൽഷൻ തളിക്കുക, തോട്ടത്തിലെ തണൽ കുറച്ച് നിലനിർത്തുക."
+    },
+    {
+        "id": "cardamom-thrips",
+        "crop": "cardamom",
+        "problem": "pest",
+        "season": "summer",
+        "keywords": "thrips scab capsule insect pest elam",
+        "text_en": "Cardamom thrips cause scabs on the capsules and multiply in the summer months. Regulate shade, remove dried clumps and spray neem-based formulations.",
+        "text_ml": "ഏലത്തിലെ ഇലപ്പേൻ കായ്കളിൽ പൊറ്റ ഉണ്ടാക്കുന്നു, വേനൽമാസങ്ങളിൽ പെരുകുന്നു. തണൽ ക്രമീകരിക്കുക, ഉണങ്ങിയ ചിനപ്പുകൾ നീക്കം ചെയ്യുക, വേപ്പ് അടിസ്ഥാനമാക്കിയ കീടനാശിനികൾ തളിക്കുക."
+    },
+    {
+        "id": "cardamom-capsule-rot",
+        "crop": "cardamom",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "capsule rot azhukal rotting heavy rain disease drainage",
+        "text_en": "Capsule rot (azhukal) of cardamom comes with heavy monsoon rain. Remove infected parts, improve drainage, apply Trichoderma and spray 1% Bordeaux mixture before the monsoon.",
+        "text_ml": "ഏലത്തിലെ അഴുകൽ രോഗം കനത്ത കാലവർഷമഴയോടൊപ്പം വരുന്നു. രോഗം ബാധിച്ച ഭാഗങ്ങൾ നീക്കം ചെയ്യുക, നീർവാർച്ച മെച്ചപ്പെടുത്തുക, ട്രൈക്കോഡെർമ പ്രയോഗിക്കുക, മഴയ്ക്ക് മുമ്പ് 1% ബോർഡോ മിശ്രിതം തളിക്കുക."
+    },
+    {
+        "id": "ginger-soft-rot",
+        "crop": "ginger",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "soft rot rhizome rot yellowing waterlogging disease inchi",
+        "text_en": "Soft rot of ginger yellows the plants and rots the rhizomes in waterlogged soil. Use healthy seed rhizomes treated with Trichoderma, plant on raised beds and keep drainage good.",
+        "text_ml": "ഇഞ്ചിയിലെ മൃദുചീയൽ വെള്ളക്കെട്ടുള്ള മണ്ണിൽ ചെടികൾ മഞ്ഞളിക്കാനും കിഴങ്ങുകൾ ചീയാനും കാരണമാകുന്നു. ട്രൈക്കോഡെർമ കൊണ്ട് പരിചരിച്ച ആരോഗ്യമുള്ള വിത്തിഞ്ചി ഉപയോഗിക്കുക, ഉയർന്ന വാരങ്ങളിൽ നടുക, നല്ല നീർവാർച്ച ഉറപ്പാക്കുക."
+    },
+    {
+        "id": "ginger-planting",
+        "crop": "ginger",
+        "problem": "planting",
+        "season": "summer",
+        "keywords": "planting sowing time raised bed mulch green leaves",
+        "text_en": "Plant ginger in April-May with the first pre-monsoon showers on raised beds. Mulch heavily with green leaves right after planting and again at 45 and 90 days.",
+        "text_ml": "ഏപ്രിൽ-മെയ് മാസത്തിൽ ആദ്യ വേനൽമഴയോടെ ഉയർന്ന വാരങ്ങളിൽ ഇഞ്ചി നടുക. നട്ട ഉടനെയും 45, 90 ദിവസങ്ങളിലും പച്ചിലകൾ കൊണ്ട് നന്നായി പുതയിടുക."
+    },
+    {
+        "id": "turmeric-planting-leaf-spot",
+        "crop": "turmeric",
+        "problem": "disease",
+        "season": "monsoon",
+        "keywords": "leaf spot leaf blotch planting raised bed disease manjal",
+        "text_en": "Plant turmeric on raised beds in April-May with the pre-monsoon showers. For leaf spot and leaf blotch, remove affected leaves and spray 1% Bordeaux mixture.",
+        "text_ml": "ഏപ്രിൽ-മെയ് മാസത്തിൽ വേനൽമഴയോടെ ഉയർന്ന വാരങ്ങളിൽ മഞ്ഞൾ നടുക. ഇലപ്പുള്ളി, ഇലകരിച്ചിൽ എന്നിവയ്ക്ക് ബാധിച്ച ഇലകൾ നീക്കം ചെയ്ത് 1% ബോർഡോ മിശ്രിതം തളിക്കുക."
+    },
+    {
+        "id": "general-pest",
+        "crop": "general",
+        "problem": "pest",
+        "season": "all",
+        "keywords": "pest bug insect keedam neem oil spray control കീടം കീടങ്ങൾ",
+        "text_en": "For pest control, I recommend using neem oil spray in the evening. Check plants regularly and remove affected parts. Avoid chemical pesticides if possible.",
+        "text_ml": "കീടനിയന്ത്രണത്തിന് വൈകുന്നേരം വേപ്പെണ്ണ തളിക്കുന്നത് നല്ലതാണ്. ചെടികൾ പതിവായി പരിശോധിച്ച് ബാധിച്ച ഭാഗങ്ങൾ നീക്കം ചെയ്യുക. കഴിയുന്നതും രാസകീടനാശിനികൾ ഒഴിവാക്കുക."
+    },
+    {
+        "id": "general-weather",
+        "crop": "general",
+        "problem": "weather",
+        "season": "monsoon",
+        "keywords": "weather rain forecast monsoon drainage kalavastha mazha കാലാവസ്ഥ മഴ",
+        "text_en": "Monitor weather forecasts regularly. Avoid applying fertilizers or pesticides before expected rain. Ensure proper drainage during monsoon season.",
+        "text_ml": "കാലാവസ്ഥാ പ്രവചനങ്ങൾ പതിവായി ശ്രദ്ധിക്കുക. മഴ പ്രതീക്ഷിക്കുന്നതിന് മുമ്പ് വളമോ കീടനാശിനിയോ പ്രയോഗിക്കരുത്. മഴക്കാലത്ത് ശരിയായ നീർവാർച്ച ഉറപ്പാക്കുക."
+    },
+    {
+        "id": "general-fertilizer",
+        "crop": "general",
+        "problem": "fertilizer",
+        "season": "all",
+        "keywords": "fertilizer manure compost cow dung organic valam വളം",
+        "text_en": "Use organic fertilizers like compost and cow dung. Apply during early morning or evening. Avoid over-fertilization which can harm plants.",
+        "text_ml": "കമ്പോസ്റ്റ്, ചാണകം തുടങ്ങിയ ജൈവവളങ്ങൾ ഉപയോഗിക്കുക. അതിരാവിലെയോ വൈകുന്നേരമോ വളം നൽകുക. അമിതമായ വളപ്രയോഗം ചെടികൾക്ക് ദോഷം ചെയ്യും."
+    },
+    {
+        "id": "general-water",
+        "crop": "general",
+        "problem": "irrigation",
+        "season": "all",
+        "keywords": "water irrigation watering moisture mulching jalam nana ജലം വെള്ളം നന",
+        "text_en": "Water plants early morning or late evening. Maintain consistent soil moisture. Use mulching to reduce water evaporation.",
+        "text_ml": "അതിരാവിലെയോ വൈകുന്നേരമോ ചെടികൾ നനയ്ക്കുക. മണ്ണിലെ ഈർപ്പം സ്ഥിരമായി നിലനിർത്തുക. ബാഷ്പീകരണം കുറയ്ക്കാൻ പുതയിടുക."
+    },
+    {
+        "id": "general-laterite-soil",
+        "crop": "general",
+        "problem": "soil",
+        "season": "all",
+        "keywords": "laterite soil acidic lime dolomite soil test organic matter vettukal mannu",
+        "text_en": "Laterite soils in Kerala are acidic and low in nutrients. Apply lime or dolomite based on a soil test, add plenty of organic matter such as compost and green manure, and mulch to hold moisture.",
+        "text_ml": "കേരളത്തിലെ വെട്ടുകൽ മണ്ണ് അമ്ലതയുള്ളതും പോഷകങ്ങൾ കുറഞ്ഞതുമാണ്. മണ്ണ് പരിശോധനയനുസരിച്ച് കുമ്മായമോ ഡോളോമൈറ്റോ ചേർക്കുക, കമ്പോസ്റ്റ്, പച്ചിലവളം തുടങ്ങിയ ജൈവവസ്തുക്കൾ ധാരാളം നൽകുക, ഈർപ്പം നിലനിർത്താൻ പുതയിടുക."
+    },
+    {
+        "id": "general-heavy-rain",
+        "crop": "general",
+        "problem": "weather",
+        "season": "monsoon",
+        "keywords": "heavy rain flood waterlogging storm spray wash drainage",
+        "text_en": "During heavy rain do not spray pesticides or apply fertilizers, as they will be washed away. Clear drainage channels, support tall plants and harvest mature produce early.",
+        "text_ml": "കനത്ത മഴയുള്ളപ്പോൾ കീടനാശിനി തളിക്കുകയോ വളം ഇടുകയോ ചെയ്യരുത്, അവ ഒലിച്ചുപോകും. നീർച്ചാലുകൾ വൃത്തിയാക്കുക, ഉയരമുള്ള ചെടികൾക്ക് താങ്ങ് നൽകുക, വിളഞ്ഞവ നേരത്തെ വിളവെടുക്കുക."
+    },
+    {
+        "id": "general-summer-heat",
+        "crop": "general",
+        "problem": "weather",
+        "season": "summer",
+        "keywords": "summer heat hot temperature drought shade venal choodu",
+        "text_en": "In summer heat irrigate in the early morning or evening, mulch the soil, give young plants partial shade and avoid applying fertilizer in the hottest hours.",
+        "text_ml": "വേനൽച്ചൂടിൽ അതിരാവിലെയോ വൈകുന്നേരമോ നനയ്ക്കുക, മണ്ണിൽ പുതയിടുക, ഇളം ചെടികൾക്ക് ഭാഗികമായി തണൽ നൽകുക, ചൂട് കൂടിയ സമയത്ത് വളം ഇടരുത്."
+    }
+]
@@ -0,0 +1,126 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+import asyncio
+import time
+import logging
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app.core.config import settings
+from app.database import db
+from app.services import alert_counters
+from app.services.alert_events import alert_events
+
+logger = logging.getLogger(__name__)
+
+class AlertArchiver:
+    """Move expired alerts out of the live alerts collection.
+
+    Deleted alerts stay until they expire too, so their fingerprint keeps the
+    generator from recreating them within the same window. Archived alerts
+    are kept in alerts_archive for analytics until its own TTL index removes
+    them. The TTL index on alerts.expires_at, with a grace period, only
+    catches what this job misses; the counter reconcile covers those.
+    """
+
+    def __init__(self):
+        self.interval = settings.ALERT_ARCHIVE_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._last_reconcile: Optional[float] = None
+        self._stats = {
+            "runs": 0, "archived": 0, "counters_reconciled": 0,
+            "last_run_at": None, "last_run_seconds": 0.0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info("🗄️ Alert archiver scheduled")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Alert archiver error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        """Archive expired alerts in batches"""
+        if db.database is None:
+            return
+
+        started = time.perf_counter()
+        archived = 0
+        query = {"expires_at": {"$lte": datetime.utcnow()}}
+        while True:
+            count = await self._archive_batch(query)
+            archived += count
+            if count < settings.ALERT_ARCHIVE_BATCH:
+                break
+
+        self._stats["runs"] += 1
+        self._stats["archived"] += archived
+        self._stats["last_run_at"] = datetime.utcnow().isoformat()
+        self._stats["last_run_seconds"] = round(time.perf_counter() - started, 2)
+        if archived:
+            logger.info(f"🗄️ Archived {archived} alerts")
+        
+        # The first run always reconciles; the monotonic clock may start near zero
+        if self._last_reconcile is None or \
+                time.monotonic() - self._last_reconcile >= settings.ALERT_COUNTER_RECONCILE_SECONDS:
+            await self.reconcile_counters()
+
+    async def reconcile_counters(self):
+        """Heal counter drift, including alerts the TTL index removed"""
+        self._last_reconcile = time.monotonic()
+        corrected = await alert_counters.reconcile(db.database)
+        self._stats["counters_reconciled"] += len(corrected)
+        if corrected:
+            logger.info(f"🗄️ Reconciled alert counters for {len(corrected)} users")
+        for user_id in corrected:
+            await alert_events.notify_unread_changed(user_id)
+
+    async def _archive_batch(self, query: Dict[str, Any]) -> int:
+        database = db.database
+        alerts = await database.alerts.find(query).limit(settings.ALERT_ARCHIVE_BATCH).to_list(
+            length=settings.ALERT_ARCHIVE_BATCH
+        )
+        if not alerts:
+            return 0
+
+        # Upsert by _id so a batch interrupted before the delete can be re-run
+        now = datetime.utcnow()
+        await database.alerts_archive.bulk_write(
+            [ReplaceOne({"_id": alert["_id"]}, {**alert, "archived_at": now}, upsert=True) for alert in alerts],
+            ordered=False
+        )
+        await database.alerts.delete_many({"_id": {"$in": [alert["_id"] for alert in alerts]}})
+
+        # Alerts still active when they expired were counted; deleted ones already were not
+        unread = Counter(a["user_id"] for a in alerts if a.get("is_active") and not a.get("is_read"))
+        total = Counter(a["user_id"] for a in alerts if a.get("is_active"))
+        if total:
+            await database.alert_counters.bulk_write([
+                UpdateOne({"_id": user_id}, {"$inc": {"unread": -unread[user_id], "total": -count}})
+                for user_id, count in total.items()
+            ], ordered=False)
+            for user_id in unread:
+                await alert_events.notify_unread_changed(user_id)
+        return len(alerts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+# Global instance
+alert_archiver = AlertArchiver()
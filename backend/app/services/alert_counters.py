@@ -0,0 +1,121 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+from pymongo import ReturnDocument, UpdateOne
+
+# Per-user counts of active personal alerts, kept in alert_counters so listing
+# alerts does not need count_documents. Broadcast alerts are counted at read time.
+#
+# Writers only $inc counters that already exist. A user without one is seeded
+# from a real count instead, which already includes the write being recorded;
+# a blind upsert would start the counter at the delta and leave the user's
+# older alerts out for good. reconcile() corrects whatever drift remains, such
+# as alerts removed by the TTL index.
+
+async def _count(db, user_id: str) -> Dict[str, int]:
+    return {
+        "unread": await db.alerts.count_documents({"user_id": user_id, "is_active": True, "is_read": False}),
+        "total": await db.alerts.count_documents({"user_id": user_id, "is_active": True})
+    }
+
+async def _seed(db, user_id: str) -> dict:
+    """Create a user's counter from the alerts, unless another writer got there first"""
+    return await db.alert_counters.find_one_and_update(
+        {"_id": user_id},
+        {"$setOnInsert": await _count(db, user_id)},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+async def increment(db, user_id: str, unread: int = 0, total: int = 0):
+    """Atomically adjust a user's unread and total alert counts"""
+    if unread or total:
+        result = await db.alert_counters.update_one(
+            {"_id": user_id},
+            {"$inc": {"unread": unread, "total": total}}
+        )
+        if result.matched_count == 0:
+            await _seed(db, user_id)
+
+async def increment_for_new_alerts(db, alerts: Iterable[dict]):
+    """Count freshly inserted unread alerts, one counter update per user"""
+    per_user = Counter(alert["user_id"] for alert in alerts)
+    if not per_user:
+        return
+    await db.alert_counters.bulk_write([
+        UpdateOne({"_id": user_id}, {"$inc": {"unread": count, "total": count}})
+        for user_id, count in per_user.items()
+    ], ordered=False)
+    existing = {
+        counter["_id"] async for counter in db.alert_counters.find({"_id": {"$in": list(per_user)}}, {"_id": 1})
+    }
+    missing = [user_id for user_id in per_user if user_id not in existing]
+    if missing:
+        await _seed_many(db, missing)
+
+async def _seed_many(db, user_ids: List[str]):
+    """Seed several users' counters with one aggregation and one bulk write.
+
+    Callers pass one write batch of alerts, which bounds the $in list.
+    """
+    counted = await db.alerts.aggregate([
+        {"$match": {"user_id": {"$in": user_ids}, "is_active": True}},
+        {"$group": {
+            "_id": "$user_id",
+            "total": {"$sum": 1},
+            "unread": {"$sum": {"$cond": [{"$eq": ["$is_read", False]}, 1, 0]}}
+        }}
+    ]).to_list(length=None)
+    counted_by_user = {item["_id"]: item for item in counted}
+    await db.alert_counters.bulk_write([
+        UpdateOne(
+            {"_id": user_id},
+            {"$setOnInsert": {
+                "unread": counted_by_user.get(user_id, {}).get("unread", 0),
+                "total": counted_by_user.get(user_id, {}).get("total", 0)
+            }},
+            upsert=True
+        )
+        for user_id in user_ids
+    ], ordered=False)
+
+async def get_counts(db, user_id: str) -> Dict[str, int]:
+    """Read a user's counts, initializing them from the alerts on first use"""
+    counter = await db.alert_counters.find_one({"_id": user_id})
+    if counter is None:
+        counter = await _seed(db, user_id)
+    # Racing writers can dip a counter below zero until the next reconcile
+    return {"unread": max(0, counter.get("unread", 0)), "total": max(0, counter.get("total", 0))}
+
+async def reconcile(db) -> List[str]:
+    """Correct every counter against the active alerts; returns the users corrected.
+
+    Corrections are applied as $inc of the drift measured against a read taken
+    before the recount, so writes that land after the recount are kept. A
+    write landing during the recount is counted twice until the next run.
+    """
+    before = {counter["_id"]: counter async for counter in db.alert_counters.find({})}
+    actual = await db.alerts.aggregate([
+        {"$match": {"is_active": True}},
+        {"$group": {
+            "_id": "$user_id",
+            "total": {"$sum": 1},
+            "unread": {"$sum": {"$cond": [{"$eq": ["$is_read", False]}, 1, 0]}}
+        }}
+    ]).to_list(length=None)
+    actual_by_user = {item["_id"]: item for item in actual}
+
+    corrected: List[str] = []
+    requests: List[UpdateOne] = []
+    for user_id in set(before) | set(actual_by_user):
+        counted = before.get(user_id, {})
+        real = actual_by_user.get(user_id, {})
+        drift = {
+            field: real.get(field, 0) - counted.get(field, 0)
+            for field in ("unread", "total")
+        }
+        if any(drift.values()):
+            corrected.append(user_id)
+            requests.append(UpdateOne({"_id": user_id}, {"$inc": drift}, upsert=True))
+    if requests:
+        await db.alert_counters.bulk_write(requests, ordered=False)
+    return corrected
@@ -0,0 +1,371 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import time
+import logging
+
+import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.database import db
+from app.models.alert import PRIORITY_RANK
+from app.services import alert_counters
+from app.services.alert_events import alert_events
+from app.services.weather_service import weather_service
+from app.services.weather_prefetch import farm_coordinates
+
+logger = logging.getLogger(__name__)
+
+CROPS = ("paddy", "coconut", "rubber", "banana", "brinjal", "pepper", "cardamom", "ginger", "turmeric")
+CROP_INDEX = {crop: index for index, crop in enumerate(CROPS)}
+
+# 3-hourly forecast slots looked at: 48 hours
+FORECAST_SLOTS = 16
+
+# Rain expected over the next 24 hours (mm) that triggers a heavy rain alert
+HEAVY_RAIN_MM = 40.0
+
+# Day temperature (°C) above which each crop suffers heat stress
+HEAT_STRESS_C = {
+    "paddy": 35, "coconut": 38, "rubber": 36, "banana": 36, "brinjal": 35,
+    "pepper": 34, "cardamom": 31, "ginger": 33, "turmeric": 35
+}
+
+# A spray window is a dry 3-hour slot in the next 24 hours with wind below
+# this speed (m/s), on a day with little rain overall
+SPRAY_MAX_WIND = 4.0
+SPRAY_MAX_RAIN_MM = 5.0
+SPRAY_CROPS = ("paddy", "banana", "brinjal", "pepper", "cardamom", "ginger")
+
+HEAVY_RAIN_SOIL_ADVICE = {
+    "laterite": "Laterite soil drains fast and fertilizer will wash away.",
+    "alluvial": "Clear field drains to prevent waterlogging.",
+    "coastal": "Sandy coastal soil loses nutrients quickly; check bunds.",
+    "forest": "Watch slopes for soil erosion."
+}
+
+# Standing reminders, only sent when a farmer asks for alerts
+CROP_REMINDERS = {
+    "paddy": {
+        "type": "irrigation",
+        "priority": "medium",
+        "title": "Irrigation Reminder",
+        "message": "Maintain water level in paddy fields. Check for proper drainage."
+    },
+    "coconut": {
+        "type": "pest",
+        "priority": "medium",
+        "title": "Pest Alert",
+        "message": "Check coconut trees for red palm weevil. Look for holes in trunk."
+    }
+}
+
+# Severity bands: each doubling of the rain total, and every 2°C further
+# above a crop's heat limit, is a new alert even within the same window
+HEAT_BAND_C = 2.0
+
+# Alerts with the same content are stored once per window
+WEATHER_ALERT_WINDOW = timedelta(days=1)
+REMINDER_WINDOW = timedelta(days=7)
+
+DUPLICATE_KEY = 11000
+
+FARM_PROJECTION = {
+    "user_id": 1, "location": 1, "coordinates": 1, "current_crop": 1, "soil_type": 1, "irrigation": 1
+}
+
+def alert_fingerprint(*parts: Any, window: timedelta, at: datetime) -> str:
+    """Deterministic content hash, identical for the same parts within one window.
+
+    Windows are aligned to the epoch, so every run in the same window agrees.
+    """
+    bucket = int(at.timestamp() // window.total_seconds())
+    content = "|".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(f"{content}|{int(window.total_seconds())}:{bucket}".encode()).hexdigest()
+
+def rain_band(rain_mm: float) -> int:
+    """0 for HEAVY_RAIN_MM up to twice that, 1 up to four times, and so on"""
+    return max(0, int(np.floor(np.log2(rain_mm / HEAVY_RAIN_MM))))
+
+def heat_band(temp_c: float, limit_c: float) -> int:
+    return max(0, int((temp_c - limit_c) // HEAT_BAND_C))
+
+def _farm_location(farm: Dict[str, Any]) -> Optional[Tuple[str, Optional[str], Optional[float], Optional[float]]]:
+    lat, lon = farm_coordinates(farm)
+    location = farm.get("location")
+    if not location and lat is None:
+        return None
+    key, _ = weather_service.resolve_location(location, lat, lon)
+    return key, location, lat, lon
+
+class AlertEngine:
+    """Weather-driven alert rules evaluated for all active farms in one batch.
+
+    Forecasts are read from the prefetched weather snapshots, reduced to
+    per-location features, and the rules are applied to every farm at once
+    with NumPy masks. Alerts are written with chunked bulk_write calls.
+    """
+
+    def __init__(self):
+        self.interval = settings.ALERT_ENGINE_INTERVAL_SECONDS
+        self.evaluation_latency = LatencyStats()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "runs": 0,
+            "farms": 0,
+            "alerts_written": 0,
+            "duplicates_skipped": 0,
+            "last_run_at": None,
+            "last_run_seconds": 0.0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info("🔔 Alert engine scheduled")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Alert engine error: {e}")
+
+    async def run_once(self):
+        """Evaluate the rules for every active farm and store the alerts"""
+        if db.database is None:
+            return
+
+        started = time.perf_counter()
+        farms = await db.database.farms.find(
+            {"is_active": True}, FARM_PROJECTION, batch_size=5000
+        ).to_list(length=None)
+
+        keys = list({located[0] for located in map(_farm_location, farms) if located})
+        snapshots = await weather_service.get_snapshots(keys)
+        forecasts = {key: snapshot.get("forecast") for key, snapshot in snapshots.items()}
+
+        alerts = self.evaluate(farms, forecasts)
+        written = len(await self.write_alerts(alerts))
+
+        self._stats["runs"] += 1
+        self._stats["farms"] = len(farms)
+        self._stats["alerts_written"] += written
+        self._stats["last_run_at"] = datetime.utcnow().isoformat()
+        self._stats["last_run_seconds"] = round(time.perf_counter() - started, 2)
+        logger.info(f"🔔 Alert engine wrote {written} alerts for {len(farms)} farms")
+
+    async def generate_for_farm(self, farm: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Alerts for one farm, including its standing crop reminders"""
+        forecasts = {}
+        located = _farm_location(farm)
+        if located:
+            key, location, lat, lon = located
+            forecasts[key] = await weather_service.get_raw_forecast(location, lat, lon)
+        return self.evaluate([farm], forecasts, include_reminders=True)
+
+    async def write_alerts(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Upsert alerts by fingerprint in unordered bulk_write chunks.
+
+        Alerts already stored for the same window are left untouched. Returns
+        the newly inserted alerts, which are counted and pushed to clients.
+        """
+        inserted = []
+        chunk_size = settings.ALERT_ENGINE_WRITE_BATCH
+        for start in range(0, len(alerts), chunk_size):
+            chunk = alerts[start:start + chunk_size]
+            requests = [
+                UpdateOne(
+                    {"fingerprint": alert["fingerprint"]},
+                    {"$setOnInsert": {k: v for k, v in alert.items() if k != "fingerprint"}},
+                    upsert=True
+                )
+                for alert in chunk
+            ]
+            try:
+                result = await db.database.alerts.bulk_write(requests, ordered=False)
+                upserted = result.upserted_ids
+            except BulkWriteError as e:
+                # Concurrent runs can race on the same new fingerprint; the loser is a duplicate
+                if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                    raise
+                upserted = {item["index"]: item["_id"] for item in e.details["upserted"]}
+            
+            new_alerts = []
+            for index, alert_id in upserted.items():
+                chunk[index]["_id"] = alert_id
+                new_alerts.append(chunk[index])
+            self._stats["duplicates_skipped"] += len(chunk) - len(new_alerts)
+            await alert_counters.increment_for_new_alerts(db.database, new_alerts)
+            await alert_events.notify_alerts(new_alerts)
+            inserted.extend(new_alerts)
+        return inserted
+
+    def evaluate(
+        self,
+        farms: List[Dict[str, Any]],
+        forecasts: Dict[str, Optional[Dict[str, Any]]],
+        include_reminders: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Apply every rule to every farm and return the alert documents"""
+        started = time.perf_counter()
+        keys = list(forecasts)
+        key_index = {key: index for index, key in enumerate(keys)}
+        features = self._location_features([forecasts[key] for key in keys])
+
+        # Farms without a known location point at an extra "no forecast" row
+        no_forecast = len(keys)
+        location_index = np.array([
+            key_index.get(located[0], no_forecast) if located else no_forecast
+            for located in map(_farm_location, farms)
+        ], dtype=np.int64)
+        crop_index = np.array([CROP_INDEX.get(farm.get("current_crop"), -1) for farm in farms], dtype=np.int64)
+
+        has_forecast = np.append(features["has_forecast"], False)[location_index]
+        rain_24h = np.append(features["rain_24h"], 0.0)[location_index]
+        max_temp = np.append(features["max_temp_48h"], -np.inf)[location_index]
+        spray_window = np.append(features["spray_window"], False)[location_index]
+
+        # Unknown crops (index -1) pick the trailing +inf and never trigger
+        heat_limit = np.array([HEAT_STRESS_C[crop] for crop in CROPS] + [np.inf])[crop_index]
+        spray_crop = np.isin(crop_index, [CROP_INDEX[crop] for crop in SPRAY_CROPS])
+
+        heavy_rain = has_forecast & (rain_24h >= HEAVY_RAIN_MM)
+        heat_stress = has_forecast & (max_temp >= heat_limit)
+        spray = has_forecast & spray_window & spray_crop & ~heavy_rain
+
+        now = datetime.utcnow()
+        weather_expiry = now + timedelta(days=2)
+        alerts = []
+
+        for i in np.flatnonzero(heavy_rain).tolist():
+            farm = farms[i]
+            advice = HEAVY_RAIN_SOIL_ADVICE.get(farm.get("soil_type"), "")
+            alerts.append(self._alert(
+                farm, "heavy_rain", "weather", "high", "Heavy Rain Alert",
+                f"About {rain_24h[i]:.0f} mm of rain expected in {farm.get('location', 'your area')} "
+                f"in the next 24 hours. Avoid applying fertilizers. {advice}".strip(),
+                now, weather_expiry, WEATHER_ALERT_WINDOW, severity=rain_band(rain_24h[i])
+            ))
+
+        for i in np.flatnonzero(heat_stress).tolist():
+            farm = farms[i]
+            care = (
+                "Irrigate in the early morning or evening."
+                if farm.get("irrigation") else "Mulch around plants to keep the soil moist."
+            )
+            alerts.append(self._alert(
+                farm, "heat_stress", "weather", "high", "Heat Stress Alert",
+                f"Temperatures up to {max_temp[i]:.0f}°C expected in {farm.get('location', 'your area')} "
+                f"over the next 2 days, above what {farm['current_crop']} tolerates. {care}",
+                now, weather_expiry, WEATHER_ALERT_WINDOW, severity=heat_band(max_temp[i], heat_limit[i])
+            ))
+
+        for i in np.flatnonzero(spray).tolist():
+            farm = farms[i]
+            alerts.append(self._alert(
+                farm, "spray_window", "pest", "low", "Spray Window",
+                f"Dry, calm weather expected in {farm.get('location', 'your area')} in the next 24 hours: "
+                f"a good window to spray {farm['current_crop']} for pests or diseases.",
+                now, weather_expiry, WEATHER_ALERT_WINDOW
+            ))
+
+        if include_reminders:
+            for farm in farms:
+                reminder = CROP_REMINDERS.get(farm.get("current_crop"))
+                if reminder:
+                    alerts.append(self._alert(
+                        farm, f"{farm['current_crop']}_reminder", reminder["type"], reminder["priority"],
+                        reminder["title"], reminder["message"], now, now + REMINDER_WINDOW, REMINDER_WINDOW
+                    ))
+
+        self.evaluation_latency.record((time.perf_counter() - started) * 1000)
+        return alerts
+
+    def _location_features(self, payloads: List[Optional[Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+        """Per-location rain, heat and spray-window features from raw forecasts"""
+        count = len(payloads)
+        rain = np.zeros((count, FORECAST_SLOTS))
+        temp = np.full((count, FORECAST_SLOTS), -np.inf)
+        wind = np.full((count, FORECAST_SLOTS), np.inf)
+        has_forecast = np.zeros(count, dtype=bool)
+
+        # Snapshots can be a few hours old; skip slots that are already past
+        cutoff = time.time() - 3 * 3600
+        for i, data in enumerate(payloads):
+            if not data:
+                continue
+            slots = [item for item in data.get("list", []) if item["dt"] >= cutoff][:FORECAST_SLOTS]
+            if not slots:
+                continue
+            n = len(slots)
+            has_forecast[i] = True
+            rain[i, :n] = [item.get("rain", {}).get("3h", 0) for item in slots]
+            temp[i, :n] = [item["main"].get("temp_max", item["main"]["temp"]) for item in slots]
+            wind[i, :n] = [item.get("wind", {}).get("speed", 0) for item in slots]
+
+        next_day = slice(0, FORECAST_SLOTS // 2)
+        rain_24h = rain[:, next_day].sum(axis=1)
+        dry_calm_slot = ((rain[:, next_day] == 0) & (wind[:, next_day] <= SPRAY_MAX_WIND)).any(axis=1)
+        return {
+            "has_forecast": has_forecast,
+            "rain_24h": rain_24h,
+            "max_temp_48h": temp.max(axis=1),
+            "spray_window": dry_calm_slot & (rain_24h <= SPRAY_MAX_RAIN_MM)
+        }
+
+    def _alert(
+        self,
+        farm: Dict[str, Any],
+        rule: str,
+        alert_type: str,
+        priority: str,
+        title: str,
+        message: str,
+        created_at: datetime,
+        expires_at: datetime,
+        window: timedelta,
+        severity: int = 0
+    ) -> Dict[str, Any]:
+        # The severity band is part of the content, so an escalating forecast
+        # raises a new alert instead of being deduplicated into the weaker one
+        return {
+            "fingerprint": alert_fingerprint(
+                farm["user_id"], rule, alert_type, farm.get("current_crop"), farm.get("location"), severity,
+                window=window, at=created_at
+            ),
+            "severity": severity,
+            "user_id": farm["user_id"],
+            "type": alert_type,
+            "priority": priority,
+            "priority_rank": PRIORITY_RANK[priority],
+            "title": title,
+            "message": message,
+            "location": farm.get("location"),
+            "crop": farm.get("current_crop"),
+            "rule": rule,
+            "is_read": False,
+            "is_active": True,
+            "expires_at": expires_at,
+            "created_at": created_at
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "evaluation": self.evaluation_latency.snapshot()}
+
+# Global instance
+alert_engine = AlertEngine()
@@ -0,0 +1,209 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+class AlertSubscription:
+    """One connected client: a bounded event queue plus its unread counts"""
+
+    def __init__(self, user_id: str, target: Dict[str, Any], personal_unread: int, broadcast_unread: int,
+                 read_broadcasts: Iterable[Any] = ()):
+        self.user_id = user_id
+        self.target = target
+        self.personal_unread = personal_unread
+        self.broadcast_unread = broadcast_unread
+        # Broadcasts already read or dismissed, so a repeated state change is not counted twice
+        self.read_broadcasts = set(read_broadcasts)
+        self.queue: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue(maxsize=settings.ALERT_STREAM_QUEUE_SIZE)
+        self.dropped = 0
+
+    @property
+    def unread_count(self) -> int:
+        return max(0, self.personal_unread) + max(0, self.broadcast_unread)
+
+    def put(self, event: str, data: Any):
+        # A slow client loses its oldest events rather than holding memory
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((event, data))
+
+    def mark_broadcasts_read(self, alert_ids: Iterable[Any]) -> bool:
+        """Count broadcasts as read; returns whether the unread count changed"""
+        newly_read = set(alert_ids) - self.read_broadcasts
+        self.read_broadcasts |= newly_read
+        self.broadcast_unread -= len(newly_read)
+        return bool(newly_read)
+
+    def matches(self, broadcast: Dict[str, Any]) -> bool:
+        return all(
+            value is None or self.target.get(field) == value
+            for field, value in broadcast.get("target", {}).items()
+        )
+
+class AlertEventBus:
+    """In-process pub/sub that pushes new alerts and unread counts to clients.
+
+    In "local" mode the alert writers call the notify_* hooks directly, which
+    only reaches clients connected to this worker. In "change_stream" mode
+    (requires a replica set) each worker instead watches alerts,
+    broadcast_alerts, alert_counters and alert_states, so writes from any
+    worker or job reach every client.
+    """
+
+    def __init__(self):
+        self.mode = settings.ALERT_EVENTS_SOURCE
+        self._subscribers: Dict[str, Set[AlertSubscription]] = {}
+        self._watch_tasks: List[asyncio.Task] = []
+        self._stats = {"published": 0, "dropped": 0}
+
+    @property
+    def local_mode(self) -> bool:
+        return self.mode != "change_stream"
+
+    def subscribe(self, user_id: str, target: Dict[str, Any], personal_unread: int, broadcast_unread: int,
+                  read_broadcasts: Iterable[Any] = ()) -> AlertSubscription:
+        subscription = AlertSubscription(user_id, target, personal_unread, broadcast_unread, read_broadcasts)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription):
+        self._stats["dropped"] += subscription.dropped
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def _publish(self, subscription: AlertSubscription, event: str, data: Any):
+        subscription.put(event, data)
+        self._stats["published"] += 1
+
+    def _publish_unread(self, user_id: str, personal_unread: Optional[int] = None):
+        for subscription in self._subscribers.get(user_id, ()):
+            if personal_unread is not None:
+                subscription.personal_unread = personal_unread
+            self._publish(subscription, "unread_count", {"unread_count": subscription.unread_count})
+
+    async def _read_personal_unread(self, user_id: str) -> Optional[int]:
+        counter = await db.database.alert_counters.find_one({"_id": user_id}, {"unread": 1})
+        return counter.get("unread", 0) if counter else None
+
+    # Hooks called by the alert writers
+
+    async def notify_alerts(self, alerts: Iterable[Dict[str, Any]]):
+        """New personal alerts were inserted and counted"""
+        if not self.local_mode or not self._subscribers:
+            return
+        users = set()
+        for alert in alerts:
+            for subscription in self._subscribers.get(alert["user_id"], ()):
+                self._publish(subscription, "alert", alert)
+                users.add(alert["user_id"])
+        for user_id in users:
+            self._publish_unread(user_id, await self._read_personal_unread(user_id))
+
+    async def notify_unread_changed(self, user_id: str):
+        """A user's personal unread counter changed"""
+        if self.local_mode and self.has_subscribers(user_id):
+            self._publish_unread(user_id, await self._read_personal_unread(user_id))
+
+    def notify_broadcast(self, broadcast: Dict[str, Any]):
+        """A broadcast alert was created"""
+        if self.local_mode:
+            self._deliver_broadcast(broadcast)
+
+    def notify_broadcasts_read(self, user_id: str, alert_ids: List[Any]):
+        """The user read or dismissed broadcast alerts"""
+        if self.local_mode:
+            self._broadcasts_read(user_id, alert_ids)
+
+    def _broadcasts_read(self, user_id: str, alert_ids: List[Any]):
+        for subscription in self._subscribers.get(user_id, ()):
+            if subscription.mark_broadcasts_read(alert_ids):
+                self._publish(subscription, "unread_count", {"unread_count": subscription.unread_count})
+
+    def _deliver_broadcast(self, broadcast: Dict[str, Any]):
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                if subscription.matches(broadcast):
+                    subscription.broadcast_unread += 1
+                    self._publish(subscription, "alert", {**broadcast, "is_read": False, "is_broadcast": True})
+                    self._publish(subscription, "unread_count", {"unread_count": subscription.unread_count})
+
+    # Change stream mode
+
+    def start(self):
+        if self.local_mode or self._watch_tasks:
+            return
+        self._watch_tasks = [
+            asyncio.create_task(self._watch("alerts", [{"$match": {"operationType": "insert"}}], self._on_alert)),
+            asyncio.create_task(self._watch("broadcast_alerts", [{"$match": {"operationType": "insert"}}], self._on_broadcast)),
+            asyncio.create_task(self._watch(
+                "alert_counters",
+                [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+                self._on_counter
+            )),
+            asyncio.create_task(self._watch(
+                "alert_states",
+                [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+                self._on_broadcast_state
+            ))
+        ]
+        logger.info("📡 Watching alert change streams")
+
+    async def stop(self):
+        for task in self._watch_tasks:
+            task.cancel()
+        for task in self._watch_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._watch_tasks = []
+
+    async def _watch(self, collection: str, pipeline: List[Dict[str, Any]], handler):
+        while True:
+            try:
+                async with db.database[collection].watch(pipeline, full_document="updateLookup") as stream:
+                    async for change in stream:
+                        if change.get("fullDocument"):
+                            handler(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Alert change stream error ({collection}): {e}")
+                await asyncio.sleep(5)
+
+    def _on_alert(self, alert: Dict[str, Any]):
+        for subscription in self._subscribers.get(alert["user_id"], ()):
+            self._publish(subscription, "alert", alert)
+
+    def _on_broadcast(self, broadcast: Dict[str, Any]):
+        self._deliver_broadcast(broadcast)
+
+    def _on_counter(self, counter: Dict[str, Any]):
+        if self.has_subscribers(counter["_id"]):
+            self._publish_unread(counter["_id"], counter.get("unread", 0))
+
+    def _on_broadcast_state(self, state: Dict[str, Any]):
+        if state.get("is_read") or state.get("is_dismissed"):
+            self._broadcasts_read(state["user_id"], [state["alert_id"]])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "connected_users": len(self._subscribers),
+            "connections": sum(len(subscribers) for subscribers in self._subscribers.values())
+        }
+
+# Global instance
+alert_events = AlertEventBus()
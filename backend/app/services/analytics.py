@@ -0,0 +1,174 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import asyncio
+import time
+import logging
+
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.database import db
+from app.services import scheme_stats
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = "admin_overview"
+
+def bucket(value: Any) -> str:
+    """Snapshot map key for a district or crop; MongoDB field names cannot hold '.' or '$'"""
+    if value is None:
+        return "unknown"
+    return str(value).replace(".", "_").replace("$", "_")
+
+def _drift(before: Dict[str, Any], counted: Dict[str, Any]) -> Dict[str, float]:
+    """$inc fields that turn the stored counters into the recounted ones"""
+    drift = {}
+    for field, value in counted.items():
+        if isinstance(value, dict):
+            stored = before.get(field) or {}
+            for key in set(stored) | set(value):
+                change = value.get(key, 0) - stored.get(key, 0)
+                if change:
+                    drift[f"{field}.{key}"] = change
+        else:
+            change = value - before.get(field, 0)
+            if change:
+                drift[field] = change
+    return drift
+
+class AnalyticsSnapshot:
+    """Materialized admin dashboard figures in one analytics_snapshots document.
+
+    Writers keep the counters current with $inc (signup, farm save, activity
+    add/delete, scheme application). A periodic full recount corrects any
+    drift and refreshes figures that cannot be maintained incrementally, such
+    as farmers active in the last 30 days. The same recount reconciles the
+    per-month scheme application counters.
+    """
+
+    def __init__(self):
+        self.interval = settings.ANALYTICS_REFRESH_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+        self._stats = {
+            "refreshes": 0, "increments": 0, "errors": 0,
+            "scheme_counters_corrected": 0, "last_refresh_seconds": 0.0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info("📈 Analytics snapshot refresh scheduled")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Analytics refresh error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def get(self) -> Dict[str, Any]:
+        """The snapshot document, built on first use"""
+        snapshot = await db.database.analytics_snapshots.find_one({"_id": SNAPSHOT_ID})
+        if snapshot is None:
+            snapshot = await self.refresh()
+        return snapshot
+
+    async def increment(self, changes: Dict[str, float]):
+        """Apply write-time counter changes; never fails the caller's request"""
+        changes = {field: value for field, value in changes.items() if value}
+        if not changes or db.database is None:
+            return
+        try:
+            # No upsert: a partial document would report wrong totals until the next refresh
+            await db.database.analytics_snapshots.update_one(
+                {"_id": SNAPSHOT_ID},
+                {"$inc": changes, "$set": {"updated_at": datetime.utcnow()}}
+            )
+            self._stats["increments"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Analytics increment error: {e}")
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Recount everything from the source collections.
+
+        The recount is applied as $inc of its difference from the snapshot
+        read just before it, so increments that land after the recount are
+        kept rather than overwritten. An increment landing while the recount
+        runs is counted twice until the next refresh.
+        """
+        async with self._refresh_lock:
+            started = time.perf_counter()
+            database = db.database
+            before = await database.analytics_snapshots.find_one({"_id": SNAPSHOT_ID})
+            thirty_days_ago = time.time() - (30 * 24 * 60 * 60)
+            (
+                total_farmers, active_farmers, land_result, total_activities,
+                total_applications, approved_applications, district_data, crop_data
+            ) = await asyncio.gather(
+                database.users.count_documents({"role": "farmer"}),
+                database.users.count_documents({"role": "farmer", "last_login": {"$gte": thirty_days_ago}}),
+                database.farms.aggregate([
+                    {"$match": {"is_active": True}},
+                    {"$group": {"_id": None, "total_land": {"$sum": "$land_size"}}}
+                ]).to_list(length=1),
+                database.activities.count_documents({"is_deleted": False}),
+                database.scheme_applications.count_documents({}),
+                database.scheme_applications.count_documents({"status": "approved"}),
+                database.users.aggregate([
+                    {"$match": {"role": "farmer"}},
+                    {"$group": {"_id": "$district", "count": {"$sum": 1}}}
+                ]).to_list(length=None),
+                database.farms.aggregate([
+                    {"$match": {"is_active": True}},
+                    {"$group": {"_id": "$current_crop", "count": {"$sum": 1}}}
+                ]).to_list(length=None)
+            )
+
+            now = datetime.utcnow()
+            counted = {
+                "total_farmers": total_farmers,
+                "total_land_area": land_result[0]["total_land"] if land_result else 0,
+                "total_activities": total_activities,
+                "total_applications": total_applications,
+                "approved_applications": approved_applications,
+                "by_district": {bucket(item["_id"]): item["count"] for item in district_data},
+                "by_crop": {bucket(item["_id"]): item["count"] for item in crop_data}
+            }
+            # Not maintained by writers, so simply set
+            recount_only = {"active_farmers": active_farmers, "refreshed_at": now, "updated_at": now}
+
+            if before is None:
+                snapshot = {"_id": SNAPSHOT_ID, **counted, **recount_only}
+                await database.analytics_snapshots.replace_one({"_id": SNAPSHOT_ID}, snapshot, upsert=True)
+            else:
+                update: Dict[str, Any] = {"$set": recount_only}
+                drift = _drift(before, counted)
+                if drift:
+                    update["$inc"] = drift
+                snapshot = await database.analytics_snapshots.find_one_and_update(
+                    {"_id": SNAPSHOT_ID}, update, return_document=ReturnDocument.AFTER
+                )
+            self._stats["scheme_counters_corrected"] += await scheme_stats.reconcile(database)
+
+            self._stats["refreshes"] += 1
+            self._stats["last_refresh_seconds"] = round(time.perf_counter() - started, 2)
+            return snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+# Global instance
+analytics_snapshot = AnalyticsSnapshot()
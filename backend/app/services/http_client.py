@@ -0,0 +1,95 @@
+import httpx
+from typing import Dict, Any
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Connection limits and timeouts for each outbound upstream
+UPSTREAMS = {
+    "ibm_iam": {
+        "max_connections": settings.IBM_IAM_MAX_CONNECTIONS,
+        "connect_timeout": 5.0,
+        "read_timeout": 10.0
+    },
+    "ibm_granite": {
+        "max_connections": settings.IBM_GRANITE_MAX_CONNECTIONS,
+        "connect_timeout": 5.0,
+        "read_timeout": 30.0
+    },
+    "openweathermap": {
+        "max_connections": settings.WEATHER_MAX_CONNECTIONS,
+        "connect_timeout": 5.0,
+        "read_timeout": 10.0
+    }
+}
+
+class HTTPClientRegistry:
+    """Application-scoped httpx clients, one keep-alive pool per upstream"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._request_counts: Dict[str, int] = {}
+
+    async def start(self):
+        """Create the clients for all configured upstreams"""
+        for name in UPSTREAMS:
+            self.get(name)
+        logger.info("🌐 HTTP client pools ready")
+
+    async def close(self):
+        """Close all clients and release their connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        logger.info("🌐 HTTP client pools closed")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the shared client for an upstream, creating it on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requests sent and connections held per upstream.
+
+        Requests per connection above 1 means keep-alive reuse is working.
+        """
+        stats = {}
+        for name, client in self._clients.items():
+            # httpx does not expose pool state publicly, so read it defensively
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = len(getattr(pool, "connections", []) or [])
+            stats[name] = {
+                "requests": self._request_counts.get(name, 0),
+                "open_connections": connections
+            }
+        return stats
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        config = UPSTREAMS[name]
+        limits = httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_connections"],
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        timeout = httpx.Timeout(
+            config["read_timeout"],
+            connect=config["connect_timeout"],
+            pool=config["connect_timeout"]
+        )
+
+        async def count_request(request: httpx.Request):
+            self._request_counts[name] = self._request_counts.get(name, 0) + 1
+
+        return httpx.AsyncClient(
+            http2=settings.HTTP2_ENABLED,
+            limits=limits,
+            timeout=timeout,
+            event_hooks={"request": [count_request]}
+        )
+
+# Global instance
+http_clients = HTTPClientRegistry()
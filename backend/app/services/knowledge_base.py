@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import math
+import re
+import time
+import logging
+
+from app.services.advisory_corpus import ADVISORY_CORPUS
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u0D00-\u0D7F]+")
+_MALAYALAM_RE = re.compile(r"[\u0D00-\u0D7F]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "in", "is", "it", "my", "of", "on", "or", "should", "the", "this", "to",
+    "what", "when", "which", "why", "with", "you", "your", "me", "we", "our", "there",
+    "please", "tell", "about", "any", "best", "way", "use", "get"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens for English and Malayalam.
+
+    Malayalam words are heavily inflected, so each one is also indexed by its
+    first three code points as a crude stem (കീടം and കീടങ്ങൾ share കീട).
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if _MALAYALAM_RE.match(token):
+            tokens.append(token)
+            if len(token) > 3:
+                tokens.append(token[:3])
+        else:
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.append(token)
+    return tokens
+
+def is_malayalam(text: str) -> bool:
+    return bool(_MALAYALAM_RE.search(text))
+
+@dataclass
+class SearchHit:
+    entry: Dict[str, Any]
+    score: float
+    confidence: float
+
+    def text(self, language: str = "en") -> str:
+        return self.entry["text_ml"] if language == "ml" else self.entry["text_en"]
+
+class KnowledgeBase:
+    """BM25 inverted index over the curated advisory corpus"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._entries: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[tuple]] = {}  # term -> [(doc index, term frequency)]
+        self._doc_lengths: List[int] = []
+        self._avg_length = 0.0
+        self._idf: Dict[str, float] = {}
+        self._max_idf = 0.0
+        self._stats = {"queries": 0, "query_time_us": 0.0}
+
+    @property
+    def is_built(self) -> bool:
+        return bool(self._entries)
+
+    def build(self, entries: List[Dict[str, Any]] = ADVISORY_CORPUS):
+        """Index the corpus; called once at startup"""
+        postings: Dict[str, List[tuple]] = {}
+        doc_lengths = []
+        for index, entry in enumerate(entries):
+            text = " ".join([
+                entry["crop"], entry["problem"], entry["season"], entry.get("keywords", ""),
+                entry["text_en"], entry["text_ml"]
+            ])
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            frequencies: Dict[str, int] = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            for token, frequency in frequencies.items():
+                postings.setdefault(token, []).append((index, frequency))
+
+        total = len(entries)
+        self._entries = list(entries)
+        self._postings = postings
+        self._doc_lengths = doc_lengths
+        self._avg_length = sum(doc_lengths) / total if total else 0.0
+        self._idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+        self._max_idf = math.log(1 + (total - 0.5) / 1.5) if total else 0.0
+        logger.info(f"📚 Knowledge base indexed {total} advisories, {len(postings)} terms")
+
+    def search(self, query: str, crop: Optional[str] = None, limit: int = 3) -> List[SearchHit]:
+        """Return the best matching advisories with a 0-1 confidence.
+
+        Confidence is the share of the query's IDF weight an advisory matches
+        (unknown words lower it), scaled down when the next advisory scores
+        almost as well. Entries for the farmer's own crop rank higher; entries
+        for other crops rank lower.
+        """
+        if not self.is_built:
+            self.build()
+
+        started = time.perf_counter()
+        terms = set(tokenize(query))
+        scores: Dict[int, float] = {}
+        matched_weight: Dict[int, float] = {}
+        for term in terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self._postings[term]:
+                length_norm = 1 - self.b + self.b * self._doc_lengths[index] / self._avg_length
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                matched_weight[index] = matched_weight.get(index, 0.0) + idf
+
+        query_weight = sum(self._idf.get(term, self._max_idf) for term in terms)
+        ranked = []
+        for index, score in scores.items():
+            entry = self._entries[index]
+            if crop and entry["crop"] == crop:
+                score *= 1.25
+            elif crop and entry["crop"] != "general":
+                score *= 0.8
+            ranked.append((score, index))
+        ranked.sort(reverse=True)
+
+        hits = []
+        for position, (score, index) in enumerate(ranked[:limit]):
+            next_score = ranked[position + 1][0] if position + 1 < len(ranked) else 0.0
+            separation = min(1.0, 2 * (score - next_score) / score)
+            coverage = matched_weight[index] / query_weight
+            hits.append(SearchHit(self._entries[index], score, round(coverage * separation, 3)))
+
+        self._stats["queries"] += 1
+        self._stats["query_time_us"] += (time.perf_counter() - started) * 1_000_000
+        return hits
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = self._stats["queries"]
+        return {
+            "documents": len(self._entries),
+            "terms": len(self._postings),
+            "queries": queries,
+            "avg_query_us": round(self._stats["query_time_us"] / queries, 1) if queries else 0
+        }
+
+# Global instance
+knowledge_base = KnowledgeBase()
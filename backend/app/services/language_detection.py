@@ -0,0 +1,81 @@
+from typing import Tuple
+import re
+
+_MALAYALAM_RE = re.compile(r"[\u0D00-\u0D7F]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Romanized Malayalam (Manglish) words farmers commonly type
+MANGLISH_WORDS = {
+    "njan", "enik", "enikk", "enikku", "ente", "ende", "entha", "enthanu", "enthu", "engane",
+    "evide", "eppol", "eppozhanu", "ippol", "undo", "undu", "illa", "ille", "alle", "aano",
+    "ano", "aanu", "anu", "venam", "venda", "vendi", "cheyyan", "cheyyanam", "cheyyum",
+    "cheyyam", "krishi", "vellam", "mazha", "valam", "keedam", "thengu", "thenginu", "nellu",
+    "vazha", "kurumulaku", "inchi", "manjal", "elam", "chedi", "ila", "kaaya", "kaya",
+    "nammal", "ningal", "ningalude", "pole", "kond", "kondu", "onnu", "ethra", "nalla",
+    "kooduthal", "kurav", "kuravu", "samayam", "divasam", "mannu", "vilav", "vila", "pani",
+    "rogam", "puzhu", "kuzhi", "nanakkan", "nanakkanam", "idan", "idanam"
+}
+
+# Frequent English function and farming words
+ENGLISH_WORDS = {
+    "the", "is", "are", "was", "what", "how", "my", "to", "for", "and", "of", "in", "on",
+    "when", "should", "can", "do", "does", "with", "why", "which", "this", "that", "it",
+    "i", "a", "an", "be", "will", "there", "have", "has", "plant", "plants", "crop",
+    "crops", "water", "rain", "pest", "pests", "leaves", "leaf", "soil", "fertilizer",
+    "disease", "price", "weather", "tree", "trees", "field", "please", "help", "need"
+}
+
+# English crop names Manglish speakers use too; they say nothing about the
+# language, and some ("brinjal") look like Manglish spelling
+NEUTRAL_WORDS = {
+    "paddy", "rice", "coconut", "rubber", "banana", "brinjal", "pepper", "cardamom",
+    "ginger", "turmeric", "tapioca"
+}
+
+# Label for Malayalam typed in Latin script. Machine translation expects
+# Malayalam script, so callers must not send this text to it as "ml".
+MANGLISH = "ml-Latn"
+
+# Letter sequences typical of Manglish spelling and rare in English
+MANGLISH_NGRAMS = ("zh", "nj", "yy", "kk", "aa", "oo", "nte", "ttu", "ppo", "ndu", "kku")
+
+def detect_script_language(text: str) -> Tuple[str, float]:
+    """Detect "ml", "ml-Latn" (Manglish) or "en" offline with a 0-1 confidence.
+
+    Text written mostly in Malayalam script is Malayalam. Latin text is
+    scored on known Manglish and English words, falling back to Manglish
+    letter sequences for unknown words.
+    """
+    malayalam_chars = len(_MALAYALAM_RE.findall(text))
+    latin_chars = len(_LATIN_RE.findall(text))
+    if malayalam_chars + latin_chars == 0:
+        return "en", 0.0
+
+    malayalam_ratio = malayalam_chars / (malayalam_chars + latin_chars)
+    if malayalam_ratio >= 0.5:
+        return "ml", 0.5 + malayalam_ratio / 2
+
+    manglish_score = 0.0
+    english_score = 0.0
+    for word in _WORD_RE.findall(text.lower()):
+        if word in NEUTRAL_WORDS:
+            continue
+        if word in MANGLISH_WORDS:
+            manglish_score += 1
+        elif word in ENGLISH_WORDS:
+            english_score += 1
+        elif len(word) > 3 and any(ngram in word for ngram in MANGLISH_NGRAMS):
+            manglish_score += 0.5
+
+    # Some Malayalam script in mostly Latin text is a strong Malayalam signal
+    manglish_score += malayalam_chars / 3
+
+    total = manglish_score + english_score
+    if total == 0:
+        return "en", 0.5
+
+    malayalam_share = manglish_score / total
+    if malayalam_share > 0.5:
+        return MANGLISH, malayalam_share
+    return "en", 1 - malayalam_share
@@ -1,77 +1,399 @@
-import httpx
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, Optional
+import re
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from app.core.config import settings
+from app.core.cache import TwoTierCache
+from app.core.resilience import CircuitBreaker, ConcurrencyLimiter, QueueTimeoutError
+from app.services.http_client import http_clients
+from app.services.knowledge_base import knowledge_base
 import logging
 
 logger = logging.getLogger(__name__)
 
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+
+MALAYALAM_INSTRUCTIONS = """
+
+        The farmer may write in Malayalam script or in Malayalam typed with English letters.
+        Answer only in Malayalam, using Malayalam script. Keep crop and product names farmers know."""
+
+class GraniteUnavailableError(Exception):
+    """Granite gave no answer: API error, open circuit or full queue"""
+
+class IAMTokenManager:
+    """Cache the IBM Cloud IAM bearer token and refresh it before it expires.
+
+    Callers get the cached token while it is fresh. Once it enters the
+    background refresh window the cached token is still served and a single
+    refresh task is started; once it is inside the hard refresh margin callers
+    wait on one shared, in-flight refresh.
+    """
+
+    def __init__(self, api_key: str, refresh_margin: float, background_refresh_window: float):
+        self.api_key = api_key
+        self.refresh_margin = refresh_margin
+        self.background_refresh_window = max(background_refresh_window, refresh_margin)
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "failures": 0
+        }
+
+    async def get_token(self) -> str:
+        """Return a valid access token, refreshing it only when needed"""
+        now = time.monotonic()
+        if self._token and now < self._expires_at - self.refresh_margin:
+            self._stats["hits"] += 1
+            if now >= self._expires_at - self.background_refresh_window:
+                self._schedule_background_refresh()
+            return self._token
+
+        self._stats["misses"] += 1
+        async with self._lock:
+            # Another caller may have refreshed while we were waiting
+            if self._token and time.monotonic() < self._expires_at - self.refresh_margin:
+                return self._token
+            await self._refresh()
+            return self._token
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after the API rejected it with 401"""
+        self._token = None
+        self._expires_at = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters and the remaining token lifetime"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "expires_in": max(0, round(self._expires_at - time.monotonic())) if self._token else 0
+        }
+
+    def _schedule_background_refresh(self):
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        if self._lock.locked():
+            return
+        try:
+            async with self._lock:
+                if time.monotonic() < self._expires_at - self.background_refresh_window:
+                    return
+                await self._refresh()
+                self._stats["background_refreshes"] += 1
+        except Exception as e:
+            logger.warning(f"Background IAM token refresh failed: {e}")
+
+    async def _refresh(self):
+        """Fetch a new token from IAM. Must be called with the lock held."""
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        data = {
+            "grant_type": "urn:iam:params:oauth:grant-type:apikey",
+            "apikey": self.api_key
+        }
+
+        client = http_clients.get("ibm_iam")
+        response = await client.post(IAM_TOKEN_URL, headers=headers, data=data)
+
+        if response.status_code != 200:
+            self._stats["failures"] += 1
+            raise Exception(f"Failed to get access token: {response.text}")
+
+        result = response.json()
+        # IAM tokens are valid for an hour; prefer the server-provided lifetime
+        expires_in = float(result.get("expires_in", 3600))
+        self._token = result["access_token"]
+        self._expires_at = time.monotonic() + expires_in
+        self._stats["refreshes"] += 1
+
 class IBMGraniteService:
     def __init__(self):
         self.api_key = settings.IBM_API_KEY
         self.project_id = settings.IBM_PROJECT_ID
         self.api_url = settings.IBM_API_URL
         self.model_id = "ibm/granite-13b-chat-v2"
+        self.token_manager = IAMTokenManager(
+            self.api_key,
+            refresh_margin=settings.IBM_TOKEN_REFRESH_MARGIN_SECONDS,
+            background_refresh_window=settings.IBM_TOKEN_BACKGROUND_REFRESH_SECONDS
+        )
+        # Greedy decoding is deterministic, so identical prompts can share an answer
+        self.response_cache = TwoTierCache(
+            "llm_response_cache",
+            max_size=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=settings.LLM_CACHE_TTL_SECONDS
+        )
+        self.circuit_breaker = CircuitBreaker(
+            "ibm_granite",
+            failure_rate_threshold=settings.GRANITE_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.GRANITE_BREAKER_SLOW_CALL_SECONDS,
+            open_seconds=settings.GRANITE_BREAKER_OPEN_SECONDS
+        )
+        self.limiter = ConcurrencyLimiter(
+            "ibm_granite",
+            max_concurrent=settings.GRANITE_MAX_CONCURRENT,
+            max_queue=settings.GRANITE_MAX_QUEUE,
+            max_queue_wait=settings.GRANITE_QUEUE_WAIT_SECONDS
+        )
+        self.stream_limiter = ConcurrencyLimiter(
+            "ibm_granite_stream",
+            max_concurrent=settings.GRANITE_MAX_CONCURRENT_STREAMS,
+            max_queue=settings.GRANITE_MAX_QUEUE,
+            max_queue_wait=settings.GRANITE_QUEUE_WAIT_SECONDS
+        )
+        self.retrieval_stats = {"direct_answers": 0, "augmented_prompts": 0}
         
     async def get_access_token(self) -> str:
-        """Get IBM Cloud access token"""
-        url = "https://iam.cloud.ibm.com/identity/token"
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        data = {
-            "grant_type": "urn:iam:params:oauth:grant-type:apikey",
-            "apikey": self.api_key
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, data=data)
-            if response.status_code == 200:
-                return response.json()["access_token"]
-            else:
-                raise Exception(f"Failed to get access token: {response.text}")
+        """Get IBM Cloud access token (cached)"""
+        return await self.token_manager.get_token()
     
-    async def generate_response(self, prompt: str, context: Optional[Dict] = None) -> str:
+    async def generate_response(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> str:
         """Generate AI response using IBM Granite"""
         try:
-            access_token = await self.get_access_token()
-            
-            # Enhance prompt with farming context
-            enhanced_prompt = self._enhance_prompt(prompt, context)
-            
-            url = f"{self.api_url}/ml/v1/text/generation?version=2023-05-29"
-            headers = {
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token}"
-            }
-            
-            payload = {
-                "input": enhanced_prompt,
-                "parameters": {
-                    "decoding_method": "greedy",
-                    "max_new_tokens": 500,
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "repetition_penalty": 1.1
-                },
-                "model_id": self.model_id,
-                "project_id": self.project_id
-            }
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
+            return await self.generate(prompt, context, language)
+        except GraniteUnavailableError as e:
+            logger.error(f"Error calling IBM Granite API: {e}")
+            return self.get_fallback_response(prompt, context, language)
+    
+    async def generate(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> str:
+        """Generate an answer with IBM Granite, raising instead of falling back.
+
+        With language="ml" Granite is asked to answer directly in Malayalam.
+        """
+        local_answer, passages = self._retrieve(prompt, context, language)
+        if local_answer:
+            return local_answer
+        
+        cache_key = self._cache_key(prompt, context, language)
+        cached = await self.response_cache.get(cache_key)
+        if cached:
+            return cached
+        
+        # Serve the fallback straight away while IBM is known to be failing
+        if self.circuit_breaker.is_open():
+            raise GraniteUnavailableError("Circuit open")
+        
+        try:
+            async with self.limiter.acquire():
+                if not self.circuit_breaker.allow_request():
+                    raise GraniteUnavailableError("Circuit open")
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["results"][0]["generated_text"].strip()
-                else:
-                    logger.error(f"IBM Granite API error: {response.text}")
-                    return self._get_fallback_response(prompt)
-                    
+                started = time.perf_counter()
+                try:
+                    text = await self._request_generation(prompt, context, passages, language)
+                except Exception as e:
+                    self.circuit_breaker.record_failure(time.perf_counter() - started)
+                    raise GraniteUnavailableError(str(e)) from e
+                self.circuit_breaker.record_success(time.perf_counter() - started)
+        except QueueTimeoutError as e:
+            raise GraniteUnavailableError(str(e)) from e
+        
+        if text:
+            await self.response_cache.set(cache_key, text)
+        return text
+    
+    async def _request_generation(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        passages: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> str:
+        access_token = await self.get_access_token()
+        
+        # Enhance prompt with farming context
+        enhanced_prompt = self._enhance_prompt(prompt, context, passages, language)
+        
+        url = f"{self.api_url}/ml/v1/text/generation?version=2023-05-29"
+        headers = self._build_headers(access_token)
+        payload = self._build_payload(enhanced_prompt)
+        
+        client = http_clients.get("ibm_granite")
+        response = await client.post(url, headers=headers, json=payload)
+        
+        if response.status_code != 200:
+            if response.status_code == 401:
+                # Token was revoked or expired early; fetch a fresh one next time
+                self.token_manager.invalidate()
+            raise Exception(f"IBM Granite API error: {response.text}")
+        
+        result = response.json()
+        return result["results"][0]["generated_text"].strip()
+    
+    async def generate_response_stream(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> AsyncIterator[str]:
+        """Yield AI response text chunks as IBM Granite generates them.
+
+        Failures before the first chunk yield the fallback answer instead;
+        a failure after it raises GraniteUnavailableError.
+        """
+        local_answer, passages = self._retrieve(prompt, context, language)
+        if local_answer:
+            yield local_answer
+            return
+        
+        cache_key = self._cache_key(prompt, context, language)
+        cached = await self.response_cache.get(cache_key)
+        if cached:
+            yield cached
+            return
+        
+        if not self.circuit_breaker.is_open():
+            try:
+                # The slot is held until the stream ends, however the client paces it
+                async with self.stream_limiter.acquire():
+                    async for text in self._stream_generation(prompt, context, passages, language, cache_key):
+                        yield text
+                return
+            except QueueTimeoutError as e:
+                logger.error(f"Error streaming from IBM Granite API: {e}")
+        
+        yield self.get_fallback_response(prompt, context, language)
+    
+    async def _stream_generation(
+        self,
+        prompt: str,
+        context: Optional[Dict],
+        passages: List[str],
+        language: str,
+        cache_key: str
+    ) -> AsyncIterator[str]:
+        """Stream one Granite answer through the circuit breaker; call with a stream slot held.
+
+        The breaker is told the outcome once the stream ends, timed to the
+        first token since the rest is paced by the client.
+        """
+        if not self.circuit_breaker.allow_request():
+            yield self.get_fallback_response(prompt, context, language)
+            return
+        
+        started = time.perf_counter()
+        first_token_seconds = None
+        chunks = []
+        stream = self._request_generation_stream(prompt, context, passages, language)
+        try:
+            async for text in stream:
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                chunks.append(text)
+                yield text
         except Exception as e:
-            logger.error(f"Error calling IBM Granite API: {e}")
-            return self._get_fallback_response(prompt)
+            self.circuit_breaker.record_failure(first_token_seconds or time.perf_counter() - started)
+            logger.error(f"Error streaming from IBM Granite API: {e}")
+            if not chunks:
+                yield self.get_fallback_response(prompt, context, language)
+                return
+            # A stream cut short is not cached; the caller reports the cut-off reply
+            raise GraniteUnavailableError(str(e)) from e
+        finally:
+            await stream.aclose()
+        
+        self.circuit_breaker.record_success(first_token_seconds or time.perf_counter() - started)
+        if not chunks:
+            yield self.get_fallback_response(prompt, context, language)
+            return
+        await self.response_cache.set(cache_key, "".join(chunks).strip())
+    
+    async def _request_generation_stream(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        passages: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> AsyncIterator[str]:
+        access_token = await self.get_access_token()
+        enhanced_prompt = self._enhance_prompt(prompt, context, passages, language)
+        
+        url = f"{self.api_url}/ml/v1/text/generation_stream?version=2023-05-29"
+        headers = self._build_headers(access_token, accept="text/event-stream")
+        payload = self._build_payload(enhanced_prompt)
+        
+        client = http_clients.get("ibm_granite")
+        async with client.stream("POST", url, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                if response.status_code == 401:
+                    self.token_manager.invalidate()
+                raise Exception(f"IBM Granite streaming API error: {body.decode(errors='replace')}")
+            
+            # Server-sent events: each "data:" line carries a JSON chunk
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    chunk = json.loads(line[5:].strip())
+                except ValueError:
+                    continue
+                results = chunk.get("results") or []
+                text = results[0].get("generated_text") if results else None
+                if text:
+                    yield text
+    
+    def _build_headers(self, access_token: str, accept: str = "application/json") -> Dict[str, str]:
+        return {
+            "Accept": accept,
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}"
+        }
+    
+    def _build_payload(self, enhanced_prompt: str) -> Dict[str, Any]:
+        return {
+            "input": enhanced_prompt,
+            "parameters": {
+                "decoding_method": "greedy",
+                "max_new_tokens": 500,
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "repetition_penalty": 1.1
+            },
+            "model_id": self.model_id,
+            "project_id": self.project_id
+        }
+    
+    def _cache_key(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> str:
+        """Hash of the normalized question in its full prompt and farm context"""
+        # Keep Malayalam vowel signs, which \w does not match
+        normalized = re.sub(r"[^\w\s\u0D00-\u0D7F]", " ", prompt.lower())
+        normalized = " ".join(normalized.split())
+        key_source = f"{self.model_id}\n{self._enhance_prompt(normalized, context, language=language)}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
     
-    def _enhance_prompt(self, prompt: str, context: Optional[Dict] = None) -> str:
+    def _retrieve(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> Tuple[Optional[str], List[str]]:
+        """Look the question up in the local knowledge base.
+
+        Returns a direct answer when the best advisory is a confident match,
+        otherwise the closest advisories to ground the LLM prompt.
+        """
+        crop = (context or {}).get("current_crop")
+        hits = knowledge_base.search(prompt, crop=crop)
+        if not hits:
+            return None, []
+        
+        if hits[0].confidence >= settings.KB_DIRECT_ANSWER_CONFIDENCE:
+            self.retrieval_stats["direct_answers"] += 1
+            return hits[0].text(language), []
+        
+        self.retrieval_stats["augmented_prompts"] += 1
+        return None, [hit.text(language) for hit in hits if hit.score >= hits[0].score * 0.5]
+    
+    def _enhance_prompt(
+        self,
+        prompt: str,
+        context: Optional[Dict] = None,
+        passages: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> str:
         """Enhance prompt with farming context and instructions"""
         system_prompt = """You are Krishi Sakhi, an expert farming assistant for Kerala farmers. 
         Provide practical, actionable advice for farming in Kerala's climate and conditions.
@@ -90,26 +412,26 @@ class IBMGraniteService:
             if farm_info:
                 system_prompt += f"\n\nFarm context: {farm_info}"
         
+        if passages:
+            reference = "\n".join(f"- {passage}" for passage in passages)
+            system_prompt += f"\n\nRelevant local advisories:\n{reference}"
+        
+        if language == "ml":
+            system_prompt += MALAYALAM_INSTRUCTIONS
+        
         return f"{system_prompt}\n\nFarmer question: {prompt}\n\nResponse:"
     
-    def _get_fallback_response(self, prompt: str) -> str:
+    def get_fallback_response(self, prompt: str, context: Optional[Dict] = None, language: str = "en") -> str:
         """Provide fallback response when API fails"""
-        prompt_lower = prompt.lower()
-        
-        if any(word in prompt_lower for word in ['pest', 'bug', 'insect', 'കീടം']):
-            return "For pest control, I recommend using neem oil spray in the evening. Check plants regularly and remove affected parts. Avoid chemical pesticides if possible."
-        
-        elif any(word in prompt_lower for word in ['weather', 'rain', 'കാലാവസ്ഥ', 'മഴ']):
-            return "Monitor weather forecasts regularly. Avoid applying fertilizers or pesticides before expected rain. Ensure proper drainage during monsoon season."
-        
-        elif any(word in prompt_lower for word in ['fertilizer', 'വളം']):
-            return "Use organic fertilizers like compost and cow dung. Apply during early morning or evening. Avoid over-fertilization which can harm plants."
-        
-        elif any(word in prompt_lower for word in ['water', 'irrigation', 'ജലം']):
-            return "Water plants early morning or late evening. Maintain consistent soil moisture. Use mulching to reduce water evaporation."
+        crop = (context or {}).get("current_crop")
+        hits = knowledge_base.search(prompt, crop=crop, limit=1)
+        # A weak match answers a different question; better to ask for details
+        if hits and hits[0].confidence >= settings.KB_FALLBACK_MIN_CONFIDENCE:
+            return hits[0].text(language)
         
-        else:
-            return "I'm here to help with your farming questions. Please provide more specific details about your concern - crops, pests, fertilizers, or other farming practices."
+        if language == "ml":
+            return "നിങ്ങളുടെ കൃഷി സംബന്ധമായ ചോദ്യങ്ങൾക്ക് സഹായിക്കാൻ ഞാൻ ഇവിടെയുണ്ട്. വിളകൾ, കീടങ്ങൾ, വളങ്ങൾ തുടങ്ങി നിങ്ങളുടെ പ്രശ്നത്തെക്കുറിച്ച് കൂടുതൽ വിവരങ്ങൾ നൽകുക."
+        return "I'm here to help with your farming questions. Please provide more specific details about your concern - crops, pests, fertilizers, or other farming practices."
 
 # Global instance
 granite_service = IBMGraniteService()
\ No newline at end of file
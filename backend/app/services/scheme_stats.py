@@ -0,0 +1,72 @@
+from datetime import datetime
+from pymongo import UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Applications per (scheme, month, status) live in scheme_application_stats so
+# trend and status queries read a few dozen counter documents instead of
+# scanning every application.
+
+def month_bucket(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+async def record(db, scheme_id: str, month: str, status: str, delta: int = 1):
+    """Atomically adjust one (scheme, month, status) counter"""
+    await db.scheme_application_stats.update_one(
+        {"scheme_id": scheme_id, "month": month, "status": status},
+        {"$inc": {"count": delta}},
+        upsert=True
+    )
+
+async def backfill(db):
+    """Date and bucket applications stored before applied_at existed, then
+    reconcile the counters"""
+    # applied_date is a Unix timestamp in seconds
+    await db.scheme_applications.update_many(
+        {"applied_at": {"$exists": False}, "applied_date": {"$type": "number"}},
+        [
+            {"$set": {"applied_at": {"$toDate": {"$multiply": ["$applied_date", 1000]}}}},
+            {"$set": {"month_bucket": {"$dateToString": {"format": "%Y-%m", "date": "$applied_at"}}}}
+        ]
+    )
+    corrected = await reconcile(db)
+    if corrected:
+        logger.info(f"📊 Corrected {corrected} scheme application counters")
+
+def _counter_key(item: dict) -> tuple:
+    return item["scheme_id"], item["month"], item["status"]
+
+async def reconcile(db) -> int:
+    """Correct every counter against the applications; returns how many changed.
+
+    Run at startup and with each analytics refresh, so a failed record()
+    heals. Drift is applied as $inc against a read taken before the recount:
+    writes after the recount are kept, and one landing during it is counted
+    twice until the next run.
+    """
+    before = {_counter_key(counter): counter.get("count", 0) async for counter in db.scheme_application_stats.find({})}
+    actual = await db.scheme_applications.aggregate([
+        {"$match": {"month_bucket": {"$exists": True}}},
+        {"$group": {
+            "_id": {"scheme_id": "$scheme_id", "month": "$month_bucket", "status": "$status"},
+            "count": {"$sum": 1}
+        }}
+    ]).to_list(length=None)
+    actual_counts = {_counter_key(item["_id"]): item["count"] for item in actual}
+
+    requests = []
+    for key in set(before) | set(actual_counts):
+        drift = actual_counts.get(key, 0) - before.get(key, 0)
+        if drift:
+            scheme_id, month, status = key
+            requests.append(UpdateOne(
+                {"scheme_id": scheme_id, "month": month, "status": status},
+                {"$inc": {"count": drift}},
+                upsert=True
+            ))
+    if requests:
+        await db.scheme_application_stats.bulk_write(requests, ordered=False)
+    # Drop keys reconciled down to zero
+    await db.scheme_application_stats.delete_many({"count": 0})
+    return len(requests)
@@ -1,17 +1,52 @@
+import asyncio
 import boto3
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.cache import TwoTierCache
+from app.core.resilience import ConcurrencyLimiter, QueueTimeoutError
+from app.services.language_detection import MANGLISH, detect_script_language
+from app.services.knowledge_base import is_malayalam
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TranslationService:
     def __init__(self):
+        workers = settings.TRANSLATE_MAX_WORKERS
         self.translate_client = boto3.client(
             'translate',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            config=Config(max_pool_connections=workers, connect_timeout=5, read_timeout=10)
+        )
+        # Only used when the offline detector is unsure
+        self.comprehend_client = boto3.client(
+            'comprehend',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            config=Config(connect_timeout=5, read_timeout=10)
+        )
+        # boto3 is blocking, so AWS calls run on a dedicated pool sized to the
+        # client's connection pool; the limiter queues callers when it is busy
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aws-translate")
+        self.limiter = ConcurrencyLimiter(
+            "aws_translate",
+            max_concurrent=workers,
+            max_queue=settings.TRANSLATE_MAX_QUEUE,
+            max_queue_wait=settings.TRANSLATE_QUEUE_WAIT_SECONDS
+        )
+        self.detection_stats = {"local": 0, "remote": 0}
+        # AI answers, fallbacks and alert texts repeat verbatim
+        self.cache = TwoTierCache(
+            "translation_cache",
+            max_size=settings.TRANSLATION_CACHE_MAX_ENTRIES,
+            ttl=settings.TRANSLATION_CACHE_TTL_SECONDS
         )
     
     async def translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
@@ -29,32 +64,61 @@ class TranslationService:
             if source_code == target_code:
                 return text
             
-            response = self.translate_client.translate_text(
+            cache_key = self._cache_key(text, source_code, target_code)
+            cached = await self.cache.get(cache_key)
+            if cached:
+                return cached
+            
+            response = await self._run_blocking(
+                self.translate_client.translate_text,
                 Text=text,
                 SourceLanguageCode=source_code,
                 TargetLanguageCode=target_code
             )
             
-            return response['TranslatedText']
+            translated = response['TranslatedText']
+            await self.cache.set(cache_key, translated)
+            return translated
             
         except ClientError as e:
             logger.error(f"AWS Translate error: {e}")
             return text  # Return original text if translation fails
+        except QueueTimeoutError as e:
+            logger.warning(f"Translation skipped: {e}")
+            return text
         except Exception as e:
             logger.error(f"Translation service error: {e}")
             return text
     
+    async def _run_blocking(self, fn, **kwargs):
+        """Run a blocking boto3 call on the AWS thread pool"""
+        async with self.limiter.acquire():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, **kwargs))
+    
+    def close(self):
+        self._executor.shutdown(wait=False)
+    
+    def _cache_key(self, text: str, source_code: str, target_code: str) -> str:
+        return hashlib.sha256(f"{source_code}:{target_code}:{text}".encode("utf-8")).hexdigest()
+    
     async def detect_language(self, text: str) -> str:
-        """Detect language of text"""
+        """Detect language of text, offline unless the script detector is unsure"""
+        language, confidence = detect_script_language(text)
+        if confidence >= settings.LANGUAGE_DETECTION_MIN_CONFIDENCE:
+            self.detection_stats["local"] += 1
+            return language
+        
+        self.detection_stats["remote"] += 1
         try:
-            response = self.translate_client.detect_dominant_language(Text=text)
+            response = await self._run_blocking(self.comprehend_client.detect_dominant_language, Text=text)
             languages = response['Languages']
             
             if languages:
                 detected_lang = languages[0]['LanguageCode']
                 # Map back to our language codes
                 if detected_lang == 'ml':
-                    return 'ml'
+                    return 'ml' if is_malayalam(text) else MANGLISH
                 else:
                     return 'en'
             
@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
+import logging
+
+from app.core.config import settings
+from app.core.resilience import RateLimiter
+from app.database import db
+from app.services.weather_service import weather_service
+
+logger = logging.getLogger(__name__)
+
+def farm_coordinates(farm: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """Latitude and longitude stored on a farm, if any"""
+    coordinates = farm.get("coordinates") or {}
+    lat = coordinates.get("latitude", coordinates.get("lat"))
+    lon = coordinates.get("longitude", coordinates.get("lon", coordinates.get("lng")))
+    if lat is None or lon is None:
+        return None, None
+    return float(lat), float(lon)
+
+class WeatherPrefetcher:
+    """Periodically refresh weather for every active farm location.
+
+    Each run collects the distinct snapped locations of active farms and
+    refreshes their snapshots with bounded concurrency, paced under the
+    OpenWeatherMap quota, so user requests read warm data.
+    """
+
+    def __init__(self):
+        self.interval = settings.WEATHER_PREFETCH_INTERVAL_SECONDS
+        self.rate_limiter = RateLimiter("openweathermap_prefetch", settings.WEATHER_PREFETCH_RATE_PER_MINUTE)
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "runs": 0,
+            "locations": 0,
+            "refreshed": 0,
+            "failed": 0,
+            "last_run_at": None,
+            "last_run_seconds": 0.0
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info("🌦️ Weather prefetch scheduled")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Weather prefetch error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def collect_locations(self) -> Dict[str, Tuple[Optional[str], Optional[float], Optional[float]]]:
+        """Distinct snapped locations of active farms, keyed like the weather cache"""
+        locations = {}
+        if db.database is None:
+            return locations
+
+        cursor = db.database.farms.find({"is_active": True}, {"location": 1, "coordinates": 1})
+        async for farm in cursor:
+            lat, lon = farm_coordinates(farm)
+            location = farm.get("location")
+            if not location and lat is None:
+                continue
+            key, _ = weather_service.resolve_location(location, lat, lon)
+            locations.setdefault(key, (location, lat, lon))
+        return locations
+
+    async def run_once(self):
+        """Refresh every active farm location once"""
+        started = time.perf_counter()
+        locations = await self.collect_locations()
+        semaphore = asyncio.Semaphore(settings.WEATHER_PREFETCH_CONCURRENCY)
+
+        async def refresh(location, lat, lon) -> bool:
+            async with semaphore:
+                # Each refresh makes two upstream calls (current and forecast)
+                await self.rate_limiter.wait()
+                await self.rate_limiter.wait()
+                try:
+                    return await weather_service.refresh_snapshot(location, lat, lon)
+                except Exception as e:
+                    logger.warning(f"Weather prefetch failed for {location}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(refresh(*args) for args in locations.values()))
+        refreshed = sum(1 for ok in results if ok)
+
+        self._stats["runs"] += 1
+        self._stats["locations"] = len(locations)
+        self._stats["refreshed"] += refreshed
+        self._stats["failed"] += len(results) - refreshed
+        self._stats["last_run_at"] = datetime.utcnow().isoformat()
+        self._stats["last_run_seconds"] = round(time.perf_counter() - started, 1)
+        logger.info(f"🌦️ Weather prefetch refreshed {refreshed}/{len(locations)} locations")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "rate_limiter": self.rate_limiter.get_stats()}
+
+# Global instance
+weather_prefetcher = WeatherPrefetcher()
@@ -1,61 +1,298 @@
-import httpx
-from typing import Dict, Any, Optional
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from app.core.config import settings
+from app.core.cache import TwoTierCache
+from app.core.metrics import LatencyStats
+from app.database import db
+from app.core.resilience import SingleFlight
+from app.services.http_client import http_clients
+import numpy as np
+import asyncio
+import re
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# "lat,lon" strings, as older clients sent them in place of a place name
+_COORDINATES_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
 class WeatherService:
     def __init__(self):
         self.api_key = settings.WEATHER_API_KEY
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        # Raw OpenWeatherMap payloads keyed by kind and normalized location
+        self.cache = TwoTierCache(
+            "weather_cache",
+            max_size=settings.WEATHER_CACHE_MAX_ENTRIES,
+            ttl=settings.WEATHER_FORECAST_TTL_SECONDS
+        )
+        self.ttls = {
+            "current": settings.WEATHER_CURRENT_TTL_SECONDS,
+            "forecast": settings.WEATHER_FORECAST_TTL_SECONDS
+        }
+        # Prefetched snapshots are refreshed every half hour or so; a current
+        # observation is only served while it would still be cached
+        self.snapshot_max_ages = {
+            "current": settings.WEATHER_CURRENT_TTL_SECONDS,
+            "forecast": settings.WEATHER_SNAPSHOT_MAX_AGE_SECONDS
+        }
+        self.single_flight = SingleFlight("openweathermap")
+        self._upstream_calls = deque(maxlen=10000)  # monotonic timestamps
+        self._stats = {"upstream_calls": 0, "upstream_errors": 0, "snapshot_hits": 0,
+                       "batch_requests": 0, "batch_locations": 0}
+        self.aggregation_latency = LatencyStats()
+    
+    def _snapshots(self):
+        if db.database is None:
+            return None
+        return db.database.weather_snapshots
     
-    async def get_current_weather(self, location: str) -> Dict[str, Any]:
+    async def ensure_indexes(self):
+        """Expire cached payloads and stale prefetch snapshots"""
+        await self.cache.ensure_indexes()
+        snapshots = self._snapshots()
+        if snapshots is not None:
+            await snapshots.create_index(
+                "refreshed_at", expireAfterSeconds=settings.WEATHER_SNAPSHOT_MAX_AGE_SECONDS
+            )
+    
+    def resolve_location(
+        self,
+        location: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return the cache key and OpenWeatherMap query params for a location.
+
+        Coordinates are snapped to a WEATHER_GRID_DEGREES grid so farms in the
+        same cell share one cache entry; place names are case-folded.
+        """
+        if (lat is None or lon is None) and location:
+            match = _COORDINATES_RE.match(location)
+            if match:
+                lat, lon = float(match.group(1)), float(match.group(2))
+        
+        if lat is not None and lon is not None:
+            grid = settings.WEATHER_GRID_DEGREES
+            lat = round(round(lat / grid) * grid, 4)
+            lon = round(round(lon / grid) * grid, 4)
+            return f"{lat:.4f},{lon:.4f}", {"lat": lat, "lon": lon}
+        
+        name = " ".join(location.lower().split())
+        return name, {"q": name}
+    
+    async def get_current_weather(
+        self,
+        location: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Get current weather for location"""
+        key, params = self.resolve_location(location, lat, lon)
         try:
-            url = f"{self.base_url}/weather"
-            params = {
-                "q": location,
-                "appid": self.api_key,
-                "units": "metric"
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._format_weather_data(data)
-                else:
-                    return self._get_mock_weather_data(location)
+            data = await self._fetch("current", key, params)
+            if data is not None:
+                return self._format_weather_data(data)
+            else:
+                return self._get_mock_weather_data(location or key)
                     
         except Exception as e:
             logger.error(f"Weather API error: {e}")
-            return self._get_mock_weather_data(location)
+            return self._get_mock_weather_data(location or key)
     
-    async def get_weather_forecast(self, location: str, days: int = 5) -> Dict[str, Any]:
+    async def get_weather_forecast(
+        self,
+        location: Optional[str] = None,
+        days: int = 5,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Get weather forecast for location"""
+        key, params = self.resolve_location(location, lat, lon)
         try:
-            url = f"{self.base_url}/forecast"
-            params = {
-                "q": location,
-                "appid": self.api_key,
-                "units": "metric",
-                "cnt": days * 8  # 8 forecasts per day (3-hour intervals)
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._format_forecast_data(data)
-                else:
-                    return self._get_mock_forecast_data(location, days)
+            # Always fetch the full 5-day forecast so every `days` value shares one entry
+            data = await self._fetch("forecast", key, params)
+            if data is not None:
+                return self._format_forecast_data(data, days)
+            else:
+                return self._get_mock_forecast_data(location or key, days)
                     
         except Exception as e:
             logger.error(f"Weather forecast API error: {e}")
-            return self._get_mock_forecast_data(location, days)
+            return self._get_mock_forecast_data(location or key, days)
+    
+    async def get_snapshot(
+        self,
+        location: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Prefetched forecast payload for a location, if still fresh, with the
+        current observation only while that is fresh too"""
+        key, _ = self.resolve_location(location, lat, lon)
+        snapshot = await self._read_snapshot(key, "forecast")
+        if snapshot is not None and self._snapshot_age(snapshot) > self.snapshot_max_ages["current"]:
+            snapshot.pop("current", None)
+        return snapshot
+    
+    async def refresh_snapshot(
+        self,
+        location: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> bool:
+        """Fetch a location's weather from upstream and store it as its snapshot"""
+        key, params = self.resolve_location(location, lat, lon)
+        payloads = {}
+        for kind in ("current", "forecast"):
+            cache_key = f"{kind}:{key}"
+            payloads[kind] = await self.single_flight.do(
+                cache_key, lambda: self._fetch_upstream(kind, cache_key, params)
+            )
+            if payloads[kind] is None:
+                return False
+        
+        snapshots = self._snapshots()
+        if snapshots is not None:
+            await snapshots.update_one(
+                {"_id": key},
+                {"$set": {**payloads, "params": params, "refreshed_at": datetime.utcnow()}},
+                upsert=True
+            )
+        return True
+    
+    async def get_snapshots(self, keys: List[str], batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+        """Snapshots with a fresh forecast for many location keys, fetched in batched $in queries"""
+        snapshots = self._snapshots()
+        found = {}
+        if snapshots is None:
+            return found
+        
+        fresh_after = datetime.utcnow() - timedelta(seconds=self.snapshot_max_ages["forecast"])
+        for start in range(0, len(keys), batch_size):
+            cursor = snapshots.find({
+                "_id": {"$in": keys[start:start + batch_size]},
+                "refreshed_at": {"$gt": fresh_after}
+            })
+            async for snapshot in cursor:
+                found[snapshot["_id"]] = snapshot
+        return found
+    
+    async def get_raw_forecast(
+        self,
+        location: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Unformatted OpenWeatherMap forecast payload, or None if unavailable"""
+        key, params = self.resolve_location(location, lat, lon)
+        try:
+            return await self._fetch("forecast", key, params)
+        except Exception as e:
+            logger.error(f"Weather forecast API error: {e}")
+            return None
+    
+    def _snapshot_age(self, snapshot: Dict[str, Any]) -> float:
+        return (datetime.utcnow() - snapshot["refreshed_at"]).total_seconds()
+    
+    async def _read_snapshot(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        """The location's snapshot if it is fresh enough to serve for this kind"""
+        snapshots = self._snapshots()
+        if snapshots is None:
+            return None
+        try:
+            fresh_after = datetime.utcnow() - timedelta(seconds=self.snapshot_max_ages[kind])
+            return await snapshots.find_one({"_id": key, "refreshed_at": {"$gt": fresh_after}})
+        except Exception as e:
+            logger.warning(f"Weather snapshot read error: {e}")
+            return None
+    
+    async def _fetch(self, kind: str, key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Raw payload from the cache or the prefetched snapshot.
+
+        Only locations nobody has prefetched fall through to one upstream call
+        shared by concurrent misses.
+        """
+        cache_key = f"{kind}:{key}"
+        data = await self.cache.get(cache_key)
+        if data is not None:
+            return data
+        
+        snapshot = await self._read_snapshot(key, kind)
+        if snapshot is not None and snapshot.get(kind) is not None:
+            self._stats["snapshot_hits"] += 1
+            # Cache it only for the rest of its freshness, not a full TTL
+            remaining = self.snapshot_max_ages[kind] - self._snapshot_age(snapshot)
+            self.cache.memory.set(cache_key, snapshot[kind], ttl=min(self.ttls[kind], max(remaining, 0)))
+            return snapshot[kind]
+        
+        return await self.single_flight.do(
+            cache_key, lambda: self._fetch_upstream(kind, cache_key, params)
+        )
+    
+    async def _fetch_upstream(self, kind: str, cache_key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        endpoint = "weather" if kind == "current" else "forecast"
+        self._upstream_calls.append(time.monotonic())
+        self._stats["upstream_calls"] += 1
+        try:
+            client = http_clients.get("openweathermap")
+            response = await client.get(
+                f"{self.base_url}/{endpoint}",
+                params={**params, "appid": self.api_key, "units": "metric"}
+            )
+        except Exception:
+            self._stats["upstream_errors"] += 1
+            raise
+        
+        if response.status_code != 200:
+            self._stats["upstream_errors"] += 1
+            logger.warning(f"Weather API returned {response.status_code} for {cache_key}")
+            return None
+        
+        data = response.json()
+        await self.cache.set(cache_key, data, ttl=self.ttls[kind])
+        return data
+    
+    async def get_forecasts_batch(self, locations: List[Dict[str, Any]], days: int = 5) -> List[Dict[str, Any]]:
+        """Daily forecasts for many locations, fetched concurrently and aggregated together"""
+        resolved = [
+            self.resolve_location(item.get("location"), item.get("lat"), item.get("lon"))
+            for item in locations
+        ]
+        unique = dict(resolved)
+        semaphore = asyncio.Semaphore(settings.WEATHER_BATCH_CONCURRENCY)
+        
+        async def fetch(key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._fetch("forecast", key, params)
+                except Exception as e:
+                    logger.warning(f"Weather batch fetch failed for {key}: {e}")
+                    return None
+        
+        payloads = await asyncio.gather(*(fetch(key, params) for key, params in unique.items()))
+        fetched = {key: data for key, data in zip(unique, payloads) if data is not None}
+        summaries = dict(zip(fetched, self._aggregate_forecasts(list(fetched.values()), days)))
+        
+        self._stats["batch_requests"] += 1
+        self._stats["batch_locations"] += len(locations)
+        return [
+            {"key": key, **(summaries.get(key) or self._get_mock_forecast_data(item.get("location") or key, days))}
+            for (key, _), item in zip(resolved, locations)
+        ]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        cutoff = time.monotonic() - 60
+        recent_calls = sum(1 for t in self._upstream_calls if t > cutoff)
+        return {
+            **self._stats,
+            "upstream_qps_1m": round(recent_calls / 60, 3),
+            "cache": self.cache.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "forecast_aggregation": self.aggregation_latency.snapshot()
+        }
     
     def _format_weather_data(self, data: Dict) -> Dict[str, Any]:
         """Format weather API response"""
@@ -71,36 +308,84 @@ class WeatherService:
             }
         }
     
-    def _format_forecast_data(self, data: Dict) -> Dict[str, Any]:
+    def _format_forecast_data(self, data: Dict, days: int = 5) -> Dict[str, Any]:
         """Format forecast API response"""
-        forecasts = []
+        return self._aggregate_forecasts([data], days)[0]
+    
+    def _aggregate_forecasts(self, payloads: List[Dict], days: int = 5) -> List[Dict[str, Any]]:
+        """Reduce 3-hourly forecast series to daily summaries for many locations at once.
+
+        All items are flattened into arrays and grouped by (location, day) with
+        bincount and ufunc.at, so the reductions run in NumPy rather than in a
+        Python loop per location.
+        """
+        started = time.perf_counter()
+        days = min(days, 5)  # Limit to 5 days
+        items = [item for data in payloads for item in data["list"]]
+        results = [{"location": data["city"]["name"], "forecast": []} for data in payloads]
+        if not items:
+            return results
         
-        # Group by day and take daily averages
-        daily_data = {}
-        for item in data["list"]:
-            date = item["dt_txt"].split(" ")[0]
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(item)
-        
-        for date, day_data in list(daily_data.items())[:5]:  # Limit to 5 days
-            temps = [item["main"]["temp"] for item in day_data]
-            humidity = sum(item["main"]["humidity"] for item in day_data) / len(day_data)
-            rainfall = sum(item.get("rain", {}).get("3h", 0) for item in day_data)
-            
-            forecasts.append({
+        count = len(items)
+        location_index = np.repeat(np.arange(len(payloads)), [len(data["list"]) for data in payloads])
+        day = np.fromiter((item["dt"] // 86400 for item in items), dtype=np.int64, count=count)
+        temp = np.fromiter((item["main"]["temp"] for item in items), dtype=np.float64, count=count)
+        humidity = np.fromiter((item["main"]["humidity"] for item in items), dtype=np.float64, count=count)
+        rain = np.fromiter((item.get("rain", {}).get("3h", 0) for item in items), dtype=np.float64, count=count)
+        
+        # Days are counted from each location's first forecast day
+        first_day = np.full(len(payloads), np.iinfo(np.int64).max)
+        np.minimum.at(first_day, location_index, day)
+        day_offset = day - first_day[location_index]
+        keep = day_offset < days
+        group = (location_index * days + day_offset)[keep]
+        temp, humidity, rain = temp[keep], humidity[keep], rain[keep]
+        
+        size = len(payloads) * days
+        samples = np.bincount(group, minlength=size)
+        temp_sum = np.bincount(group, weights=temp, minlength=size)
+        humidity_sum = np.bincount(group, weights=humidity, minlength=size)
+        rain_sum = np.bincount(group, weights=rain, minlength=size)
+        max_temp = np.full(size, -np.inf)
+        np.maximum.at(max_temp, group, temp)
+        min_temp = np.full(size, np.inf)
+        np.minimum.at(min_temp, group, temp)
+        
+        # Whole-number rounding is done in NumPy (np.rint rounds half to even,
+        # like round()); the rest is converted to Python values once, since
+        # per-element NumPy scalar access dominates the loop below otherwise
+        groups, first_slot = np.unique(group, return_index=True)
+        n = samples[groups]
+        rows = zip(
+            groups.tolist(),
+            np.flatnonzero(keep)[first_slot].tolist(),
+            np.rint(max_temp[groups]).astype(np.int64).tolist(),
+            np.rint(min_temp[groups]).astype(np.int64).tolist(),
+            (temp_sum[groups] / n).tolist(),
+            np.rint(humidity_sum[groups] / n).astype(np.int64).tolist(),
+            rain_sum[groups].tolist()
+        )
+        first_day = first_day.tolist()
+        dates = {}
+        for g, item_index, high, low, avg_temp, avg_humidity, rainfall in rows:
+            location, offset = divmod(g, days)
+            day_number = first_day[location] + offset
+            date = dates.get(day_number)
+            if date is None:
+                date = dates[day_number] = datetime.utcfromtimestamp(day_number * 86400).strftime("%Y-%m-%d")
+            # The day's condition is taken from its first forecast slot
+            results[location]["forecast"].append({
                 "date": date,
-                "max_temp": round(max(temps)),
-                "min_temp": round(min(temps)),
-                "humidity": round(humidity),
+                "max_temp": high,
+                "min_temp": low,
+                "avg_temp": round(avg_temp, 1),
+                "humidity": avg_humidity,
                 "rainfall": round(rainfall, 1),
-                "condition": day_data[0]["weather"][0]["main"].lower()
+                "condition": items[item_index]["weather"][0]["main"].lower()
             })
         
-        return {
-            "location": data["city"]["name"],
-            "forecast": forecasts
-        }
+        self.aggregation_latency.record((time.perf_counter() - started) * 1000)
+        return results
     
     def _get_mock_weather_data(self, location: str) -> Dict[str, Any]:
         """Return mock weather data when API fails"""
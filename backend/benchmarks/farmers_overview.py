@@ -0,0 +1,167 @@
+"""Admin farmers overview: batched lookups vs the former per-farmer (N+1) queries.
+
+Seeds a synthetic dataset, 10k farmers by default, on an in-memory database.
+The dashboard is sized for 100k farmers, but the in-memory database has no
+indexes and re-evaluates an aggregation's results on every cursor step, so
+its cost grows with the square of the collection size and a 100k run does
+not finish in useful time. The query counts do not depend on the dataset
+size, since both paths are bounded by the page, and the in-process time
+mostly measures the mock; the round trips counted, and the estimate at a
+network round-trip time, are the figures to compare.
+
+    python -m benchmarks.farmers_overview [--farmers 10000] [--limit 50]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from mongomock_motor import AsyncMongoMockClient
+
+from app.routers import admin
+
+CROPS = ["paddy", "coconut", "banana", "pepper", "rubber"]
+
+
+class CountingDatabase:
+    """Wrap a Motor database and count the queries sent to it"""
+
+    def __init__(self, database):
+        self._database = database
+        self.queries = 0
+
+    def __getattr__(self, name):
+        return CountingCollection(self, getattr(self._database, name))
+
+
+class CountingCollection:
+    METHODS = {
+        "find", "find_one", "count_documents", "aggregate", "insert_one", "insert_many",
+        "update_one", "update_many", "find_one_and_update", "bulk_write"
+    }
+
+    def __init__(self, counter: CountingDatabase, collection):
+        self._counter = counter
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in self.METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._counter.queries += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+async def per_farmer_overview(db, query: dict, skip: int, limit: int) -> list:
+    """The former overview: four queries for every farmer on the page"""
+    farmers = await db.users.find(query).skip(skip).limit(limit).to_list(length=limit)
+    enriched_farmers = []
+    for farmer in farmers:
+        farmer_id = farmer.get("mobile", str(farmer["_id"]))
+        farm = await db.farms.find_one({"user_id": farmer_id, "is_active": True})
+        activities_count = await db.activities.count_documents({"user_id": farmer_id, "is_deleted": False})
+        schemes_count = await db.scheme_applications.count_documents({"user_id": farmer_id})
+        last_activity = await db.activities.find_one(
+            {"user_id": farmer_id, "is_deleted": False},
+            sort=[("created_at", -1)]
+        )
+
+        days_since_activity = 999
+        if last_activity:
+            days_since_activity = (time.time() - last_activity.get("created_at", 0)) / 86400
+
+        enriched_farmers.append({
+            "id": str(farmer["_id"]),
+            "name": farmer.get("name"),
+            "mobile": farmer.get("mobile"),
+            "district": farmer.get("district"),
+            "panchayat": farmer.get("panchayat"),
+            "location": farmer.get("location"),
+            "created_at": farmer.get("created_at"),
+            "last_login": farmer.get("last_login"),
+            "status": "active" if days_since_activity <= 7 else "inactive",
+            "farm_data": {
+                "crop": farm.get("current_crop") if farm else None,
+                "land_size": farm.get("land_size") if farm else 0,
+                "soil_type": farm.get("soil_type") if farm else None,
+                "location": farm.get("location") if farm else None
+            },
+            "activities_count": activities_count,
+            "schemes_applied": schemes_count,
+            "last_activity": last_activity.get("created_at") if last_activity else None
+        })
+    return enriched_farmers
+
+
+async def batched_overview(db, query: dict, page: int, limit: int) -> list:
+    """The current endpoint, called directly without its rate limit"""
+    response = await admin.get_farmers_overview.__wrapped__(
+        request=None, page=page, limit=limit, district=query.get("district"), status=None,
+        admin_user={"role": "admin"}, db=db
+    )
+    return response["data"]
+
+
+async def seed(db, farmers: int = 100, seed: int = 11):
+    """Farmers with an active farm (most of them), activities and applications.
+
+    Activity times are Unix timestamps, the form the former overview handled.
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    users, farms, activities, applications = [], [], [], []
+    for i in range(farmers):
+        mobile = f"9{i:09d}"
+        users.append({"mobile": mobile, "name": f"Farmer {i}", "role": "farmer",
+                      "district": rng.choice(["Thrissur", "Palakkad"]), "created_at": now - 86400 * 90})
+        if rng.random() < 0.9:
+            farms.append({"user_id": mobile, "is_active": True, "current_crop": rng.choice(CROPS),
+                          "land_size": rng.randint(1, 20), "soil_type": "laterite", "location": "Thrissur"})
+        for _ in range(rng.randint(0, 6)):
+            activities.append({"user_id": mobile, "is_deleted": rng.random() < 0.2,
+                               "created_at": now - 86400 * rng.uniform(0, 20)})
+        for _ in range(rng.randint(0, 2)):
+            applications.append({"user_id": mobile, "scheme_id": "pm-kisan"})
+    for collection, documents in (("users", users), ("farms", farms),
+                                  ("activities", activities), ("scheme_applications", applications)):
+        if documents:
+            await db[collection].insert_many(documents)
+
+
+async def _timed(fn, db: CountingDatabase) -> dict:
+    db.queries = 0
+    started = time.perf_counter()
+    result = await fn(db)
+    return {"result": result, "queries": db.queries, "ms": (time.perf_counter() - started) * 1000}
+
+
+def run(farmers: int = 10_000, limit: int = 50, round_trip_ms: float = 2.0) -> dict:
+    async def measure():
+        database = AsyncMongoMockClient()["farmers-overview-benchmark"]
+        await seed(database, farmers)
+        db = CountingDatabase(database)
+        old = await _timed(lambda db: per_farmer_overview(db, {}, 0, limit), db)
+        new = await _timed(lambda db: batched_overview(db, {}, 1, limit), db)
+        return old, new
+
+    old, new = asyncio.run(measure())
+    report = {"farmers": farmers, "page_size": limit, "identical": old["result"] == new["result"]}
+    for name, measured in (("per_farmer", old), ("batched", new)):
+        report[name] = {
+            "queries": measured["queries"],
+            "in_process_ms": round(measured["ms"], 1),
+            f"estimated_ms_at_{round_trip_ms:g}ms_rtt": round(measured["ms"] + measured["queries"] * round_trip_ms, 1),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--farmers", type=int, default=10_000, help="synthetic farmers to seed")
+    parser.add_argument("--limit", type=int, default=50, help="overview page size")
+    args = parser.parse_args()
+    for key, value in run(farmers=args.farmers, limit=args.limit).items():
+        print(f"{key}: {value}")
@@ -0,0 +1,92 @@
+"""Daily forecast aggregation for many locations: NumPy batch vs one loop per location.
+
+Runs offline on synthetic 5-day / 3-hour OpenWeatherMap payloads and checks
+both paths produce the same daily summaries.
+
+    python -m benchmarks.forecast_aggregation
+"""
+from datetime import datetime
+import random
+import statistics
+import time
+
+from app.services.weather_service import WeatherService
+
+CONDITIONS = ["Clear", "Clouds", "Rain", "Thunderstorm"]
+
+
+def make_payloads(locations: int = 1000, slots: int = 40, seed: int = 7) -> list:
+    """Forecast payloads shaped like the OpenWeatherMap /forecast response"""
+    rng = random.Random(seed)
+    start = int(datetime(2026, 6, 1, 3).timestamp()) // 10800 * 10800
+    payloads = []
+    for i in range(locations):
+        items = []
+        for slot in range(slots):
+            dt = start + slot * 10800
+            item = {
+                "dt": dt,
+                "dt_txt": datetime.utcfromtimestamp(dt).strftime("%Y-%m-%d %H:%M:%S"),
+                "main": {"temp": round(rng.uniform(22, 36), 2), "humidity": rng.randint(55, 98)},
+                "weather": [{"main": rng.choice(CONDITIONS)}]
+            }
+            if rng.random() < 0.3:
+                item["rain"] = {"3h": round(rng.uniform(0.1, 12), 2)}
+            items.append(item)
+        payloads.append({"city": {"name": f"Location {i}"}, "list": items})
+    return payloads
+
+
+def per_location(data: dict, days: int = 5) -> dict:
+    """The former formatter: group one location's items by date in Python"""
+    daily_data = {}
+    for item in data["list"]:
+        daily_data.setdefault(item["dt_txt"].split(" ")[0], []).append(item)
+
+    forecasts = []
+    for date, day_data in list(daily_data.items())[:days]:
+        temps = [item["main"]["temp"] for item in day_data]
+        humidity = sum(item["main"]["humidity"] for item in day_data) / len(day_data)
+        rainfall = sum(item.get("rain", {}).get("3h", 0) for item in day_data)
+        forecasts.append({
+            "date": date,
+            "max_temp": round(max(temps)),
+            "min_temp": round(min(temps)),
+            "avg_temp": round(sum(temps) / len(temps), 1),
+            "humidity": round(humidity),
+            "rainfall": round(rainfall, 1),
+            "condition": day_data[0]["weather"][0]["main"].lower()
+        })
+    return {"location": data["city"]["name"], "forecast": forecasts}
+
+
+def _best_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def run(locations: int = 1000, repeat: int = 5) -> dict:
+    service = WeatherService()
+    payloads = make_payloads(locations)
+
+    batched = service._aggregate_forecasts(payloads)
+    looped = [per_location(data) for data in payloads]
+    loop_best, loop_median = _best_ms(lambda: [per_location(data) for data in payloads], repeat)
+    numpy_best, numpy_median = _best_ms(lambda: service._aggregate_forecasts(payloads), repeat)
+
+    return {
+        "locations": locations,
+        "identical": batched == looped,
+        "per_location_ms": {"best": round(loop_best, 1), "median": round(loop_median, 1)},
+        "numpy_ms": {"best": round(numpy_best, 1), "median": round(numpy_median, 1)},
+        "speedup": round(loop_best / numpy_best, 2),
+    }
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,79 @@
+"""Accuracy and latency of the offline language detector on labelled farmer messages.
+
+    python -m benchmarks.language_detection
+"""
+from collections import Counter
+import statistics
+import time
+
+from app.services.language_detection import MANGLISH, detect_script_language
+
+SAMPLES = [
+    # Malayalam script
+    ("തെങ്ങിന് എപ്പോൾ വളം ഇടണം?", "ml"),
+    ("നെല്ലിൽ തണ്ടുതുരപ്പൻ ശല്യം എങ്ങനെ നിയന്ത്രിക്കാം", "ml"),
+    ("വാഴയുടെ ഇലകൾ മഞ്ഞളിക്കുന്നു", "ml"),
+    ("കുരുമുളക് വള്ളി വാടുന്നു, എന്ത് ചെയ്യണം?", "ml"),
+    ("ഇന്ന് മഴ പെയ്യുമോ?", "ml"),
+    ("റബ്ബർ ടാപ്പിംഗ് എപ്പോൾ തുടങ്ങണം", "ml"),
+    ("എന്റെ brinjal ചെടിയിൽ പുഴു", "ml"),
+    ("ഇഞ്ചി നടാൻ പറ്റിയ സമയം ഏതാണ്", "ml"),
+    ("ഏലത്തിന് ഇലപ്പേൻ ശല്യം", "ml"),
+    ("മണ്ണ് പരിശോധന എവിടെ ചെയ്യാം", "ml"),
+    # Manglish
+    ("coconut valam", MANGLISH),
+    ("thenginu enthu valam idanam", MANGLISH),
+    ("nellu krishi engane cheyyam", MANGLISH),
+    ("vazha ila manjal aakunnu", MANGLISH),
+    ("ente kurumulaku chedi vadunnu", MANGLISH),
+    ("innu mazha undo", MANGLISH),
+    ("keedam shalyam undu enthu cheyyanam", MANGLISH),
+    ("inchi nadan pattiya samayam", MANGLISH),
+    ("ethra vellam venam", MANGLISH),
+    ("njan paddy krishi cheyyunnu", MANGLISH),
+    ("pavakka puzhu undu", MANGLISH),
+    ("elam rogam kooduthal aanu", MANGLISH),
+    # English
+    ("When should I apply fertilizer to coconut?", "en"),
+    ("How to control stem borer in paddy", "en"),
+    ("My banana leaves are turning yellow", "en"),
+    ("Will it rain today?", "en"),
+    ("What is the price of pepper this week", "en"),
+    ("rubber tapping time", "en"),
+    ("brinjal fruit borer", "en"),
+    ("Which scheme gives subsidy for drip irrigation", "en"),
+    ("soil test for laterite soil", "en"),
+    ("pest attack on ginger", "en"),
+    ("how much water for banana in summer", "en"),
+    ("cardamom capsule rot treatment", "en"),
+]
+
+
+def run(repeat: int = 200):
+    confusion = Counter()
+    correct = 0
+    for text, expected in SAMPLES:
+        detected, _ = detect_script_language(text)
+        confusion[(expected, detected)] += 1
+        correct += detected == expected
+
+    timings = []
+    for _ in range(repeat):
+        for text, _ in SAMPLES:
+            started = time.perf_counter()
+            detect_script_language(text)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+
+    return {
+        "samples": len(SAMPLES),
+        "accuracy": round(correct / len(SAMPLES), 3),
+        "confusion": {f"{expected}->{detected}": count for (expected, detected), count in sorted(confusion.items())},
+        "mean_us": round(statistics.fmean(timings), 1),
+        "p95_us": round(timings[int(len(timings) * 0.95)], 1),
+    }
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,117 @@
+"""/api/weather/current latency while slow Amazon Translate calls are in flight.
+
+Compares calling boto3 inline on the event loop, as the service used to,
+with the service's thread pool. Amazon Translate is replaced by a client
+that blocks for a fixed delay. Weather requests go through the real route
+and WeatherService via the ASGI app, on an in-memory database, with
+OpenWeatherMap stubbed by a transport that answers after a short await.
+
+    python -m benchmarks.translation_offload
+"""
+import asyncio
+import statistics
+import time
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app.database import db
+from app.main import app
+from app.routers import weather
+from app.services.http_client import http_clients
+from app.services.translation_service import TranslationService
+from app.services.weather_service import weather_service
+
+CURRENT_WEATHER = {
+    "name": "Thrissur",
+    "main": {"temp": 29.4, "feels_like": 33.0, "humidity": 78, "pressure": 1008},
+    "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+    "wind": {"speed": 3.1},
+    "visibility": 8000,
+    "sys": {"country": "IN"}
+}
+
+
+class SlowTranslateClient:
+    """Stands in for boto3: every call blocks its thread for `delay` seconds"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def translate_text(self, Text, SourceLanguageCode, TargetLanguageCode):
+        time.sleep(self.delay)
+        return {"TranslatedText": Text}
+
+
+def _upstream(upstream_seconds: float) -> httpx.AsyncClient:
+    async def handler(request):
+        await asyncio.sleep(upstream_seconds)
+        return httpx.Response(200, json=CURRENT_WEATHER)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _weather_request(client: httpx.AsyncClient, location: str, arrived: float) -> float:
+    response = await client.get("/api/weather/current", params={"location": location})
+    response.raise_for_status()
+    return (time.perf_counter() - arrived) * 1000
+
+
+async def _inline_translate(client: SlowTranslateClient, text: str) -> str:
+    # Before the thread pool: the blocking call ran on the event loop
+    return client.translate_text(Text=text, SourceLanguageCode="en", TargetLanguageCode="ml")["TranslatedText"]
+
+
+async def _measure(translate, mode: str, translations: int, weather_requests: int, upstream_seconds: float) -> dict:
+    db.database = AsyncMongoMockClient()["translation-offload-benchmark"]
+    http_clients._clients["openweathermap"] = _upstream(upstream_seconds)
+    upstream_calls = weather_service.get_stats()["upstream_calls"]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        started = time.perf_counter()
+        # Weather requests arrive together with the translations; latency runs from arrival.
+        # Each asks for its own place, so every one misses the cache and calls upstream.
+        translating = [asyncio.ensure_future(translate(f"Apply potash to banana {i}")) for i in range(translations)]
+        latencies = await asyncio.gather(*(
+            _weather_request(client, f"{mode} village {i}", started) for i in range(weather_requests)
+        ))
+        await asyncio.gather(*translating)
+    await http_clients._clients.pop("openweathermap").aclose()
+    latencies = sorted(latencies)
+    return {
+        "weather_p50_ms": round(statistics.median(latencies), 1),
+        "weather_max_ms": round(latencies[-1], 1),
+        "translations_ms": round((time.perf_counter() - started) * 1000, 1),
+        "weather_upstream_calls": weather_service.get_stats()["upstream_calls"] - upstream_calls,
+    }
+
+
+def run(translations: int = 8, delay: float = 0.2, weather_requests: int = 20, upstream_seconds: float = 0.01):
+    client = SlowTranslateClient(delay)
+    service = TranslationService()
+    service.translate_client = client
+    database, limiter_enabled = db.database, weather.limiter.enabled
+    weather.limiter.enabled = False
+    try:
+        # Warm the app and the clients up so the first mode measured is not penalised
+        asyncio.run(_measure(lambda text: _inline_translate(client, text), "warmup", 0, 1, upstream_seconds))
+        return {
+            # The route's own latency on the in-memory database, to read the others against
+            "no_translations": asyncio.run(_measure(
+                lambda text: _inline_translate(client, text), "baseline", 0, weather_requests, upstream_seconds
+            )),
+            "inline": asyncio.run(_measure(
+                lambda text: _inline_translate(client, text), "inline",
+                translations, weather_requests, upstream_seconds
+            )),
+            "thread_pool": asyncio.run(_measure(
+                lambda text: service.translate_text(text, "en", "ml"), "thread_pool",
+                translations, weather_requests, upstream_seconds
+            )),
+        }
+    finally:
+        service.close()
+        db.database, weather.limiter.enabled = database, limiter_enabled
+
+
+if __name__ == "__main__":
+    for mode, result in run().items():
+        print(f"{mode}: {result}")
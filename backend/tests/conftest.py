@@ -0,0 +1,34 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+
+@pytest.fixture
+def mongo():
+    """An in-memory Motor-compatible database"""
+    return AsyncMongoMockClient()["krishi-sakhi-test"]
+
+
+@pytest.fixture
+def app_db(mongo, monkeypatch):
+    """Point the application's global database handle at the in-memory one"""
+    from app.database import db
+
+    monkeypatch.setattr(db, "database", mongo)
+    return mongo
+
+
+@pytest.fixture
+def api(app_db, monkeypatch):
+    """API test client on the in-memory database, without rate limits"""
+    from fastapi.testclient import TestClient
+
+    from app.database import get_database
+    from app.main import app
+    from app.routers import admin, alerts, chat, farm, schemes, weather
+
+    for router in (admin, alerts, chat, farm, schemes, weather):
+        monkeypatch.setattr(router.limiter, "enabled", False)
+    admin.role_cache.clear()
+    app.dependency_overrides[get_database] = lambda: app_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,84 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.services import admin_export
+
+ADMIN = {"X-User-Id": "9000000001"}
+
+
+def test_lookup_follows_paths_and_formats_values():
+    _id = ObjectId()
+    document = {"_id": _id, "created_at": datetime(2024, 3, 1, 8, 30), "farm": {"land_size": 2.5}, "user_data": None}
+    assert admin_export._lookup(document, "_id") == str(_id)
+    assert admin_export._lookup(document, "created_at") == "2024-03-01T08:30:00"
+    assert admin_export._lookup(document, "farm.land_size") == 2.5
+    assert admin_export._lookup(document, "farm.missing") is None
+    assert admin_export._lookup(document, "user_data.district") is None
+
+
+def test_csv_safe_neutralizes_formulas():
+    assert admin_export._csv_safe("=HYPERLINK(\"http://x\")") == "'=HYPERLINK(\"http://x\")"
+    assert admin_export._csv_safe("@SUM(A1)") == "'@SUM(A1)"
+    assert admin_export._csv_safe("-2+3") == "'-2+3"
+    assert admin_export._csv_safe("Ravi") == "Ravi"
+    assert admin_export._csv_safe(-2) == -2
+
+
+async def _seed(mongo, farmers=5):
+    await mongo.users.insert_many([
+        {"mobile": f"90000000{i:02d}", "name": f"Farmer {i}", "role": "farmer", "district": "Thrissur"}
+        for i in range(farmers)
+    ])
+    await mongo.users.insert_one({"mobile": "9000000099", "name": "=cmd|' /C calc'!A0", "role": "farmer"})
+    await mongo.farms.insert_many([
+        {"user_id": "9000000001", "is_active": True, "current_crop": "paddy", "land_size": 50, "land_unit": "cents"},
+        {"user_id": "9000000002", "is_active": True, "current_crop": "banana", "land_size": 1.2, "land_unit": "hectares"},
+        {"user_id": "9000000002", "is_active": False, "current_crop": "rubber", "land_size": 9, "land_unit": "hectares"},
+    ])
+
+
+def _export(mongo, export_format, compress, monkeypatch, batch_size=2, chunk_bytes=64):
+    monkeypatch.setattr(admin_export.settings, "ADMIN_EXPORT_BATCH_SIZE", batch_size)
+    monkeypatch.setattr(admin_export.settings, "ADMIN_EXPORT_CHUNK_BYTES", chunk_bytes)
+
+    async def collect():
+        await _seed(mongo)
+        return [chunk async for chunk in admin_export.stream(mongo, "farmers", export_format, compress)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_export_joins_active_farms_across_batches(mongo, monkeypatch):
+    chunks = _export(mongo, "csv", False, monkeypatch)
+    assert len(chunks) > 1
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert len(rows) == 6
+    by_mobile = {row["mobile"]: row for row in rows}
+    assert (by_mobile["9000000001"]["land_size"], by_mobile["9000000001"]["land_unit"]) == ("50", "cents")
+    assert (by_mobile["9000000002"]["crop"], by_mobile["9000000002"]["land_unit"]) == ("banana", "hectares")
+    assert by_mobile["9000000003"]["crop"] == ""
+    assert by_mobile["9000000099"]["name"].startswith("'=")
+
+
+def test_gzip_ndjson_export(mongo, monkeypatch):
+    data = gzip.decompress(b"".join(_export(mongo, "ndjson", True, monkeypatch)))
+    rows = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    assert len(rows) == 6
+    assert rows[1]["land_unit"] == "cents"
+    # NDJSON is not opened by spreadsheets, so values are left as stored
+    assert rows[-1]["name"].startswith("=")
+
+
+def test_export_endpoint(api, app_db):
+    asyncio.run(app_db.users.insert_one({"mobile": "9000000001", "role": "admin"}))
+    response = api.get("/api/admin/export/activities", params={"format": "csv", "gzip": "false"}, headers=ADMIN)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0] == "id,user_id,farm_id,type,crop,location,notes,created_at"
+    assert api.get("/api/admin/export/users", headers=ADMIN).status_code == 422
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from benchmarks import farmers_overview as benchmark
+
+
+def _compare(mongo, query, page, limit):
+    async def run():
+        await benchmark.seed(mongo, farmers=40)
+        old = await benchmark.per_farmer_overview(mongo, query, (page - 1) * limit, limit)
+        new = await benchmark.batched_overview(mongo, query, page, limit)
+        return old, new
+    return asyncio.run(run())
+
+
+def test_overview_matches_the_per_farmer_queries(mongo):
+    old, new = _compare(mongo, {}, page=1, limit=25)
+
+    assert len(new) == 25
+    assert new == old
+
+
+def test_overview_matches_on_a_filtered_later_page(mongo):
+    old, new = _compare(mongo, {"district": "Thrissur"}, page=2, limit=7)
+
+    assert new and new == old
+
+
+def test_overview_query_count_does_not_grow_with_the_page(mongo):
+    asyncio.run(benchmark.seed(mongo, farmers=40))
+    db = benchmark.CountingDatabase(mongo)
+
+    for limit in (5, 40):
+        db.queries = 0
+        asyncio.run(benchmark.batched_overview(db, {}, 1, limit))
+        assert db.queries == 5
+
+
+def test_overview_reads_datetime_activity_times(mongo):
+    async def run():
+        await mongo.users.insert_one({"mobile": "9000000002", "role": "farmer"})
+        await mongo.activities.insert_one(
+            {"user_id": "9000000002", "is_deleted": False, "created_at": datetime.utcnow() - timedelta(days=2)}
+        )
+        return await benchmark.batched_overview(mongo, {}, 1, 10)
+
+    (farmer,) = asyncio.run(run())
+
+    assert farmer["status"] == "active"
+    assert farmer["activities_count"] == 1
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import admin
+
+ADMIN = {"X-User-Id": "9000000001"}
+SECOND_ADMIN = {"X-User-Id": "9000000002"}
+FARMER = "9000000003"
+
+
+@pytest.fixture
+def users(app_db):
+    asyncio.run(app_db.users.insert_many([
+        {"mobile": "9000000001", "role": "admin", "district": "Thrissur"},
+        {"mobile": "9000000002", "role": "admin", "district": "Thrissur"},
+        {"mobile": FARMER, "role": "farmer", "district": "Thrissur"},
+    ]))
+    return app_db
+
+
+def _set_role(api, mobile, role, headers=ADMIN):
+    return api.patch(f"/api/admin/users/{mobile}/role", params={"role": role}, headers=headers)
+
+
+def test_role_lookups_are_served_from_the_cache(users):
+    admin.role_cache.clear()
+    hits = admin.role_cache.get_stats()["hits"]
+
+    async def run():
+        await admin.verify_admin_access(user_id="9000000001", db=users)
+        await users.users.delete_one({"mobile": "9000000001"})
+        return await admin.verify_admin_access(user_id="9000000001", db=users)
+
+    assert asyncio.run(run()) == {"mobile": "9000000001", "role": "admin"}
+    assert admin.role_cache.get_stats()["hits"] == hits + 1
+
+
+def test_cache_keeps_only_the_role(users):
+    admin.role_cache.clear()
+
+    asyncio.run(admin.verify_admin_access(user_id="9000000001", db=users))
+
+    assert admin.role_cache.get("9000000001") == {"role": "admin"}
+
+
+def test_unknown_users_are_not_cached(users):
+    admin.role_cache.clear()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admin.verify_admin_access(user_id="9999999999", db=users))
+
+    assert error.value.status_code == 403
+    assert admin.role_cache.get("9999999999") is None
+
+
+def test_demoted_admin_loses_access_at_once(api, users):
+    assert _set_role(api, FARMER, "admin", headers=SECOND_ADMIN).status_code == 200
+
+    assert _set_role(api, "9000000002", "farmer").status_code == 200
+
+    assert _set_role(api, FARMER, "farmer", headers=SECOND_ADMIN).status_code == 403
+
+
+def test_promoted_farmer_gains_access_at_once(api, users):
+    assert _set_role(api, "9000000002", "farmer", headers={"X-User-Id": FARMER}).status_code == 403
+
+    assert _set_role(api, FARMER, "admin").status_code == 200
+
+    assert _set_role(api, "9000000002", "farmer", headers={"X-User-Id": FARMER}).status_code == 200
+
+
+def test_admins_cannot_change_their_own_role(api, users):
+    response = _set_role(api, "9000000001", "farmer")
+
+    assert response.status_code == 400
+    assert asyncio.run(users.users.find_one({"mobile": "9000000001"}))["role"] == "admin"
+
+
+def test_role_changes_record_who_made_them(api, users):
+    assert _set_role(api, FARMER, "admin").status_code == 200
+
+    user = asyncio.run(users.users.find_one({"mobile": FARMER}))
+    assert user["role"] == "admin"
+    assert user["role_updated_by"] == "9000000001"
+    assert isinstance(user["role_updated_at"], datetime)
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+
+ADMIN = {"X-User-Id": "9000000001"}
+
+
+def _seed(mongo, applications):
+    async def seed():
+        await mongo.users.insert_one({"mobile": "9000000001", "role": "admin", "name": "Officer"})
+        result = await mongo.scheme_applications.insert_many(applications)
+        return [str(_id) for _id in result.inserted_ids]
+    return asyncio.run(seed())
+
+
+def _application(scheme_id, month, status="pending"):
+    return {
+        "user_id": "9000000002",
+        "scheme_id": scheme_id,
+        "status": status,
+        "applied_at": datetime.strptime(month, "%Y-%m"),
+        "month_bucket": month,
+    }
+
+
+def test_schemes_analytics_reads_counters(api, app_db):
+    from app.services import scheme_stats
+
+    _seed(app_db, [
+        _application("pm-kisan", "2024-03"),
+        _application("pm-kisan", "2024-04", "approved"),
+        _application("kisan-credit", "2024-04", "rejected"),
+    ])
+    asyncio.run(scheme_stats.reconcile(app_db))
+
+    data = api.get("/api/admin/schemes/analytics", headers=ADMIN).json()["data"]
+    assert data["scheme_statistics"][0] == {
+        "_id": "pm-kisan", "total_applications": 2, "approved": 1, "pending": 1, "rejected": 0
+    }
+    assert data["monthly_trends"] == [
+        {"_id": {"year": 2024, "month": 4}, "applications": 2},
+        {"_id": {"year": 2024, "month": 3}, "applications": 1},
+    ]
+
+
+def test_status_change_moves_the_count(api, app_db):
+    from app.services import scheme_stats
+
+    (application_id,) = _seed(app_db, [_application("pm-kisan", "2024-03")])
+    asyncio.run(scheme_stats.reconcile(app_db))
+
+    url = f"/api/admin/schemes/applications/{application_id}/status"
+    assert api.patch(url, params={"status": "approved"}, headers=ADMIN).json()["message"] == "Application status updated"
+    assert api.patch(url, params={"status": "approved"}, headers=ADMIN).json()["message"] == "Status unchanged"
+
+    stats = api.get("/api/admin/schemes/analytics", headers=ADMIN).json()["data"]["scheme_statistics"]
+    assert stats == [{"_id": "pm-kisan", "total_applications": 1, "approved": 1, "pending": 0, "rejected": 0}]
+
+
+def test_status_change_requires_admin(api, app_db):
+    (application_id,) = _seed(app_db, [_application("pm-kisan", "2024-03")])
+    response = api.patch(
+        f"/api/admin/schemes/applications/{application_id}/status",
+        params={"status": "approved"}, headers={"X-User-Id": "9000000002"}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services import alert_counters
+from app.services.alert_archiver import AlertArchiver
+
+
+def _alert(user_id, expired, is_read=False, is_active=True):
+    now = datetime.utcnow()
+    return {
+        "user_id": user_id, "is_read": is_read, "is_active": is_active, "created_at": now,
+        "expires_at": now - timedelta(minutes=1) if expired else now + timedelta(days=1)
+    }
+
+
+def test_expired_alerts_are_archived_in_batches_and_uncounted(app_db, monkeypatch):
+    monkeypatch.setattr(settings, "ALERT_ARCHIVE_BATCH", 2)
+    archiver = AlertArchiver()
+
+    async def scenario():
+        await app_db.alerts.insert_many([
+            _alert("u1", expired=True), _alert("u1", expired=True, is_read=True),
+            _alert("u1", expired=True, is_active=False), _alert("u1", expired=False),
+            _alert("u2", expired=True),
+        ])
+        await alert_counters.get_counts(app_db, "u1")
+        await alert_counters.get_counts(app_db, "u2")
+        await archiver.run_once()
+        return (
+            await app_db.alerts.count_documents({}),
+            await app_db.alerts_archive.count_documents({"archived_at": {"$exists": True}}),
+            await alert_counters.get_counts(app_db, "u1"),
+            await alert_counters.get_counts(app_db, "u2"),
+        )
+
+    live, archived, u1, u2 = asyncio.run(scenario())
+    assert (live, archived) == (1, 4)
+    assert u1 == {"unread": 1, "total": 1}
+    assert u2 == {"unread": 0, "total": 0}
+    assert archiver.get_stats()["archived"] == 4
+
+
+def test_rerunning_an_interrupted_batch_does_not_duplicate(app_db):
+    archiver = AlertArchiver()
+
+    async def scenario():
+        await app_db.alerts.insert_one(_alert("u1", expired=True))
+        alert = await app_db.alerts.find_one({})
+        # A previous run archived the alert but stopped before deleting it
+        await app_db.alerts_archive.insert_one({**alert, "archived_at": datetime.utcnow()})
+        await archiver.run_once()
+        return await app_db.alerts_archive.count_documents({}), await app_db.alerts.count_documents({})
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+
+def test_counters_are_reconciled_on_schedule(app_db, monkeypatch):
+    monkeypatch.setattr(settings, "ALERT_COUNTER_RECONCILE_SECONDS", 3600)
+    archiver = AlertArchiver()
+
+    async def scenario():
+        await app_db.alerts.insert_one(_alert("u1", expired=False))
+        await app_db.alert_counters.insert_one({"_id": "u1", "unread": 5, "total": 5})
+        await archiver.run_once()
+        first = await app_db.alert_counters.find_one({"_id": "u1"})
+        await app_db.alert_counters.update_one({"_id": "u1"}, {"$set": {"unread": 9}})
+        await archiver.run_once()
+        second = await app_db.alert_counters.find_one({"_id": "u1"})
+        return first["unread"], second["unread"]
+
+    # The second run is within the interval, so the new drift waits for the next reconcile
+    assert asyncio.run(scenario()) == (1, 9)
+    assert archiver.get_stats()["counters_reconciled"] == 1
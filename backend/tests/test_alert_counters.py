@@ -0,0 +1,85 @@
+import asyncio
+
+from app.services import alert_counters
+from benchmarks.farmers_overview import CountingDatabase
+
+
+def _alert(user_id, is_read=False, is_active=True):
+    return {"user_id": user_id, "is_read": is_read, "is_active": is_active}
+
+
+def test_first_write_seeds_from_existing_alerts(mongo):
+    async def scenario():
+        await mongo.alerts.insert_many([_alert("u1"), _alert("u1", is_read=True), _alert("u1")])
+        # A mark-read is the first write for a user with history
+        await mongo.alerts.update_one({"user_id": "u1", "is_read": False}, {"$set": {"is_read": True}})
+        await alert_counters.increment(mongo, "u1", unread=-1)
+        return await alert_counters.get_counts(mongo, "u1")
+
+    assert asyncio.run(scenario()) == {"unread": 1, "total": 3}
+
+
+def test_new_alerts_for_uncounted_user_include_history(mongo):
+    async def scenario():
+        await mongo.alerts.insert_many([_alert("u1"), _alert("u1", is_read=True)])
+        new = [_alert("u1")]
+        await mongo.alerts.insert_many(new)
+        await alert_counters.increment_for_new_alerts(mongo, new)
+        return await alert_counters.get_counts(mongo, "u1")
+
+    assert asyncio.run(scenario()) == {"unread": 2, "total": 3}
+
+
+def test_uncounted_users_are_seeded_in_one_batch(mongo):
+    db = CountingDatabase(mongo)
+
+    async def scenario():
+        await mongo.alerts.insert_many([_alert(f"u{i}", is_read=True) for i in range(50)])
+        new = [_alert(f"u{i}") for i in range(50)] + [_alert("u0")]
+        await mongo.alerts.insert_many(new)
+        await mongo.alert_counters.insert_one({"_id": "u1", "unread": 1, "total": 2})
+        await alert_counters.increment_for_new_alerts(db, new)
+        return [await alert_counters.get_counts(mongo, user_id) for user_id in ("u0", "u1", "u49")]
+
+    assert asyncio.run(scenario()) == [
+        {"unread": 2, "total": 3}, {"unread": 2, "total": 3}, {"unread": 1, "total": 2}
+    ]
+    # $inc, existing counters, one aggregation and one upsert batch
+    assert db.queries == 4
+
+
+def test_existing_counter_is_incremented(mongo):
+    async def scenario():
+        await mongo.alerts.insert_one(_alert("u1"))
+        await alert_counters.get_counts(mongo, "u1")
+        new = [_alert("u1"), _alert("u1")]
+        await mongo.alerts.insert_many(new)
+        await alert_counters.increment_for_new_alerts(mongo, new)
+        return await alert_counters.get_counts(mongo, "u1")
+
+    assert asyncio.run(scenario()) == {"unread": 3, "total": 3}
+
+
+def test_reconcile_corrects_drift(mongo):
+    async def scenario():
+        await mongo.alerts.insert_many([_alert("u1"), _alert("u2", is_read=True)])
+        await mongo.alert_counters.insert_many([
+            {"_id": "u1", "unread": 5, "total": 5},
+            {"_id": "u3", "unread": -2, "total": 1}
+        ])
+        corrected = await alert_counters.reconcile(mongo)
+        counters = {c["_id"]: (c["unread"], c["total"]) async for c in mongo.alert_counters.find({})}
+        return sorted(corrected), counters
+
+    corrected, counters = asyncio.run(scenario())
+    assert corrected == ["u1", "u2", "u3"]
+    assert counters == {"u1": (1, 1), "u2": (0, 1), "u3": (0, 0)}
+
+
+def test_reconcile_keeps_consistent_counters(mongo):
+    async def scenario():
+        await mongo.alerts.insert_one(_alert("u1"))
+        await alert_counters.get_counts(mongo, "u1")
+        return await alert_counters.reconcile(mongo)
+
+    assert asyncio.run(scenario()) == []
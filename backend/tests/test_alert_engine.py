@@ -0,0 +1,142 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.services.alert_engine import AlertEngine, alert_fingerprint, heat_band, rain_band
+from app.services.weather_service import weather_service
+
+
+def _forecast(rain_per_slot=0.0, temp=30.0, wind=2.0, slots=16):
+    start = int(time.time())
+    return {"list": [
+        {
+            "dt": start + i * 3 * 3600,
+            "main": {"temp": temp, "temp_max": temp},
+            "rain": {"3h": rain_per_slot},
+            "wind": {"speed": wind}
+        }
+        for i in range(slots)
+    ]}
+
+
+def _farm(user_id="u1", crop="paddy", location="Thrissur"):
+    return {"user_id": user_id, "current_crop": crop, "location": location, "soil_type": "laterite"}
+
+
+def _evaluate(farm, forecast):
+    key, _ = weather_service.resolve_location(farm["location"])
+    return AlertEngine().evaluate([farm], {key: forecast})
+
+
+def test_fingerprint_is_stable_within_a_window():
+    window = timedelta(days=1)
+    morning = datetime(2024, 7, 1, 6)
+    evening = datetime(2024, 7, 1, 20)
+    assert alert_fingerprint("u1", "heavy_rain", window=window, at=morning) == \
+        alert_fingerprint("u1", "heavy_rain", window=window, at=evening)
+    assert alert_fingerprint("u1", "heavy_rain", window=window, at=morning) != \
+        alert_fingerprint("u1", "heavy_rain", window=window, at=morning + window)
+    assert alert_fingerprint("u1", "heavy_rain", window=window, at=morning) != \
+        alert_fingerprint("u2", "heavy_rain", window=window, at=morning)
+
+
+def test_severity_bands():
+    assert [rain_band(mm) for mm in (40, 79, 80, 160, 400)] == [0, 0, 1, 2, 3]
+    assert [heat_band(t, 35) for t in (35, 36.9, 37, 40)] == [0, 0, 1, 2]
+
+
+def test_heavy_rain_alert():
+    alerts = _evaluate(_farm(), _forecast(rain_per_slot=6.0))
+    assert [alert["rule"] for alert in alerts] == ["heavy_rain"]
+    assert "48 mm" in alerts[0]["message"]
+    assert alerts[0]["priority"] == "high"
+
+
+def test_escalating_rain_gets_a_new_fingerprint():
+    farm = _farm()
+    weaker = _evaluate(farm, _forecast(rain_per_slot=6.0))[0]
+    same_band = _evaluate(farm, _forecast(rain_per_slot=7.0))[0]
+    doubled = _evaluate(farm, _forecast(rain_per_slot=12.0))[0]
+    assert weaker["fingerprint"] == same_band["fingerprint"]
+    assert weaker["fingerprint"] != doubled["fingerprint"]
+
+
+def test_heat_stress_uses_crop_limit():
+    assert [a["rule"] for a in _evaluate(_farm(crop="cardamom"), _forecast(temp=32, wind=9))] == ["heat_stress"]
+    assert _evaluate(_farm(crop="coconut"), _forecast(temp=32, wind=9)) == []
+
+
+def test_spray_window_only_for_spray_crops():
+    assert [a["rule"] for a in _evaluate(_farm(crop="brinjal"), _forecast())] == ["spray_window"]
+    assert _evaluate(_farm(crop="rubber"), _forecast()) == []
+
+
+def test_farm_without_forecast_gets_no_weather_alerts():
+    engine = AlertEngine()
+    assert engine.evaluate([_farm()], {}) == []
+
+
+def test_write_alerts_skips_duplicates(app_db):
+    engine = AlertEngine()
+    farm = _farm()
+
+    async def scenario():
+        first = await engine.write_alerts(_evaluate(farm, _forecast(rain_per_slot=6.0)))
+        again = await engine.write_alerts(_evaluate(farm, _forecast(rain_per_slot=6.0)))
+        escalated = await engine.write_alerts(_evaluate(farm, _forecast(rain_per_slot=12.0)))
+        counter = await app_db.alert_counters.find_one({"_id": "u1"})
+        return len(first), len(again), len(escalated), await app_db.alerts.count_documents({}), counter
+
+    first, again, escalated, stored, counter = asyncio.run(scenario())
+    assert (first, again, escalated, stored) == (1, 0, 1, 2)
+    assert (counter["unread"], counter["total"]) == (2, 2)
+
+
+def test_batch_evaluation_matches_one_farm_at_a_time():
+    farms = [
+        _farm("u1", "paddy", "Thrissur"), _farm("u2", "cardamom", "Idukki"),
+        _farm("u3", "brinjal", "Thrissur"), _farm("u4", "coconut", "Palakkad"),
+    ]
+    forecasts = {
+        weather_service.resolve_location("Thrissur")[0]: _forecast(rain_per_slot=6.0),
+        weather_service.resolve_location("Idukki")[0]: _forecast(temp=33, wind=9),
+    }
+    engine = AlertEngine()
+
+    batched = engine.evaluate(farms, forecasts)
+    one_by_one = [alert for farm in farms for alert in engine.evaluate([farm], forecasts)]
+
+    def comparable(alerts):
+        # created_at and expires_at are stamped per call
+        return sorted(
+            ({k: v for k, v in alert.items() if k not in ("created_at", "expires_at")} for alert in alerts),
+            key=lambda alert: alert["fingerprint"]
+        )
+    assert comparable(batched) == comparable(one_by_one)
+    assert {alert["user_id"] for alert in batched} == {"u1", "u2", "u3"}
+
+
+def test_run_once_reads_snapshots_and_writes_in_chunks(app_db, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ALERT_ENGINE_WRITE_BATCH", 2)
+    engine = AlertEngine()
+
+    async def scenario():
+        await app_db.farms.insert_many([
+            {**_farm(f"u{i}"), "is_active": True} for i in range(5)
+        ] + [{**_farm("gone"), "is_active": False}, {**_farm("far", location="Kollam"), "is_active": True}])
+        await app_db.weather_snapshots.insert_one({
+            "_id": weather_service.resolve_location("Thrissur")[0],
+            "forecast": _forecast(rain_per_slot=6.0),
+            "refreshed_at": datetime.utcnow()
+        })
+        await engine.run_once()
+        await engine.run_once()
+        return await app_db.alerts.distinct("user_id")
+
+    users = asyncio.run(scenario())
+    assert sorted(users) == [f"u{i}" for i in range(5)]
+    stats = engine.get_stats()
+    assert (stats["runs"], stats["farms"], stats["alerts_written"]) == (2, 6, 5)
+    assert stats["duplicates_skipped"] == 5
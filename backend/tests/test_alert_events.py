@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.services.alert_events import AlertEventBus
+
+FARMER = "9000000002"
+
+
+@pytest.fixture
+def bus(app_db):
+    bus = AlertEventBus()
+    bus.mode = "local"
+    return bus
+
+
+def _drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+def test_new_alerts_reach_the_owner_with_the_counter_value(bus, mongo):
+    async def run():
+        subscription = bus.subscribe(FARMER, {}, personal_unread=0, broadcast_unread=2)
+        other = bus.subscribe("9000000003", {}, personal_unread=0, broadcast_unread=0)
+        await mongo.alert_counters.insert_one({"_id": FARMER, "unread": 4})
+        await bus.notify_alerts([{"user_id": FARMER, "title": "Rain"}])
+        return subscription, other
+    subscription, other = asyncio.run(run())
+
+    assert _drain(subscription) == [("alert", {"user_id": FARMER, "title": "Rain"}),
+                                    ("unread_count", {"unread_count": 6})]
+    assert _drain(other) == []
+
+
+def test_broadcasts_go_to_matching_subscribers_only(bus):
+    paddy = bus.subscribe(FARMER, {"district": "Thrissur", "crop": "paddy"}, 0, 0)
+    rubber = bus.subscribe("9000000003", {"district": "Thrissur", "crop": "rubber"}, 0, 0)
+
+    bus.notify_broadcast({"title": "Blast", "target": {"district": "Thrissur", "crop": "paddy"}})
+
+    assert [event for event, _ in _drain(paddy)] == ["alert", "unread_count"]
+    assert paddy.unread_count == 1
+    assert _drain(rubber) == []
+
+
+def test_reading_broadcasts_lowers_the_pushed_count(bus):
+    subscription = bus.subscribe(FARMER, {}, personal_unread=1, broadcast_unread=3, read_broadcasts=["b0"])
+
+    bus.notify_broadcasts_read(FARMER, ["b1", "b2"])
+    bus.notify_broadcasts_read(FARMER, ["b0", "b1"])
+
+    assert _drain(subscription) == [("unread_count", {"unread_count": 2})]
+
+
+def test_change_stream_mode_takes_read_state_from_alert_states(bus):
+    bus.mode = "change_stream"
+    subscription = bus.subscribe(FARMER, {}, personal_unread=0, broadcast_unread=2)
+
+    bus.notify_broadcasts_read(FARMER, ["b1"])
+    assert _drain(subscription) == []
+
+    # As written by another worker: a read, the same alert dismissed, then an unrelated state
+    bus._on_broadcast_state({"user_id": FARMER, "alert_id": "b1", "is_read": True})
+    bus._on_broadcast_state({"user_id": FARMER, "alert_id": "b1", "is_read": True, "is_dismissed": True})
+    bus._on_broadcast_state({"user_id": FARMER, "alert_id": "b2", "is_read": False})
+
+    assert _drain(subscription) == [("unread_count", {"unread_count": 1})]
+
+
+def test_slow_client_drops_its_oldest_events(bus):
+    subscription = bus.subscribe(FARMER, {}, 0, 0)
+    for i in range(subscription.queue.maxsize + 3):
+        subscription.put("alert", i)
+
+    assert subscription.dropped == 3
+    assert _drain(subscription)[0] == ("alert", 3)
+
+
+def test_unsubscribe_forgets_the_user(bus):
+    subscription = bus.subscribe(FARMER, {}, 0, 0)
+
+    bus.unsubscribe(subscription)
+
+    assert not bus.has_subscribers(FARMER)
+    assert bus.get_stats()["connections"] == 0
+
+
+def test_change_stream_mode_ignores_local_hooks(bus):
+    bus.mode = "change_stream"
+    subscription = bus.subscribe(FARMER, {}, 0, 0)
+
+    bus.notify_broadcast({"title": "Blast", "target": {}})
+
+    assert _drain(subscription) == []
@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.routers import alerts as alerts_router
+from app.services import alert_counters
+from benchmarks.farmers_overview import CountingDatabase
+
+FARMER = "9000000002"
+
+
+def _seed(mongo, personal, broadcasts, dismissed=0):
+    """Insert alerts spread over every priority and a handful of shared timestamps"""
+    now = datetime.utcnow().replace(microsecond=0)
+    expires_at = now + timedelta(days=7)
+
+    def alert(i):
+        rank = i % 3 + 1
+        return {"priority": ["high", "medium", "low"][rank - 1], "priority_rank": rank,
+                "type": "weather", "title": f"Alert {i}", "message": "Check the field",
+                "is_active": True, "expires_at": expires_at, "created_at": now - timedelta(minutes=i % 4)}
+
+    async def seed():
+        await mongo.users.insert_one({"mobile": FARMER, "district": "Thrissur"})
+        if personal:
+            await mongo.alerts.insert_many([
+                {**alert(i), "user_id": FARMER, "is_read": i % 2 == 0} for i in range(personal)
+            ])
+        if broadcasts:
+            result = await mongo.broadcast_alerts.insert_many([
+                {**alert(i), "target": {"district": "Thrissur" if i % 2 else None}} for i in range(broadcasts)
+            ])
+            for alert_id in result.inserted_ids[:dismissed]:
+                await mongo.alert_states.insert_one({"user_id": FARMER, "alert_id": alert_id, "is_dismissed": True})
+    asyncio.run(seed())
+
+
+@pytest.fixture
+def get_alerts(mongo, monkeypatch):
+    """Call the listing endpoint directly; its documents carry raw ObjectIds"""
+    monkeypatch.setattr(alerts_router.limiter, "enabled", False)
+
+    def call(cursor=None, limit=20, unread_only=False, priority=None):
+        return asyncio.run(alerts_router.get_alerts(
+            request=None, cursor=cursor, limit=limit, type=None, priority=priority,
+            unread_only=unread_only, user_id=FARMER, db=mongo
+        ))
+    return call
+
+
+def _all_pages(get_alerts, **params):
+    alerts, cursor = [], None
+    while True:
+        body = get_alerts(cursor=cursor, **params)
+        alerts += body["data"]
+        cursor = body["pagination"]["next_cursor"]
+        if not cursor:
+            return alerts, body
+
+
+def _sort_key(alert):
+    return (alert["priority_rank"], -alert["created_at"].timestamp(), -int(str(alert["_id"]), 16))
+
+
+def test_cursor_pages_cover_every_alert_once_in_order(get_alerts, mongo):
+    _seed(mongo, personal=23, broadcasts=17, dismissed=3)
+
+    alerts, body = _all_pages(get_alerts, limit=6)
+
+    assert len(alerts) == 23 + 17 - 3
+    assert len({alert["_id"] for alert in alerts}) == len(alerts)
+    assert alerts == sorted(alerts, key=_sort_key)
+    assert body["pagination"]["total"] == 37
+    assert body["pagination"]["pages"] == 7
+
+
+def test_unread_only_pages_and_counts(get_alerts, mongo):
+    _seed(mongo, personal=10, broadcasts=4)
+
+    alerts, body = _all_pages(get_alerts, limit=3, unread_only=True)
+
+    assert all(not alert["is_read"] for alert in alerts)
+    assert len(alerts) == 5 + 4
+    assert body["pagination"]["total"] == 9
+    assert body["unread_count"] == 9
+
+
+def test_filtered_total_and_unfiltered_badge(get_alerts, mongo):
+    _seed(mongo, personal=9, broadcasts=6, dismissed=1)
+    asyncio.run(mongo.alert_states.update_one({}, {"$set": {"is_dismissed": False, "is_read": True}}))
+
+    alerts, body = _all_pages(get_alerts, limit=4, priority="high", unread_only=True)
+
+    assert {alert["priority"] for alert in alerts} == {"high"}
+    assert body["pagination"]["total"] == len(alerts) == 1 + 1
+    assert body["unread_count"] == 4 + 5
+
+
+def test_broadcasts_are_counted_without_a_cap(get_alerts, mongo):
+    _seed(mongo, personal=2, broadcasts=250, dismissed=10)
+
+    body = get_alerts(limit=5)
+
+    assert body["pagination"]["total"] == 2 + 240
+    assert body["unread_count"] == 1 + 240
+
+
+def test_invalid_cursor_is_rejected(get_alerts, mongo):
+    with pytest.raises(HTTPException) as error:
+        get_alerts(cursor=f"1_not-a-date_{ObjectId()}")
+
+    assert error.value.status_code == 400
+
+
+def test_broadcasts_match_on_district_crop_and_soil(get_alerts, mongo):
+    async def seed():
+        await mongo.users.insert_one({"mobile": FARMER, "district": "Thrissur"})
+        await mongo.farms.insert_one({"user_id": FARMER, "is_active": True, "current_crop": "paddy", "soil_type": "laterite"})
+        base = {"priority": "high", "priority_rank": 1, "type": "pest", "title": "t", "message": "m",
+                "is_active": True, "expires_at": datetime.utcnow() + timedelta(days=1), "created_at": datetime.utcnow()}
+        await mongo.broadcast_alerts.insert_many([
+            {**base, "title": "everyone", "target": {}},
+            {**base, "title": "district", "target": {"district": "Thrissur", "crop": None}},
+            {**base, "title": "crop and soil", "target": {"crop": "paddy", "soil_type": "laterite"}},
+            {**base, "title": "other district", "target": {"district": "Kollam"}},
+            {**base, "title": "other crop", "target": {"crop": "rubber"}},
+            {**base, "title": "inactive", "target": {}, "is_active": False},
+            {**base, "title": "expired", "target": {}, "expires_at": datetime.utcnow() - timedelta(minutes=1)},
+        ])
+    asyncio.run(seed())
+
+    titles = {alert["title"] for alert in get_alerts()["data"]}
+
+    assert titles == {"everyone", "district", "crop and soil"}
+
+
+def test_broadcast_read_and_dismiss_are_per_user(get_alerts, mongo, monkeypatch):
+    _seed(mongo, personal=0, broadcasts=2)
+    first, second = (alert["_id"] for alert in get_alerts()["data"])
+
+    async def act():
+        await alerts_router.mark_alert_as_read(request=None, alert_id=str(first), user_id=FARMER, db=mongo)
+        await alerts_router.delete_alert(request=None, alert_id=str(second), user_id=FARMER, db=mongo)
+    asyncio.run(act())
+
+    body = get_alerts()
+    assert [(alert["_id"], alert["is_read"]) for alert in body["data"]] == [(first, True)]
+    assert body["unread_count"] == 0
+    assert asyncio.run(mongo.broadcast_alerts.count_documents({})) == 2
+
+
+def test_listing_reads_the_user_and_broadcast_state_once(mongo, monkeypatch):
+    _seed(mongo, personal=5, broadcasts=5, dismissed=1)
+    monkeypatch.setattr(alerts_router.limiter, "enabled", False)
+    db = CountingDatabase(mongo)
+    asyncio.run(alert_counters.get_counts(mongo, FARMER))
+
+    asyncio.run(alerts_router.get_alerts(
+        request=None, cursor=None, limit=20, type=None, priority=None,
+        unread_only=False, user_id=FARMER, db=db
+    ))
+
+    # Personal alerts, counter, user, farm, broadcast states, broadcasts and their counts
+    assert db.queries == 7
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.routers.farm import _farm_analytics_changes
+from app.services.analytics import AnalyticsSnapshot, SNAPSHOT_ID, _drift, bucket
+
+ADMIN = {"X-User-Id": "9000000001"}
+
+
+def test_bucket_makes_safe_field_names():
+    assert bucket("Thrissur") == "Thrissur"
+    assert bucket("St. Thomas$") == "St_ Thomas_"
+    assert bucket(None) == "unknown"
+
+
+def test_farm_changes_move_land_and_crop():
+    old = {"is_active": True, "current_crop": "paddy", "land_size": 2.0}
+    new = {"is_active": True, "current_crop": "banana", "land_size": 3.5}
+    assert _farm_analytics_changes(None, new) == {"total_land_area": 3.5, "by_crop.banana": 1}
+    assert _farm_analytics_changes(old, new) == {
+        "total_land_area": 1.5, "by_crop.paddy": -1, "by_crop.banana": 1
+    }
+    assert _farm_analytics_changes(old, dict(old)) == {"total_land_area": 0.0, "by_crop.paddy": 0}
+
+
+def test_drift_covers_flat_and_nested_counters():
+    before = {"total_farmers": 10, "by_district": {"Thrissur": 4, "Kollam": 1}}
+    counted = {"total_farmers": 9, "by_district": {"Thrissur": 4, "Idukki": 2}}
+    assert _drift(before, counted) == {
+        "total_farmers": -1, "by_district.Kollam": -1, "by_district.Idukki": 2
+    }
+
+
+async def _seed_farmers(mongo, count, district="Thrissur"):
+    await mongo.users.insert_many([
+        {"mobile": f"90000000{i:02d}", "role": "farmer", "district": district} for i in range(count)
+    ])
+
+
+def test_refresh_builds_then_corrects_snapshot(app_db):
+    snapshot = AnalyticsSnapshot()
+
+    async def scenario():
+        await _seed_farmers(app_db, 3)
+        first = await snapshot.refresh()
+        # Drift: an increment that matched no real write
+        await snapshot.increment({"total_farmers": 5, "by_district.Thrissur": 5})
+        second = await snapshot.refresh()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["total_farmers"] == 3 and first["by_district"] == {"Thrissur": 3}
+    assert second["total_farmers"] == 3 and second["by_district"] == {"Thrissur": 3}
+
+
+def test_refresh_keeps_increments_made_after_the_recount(app_db, monkeypatch):
+    from app.services import analytics
+
+    snapshot = AnalyticsSnapshot()
+
+    async def gather_then_signup(*counts):
+        results = await asyncio.gather(*counts)
+        # A signup and its $inc land after the recount, before the snapshot write
+        await app_db.users.insert_one({"mobile": "9100000000", "role": "farmer", "district": "Kollam"})
+        await snapshot.increment({"total_farmers": 1, "by_district.Kollam": 1})
+        return results
+
+    async def scenario():
+        await _seed_farmers(app_db, 2)
+        await snapshot.refresh()
+        monkeypatch.setattr(analytics, "asyncio", SimpleNamespace(gather=gather_then_signup))
+        await snapshot.refresh()
+        return await app_db.analytics_snapshots.find_one({"_id": SNAPSHOT_ID})
+
+    stored = asyncio.run(scenario())
+    assert stored["total_farmers"] == 3
+    assert stored["by_district"] == {"Thrissur": 2, "Kollam": 1}
+
+
+def test_role_change_moves_farmer_counts(api, app_db):
+    async def seed():
+        await app_db.users.insert_one({"mobile": "9000000001", "role": "admin"})
+        await _seed_farmers(app_db, 2)
+        await AnalyticsSnapshot().refresh()
+
+    asyncio.run(seed())
+    response = api.patch("/api/admin/users/9000000000/role", params={"role": "admin"}, headers=ADMIN)
+    assert response.json()["role"] == "admin"
+
+    overview = api.get("/api/admin/analytics", headers=ADMIN).json()["data"]["overview"]
+    assert overview["total_farmers"] == 1
+    stored = asyncio.run(app_db.analytics_snapshots.find_one({"_id": SNAPSHOT_ID}))
+    assert stored["by_district"] == {"Thrissur": 1}
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.cache import TTLCache, TwoTierCache
+from app.services.llm_service import IBMGraniteService
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    from app.core import cache
+
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = TTLCache(max_size=10, ttl=60)
+    ttl_cache.set("a", 1)
+
+    assert ttl_cache.get("a") == 1
+    now[0] += 61
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get_stats()["expirations"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = TTLCache(max_size=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get_stats()["evictions"] == 1
+
+
+def test_two_tier_cache_reads_through_to_mongo(app_db):
+    writer = TwoTierCache("test_cache", max_size=10, ttl=60)
+    reader = TwoTierCache("test_cache", max_size=10, ttl=60)
+
+    async def run():
+        await writer.set("answer", "Apply lime before planting")
+        first = await reader.get("answer")
+        second = await reader.get("answer")
+        return first, second
+
+    assert asyncio.run(run()) == ("Apply lime before planting",) * 2
+    stats = reader.get_stats()
+    assert (stats["mongo_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_two_tier_cache_ignores_expired_mongo_entries(app_db):
+    cache = TwoTierCache("test_cache", max_size=10, ttl=60)
+
+    async def run():
+        await app_db.test_cache.insert_one(
+            {"_id": "old", "value": "stale", "expires_at": datetime.utcnow() - timedelta(seconds=1)}
+        )
+        return await cache.get("old")
+
+    assert asyncio.run(run()) is None
+
+
+def test_two_tier_cache_works_without_a_database():
+    cache = TwoTierCache("test_cache", max_size=10, ttl=60)
+
+    async def run():
+        await cache.set("k", "v")
+        return await cache.get("k"), await cache.get("missing")
+
+    assert asyncio.run(run()) == ("v", None)
+
+
+def test_response_cache_key_normalizes_the_question():
+    service = IBMGraniteService()
+    context = {"current_crop": "banana"}
+    key = service._cache_key("When to water banana?", context)
+
+    assert service._cache_key("  when to WATER banana ", context) == key
+    assert service._cache_key("When to water banana?", {"current_crop": "paddy"}) != key
+    assert service._cache_key("When to water banana?", context, language="ml") != key
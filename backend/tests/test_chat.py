@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+from app.routers import chat
+
+FARMER = {"X-User-Id": "9000000002"}
+
+
+def _events(response):
+    """Parse a server-sent event stream into (event, data) pairs"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _saved_messages(mongo, session_id):
+    chat_session = asyncio.run(mongo.chats.find_one({"session_id": session_id}))
+    return [(message["sender"], message["content"]) for message in chat_session["messages"]]
+
+
+def _stream(api, session_id):
+    return api.post("/api/chat/message/stream", headers=FARMER, json={
+        "message": "How much water does banana need?", "session_id": session_id, "language": "en"
+    })
+
+
+def test_stream_saves_the_reply_and_finishes(api, app_db, monkeypatch):
+    async def generate(*args):
+        yield "Water "
+        yield "daily."
+    monkeypatch.setattr(chat.granite_service, "generate_response_stream", generate)
+
+    events = _events(_stream(api, "s1"))
+
+    assert [event for event, _ in events] == ["session", "token", "token", "done"]
+    assert events[-1][1]["ai_message"]["content"] == "Water daily."
+    assert _saved_messages(app_db, "s1") == [
+        ("user", "How much water does banana need?"), ("ai", "Water daily.")
+    ]
+
+
+def test_stream_failure_emits_an_error_and_keeps_the_partial_reply(api, app_db, monkeypatch):
+    async def generate(*args):
+        yield "Water "
+        raise RuntimeError("upstream reset")
+    monkeypatch.setattr(chat.granite_service, "generate_response_stream", generate)
+
+    events = _events(_stream(api, "s2"))
+
+    assert [event for event, _ in events] == ["session", "token", "error"]
+    assert _saved_messages(app_db, "s2") == [
+        ("user", "How much water does banana need?"), ("ai", "Water")
+    ]
+
+
+def test_upstream_reset_mid_stream_reaches_the_client_as_an_error(api, app_db, monkeypatch):
+    async def upstream(*args):
+        yield "Water "
+        raise RuntimeError("connection reset")
+    monkeypatch.setattr(chat.granite_service, "_retrieve", lambda prompt, context, language: (None, []))
+    monkeypatch.setattr(chat.granite_service, "_request_generation_stream", upstream)
+
+    events = _events(_stream(api, "s4"))
+
+    assert [event for event, _ in events] == ["session", "token", "error"]
+    chat_session = asyncio.run(app_db.chats.find_one({"session_id": "s4"}))
+    assert [(message["content"], message["is_incomplete"]) for message in chat_session["messages"]] == [
+        ("How much water does banana need?", False), ("Water", True)
+    ]
+
+
+def test_stream_failure_before_any_text_saves_the_question(api, app_db, monkeypatch):
+    async def generate(*args):
+        raise RuntimeError("upstream down")
+        yield
+    monkeypatch.setattr(chat.granite_service, "generate_response_stream", generate)
+
+    events = _events(_stream(api, "s3"))
+
+    assert [event for event, _ in events] == ["session", "error"]
+    assert _saved_messages(app_db, "s3") == [("user", "How much water does banana need?")]
+
+
+def _send(mongo, monkeypatch, answer, budget=0.05):
+    """Call send_message directly, then wait for any background upgrade"""
+    from app.models.chat import ChatRequest
+
+    async def fallback(message_for_ai, context, pipeline):
+        return "Local advice"
+    monkeypatch.setattr(chat, "_generate_answer", answer)
+    monkeypatch.setattr(chat, "_fallback_answer", fallback)
+    monkeypatch.setattr(chat, "hedge_metrics", {"provisional": 0, "upgraded": 0, "abandoned": 0})
+
+    async def run():
+        response = await chat.send_message.__wrapped__(
+            request=None, user_id="9000000002", db=mongo,
+            chat_request=ChatRequest(message="When to sow paddy?", session_id="h1", latency_budget=budget)
+        )
+        await asyncio.gather(*chat._background_tasks)
+        return response["data"]["ai_message"]
+
+    ai_message = asyncio.run(run())
+    saved = asyncio.run(mongo.chats.find_one({"session_id": "h1"}))["messages"][-1]
+    return ai_message, saved
+
+
+def test_answer_within_budget_is_final(mongo, monkeypatch):
+    async def answer(*args):
+        return "Sow in June"
+
+    ai_message, saved = _send(mongo, monkeypatch, answer)
+
+    assert (ai_message.content, ai_message.is_provisional) == ("Sow in June", False)
+    assert chat.hedge_metrics["provisional"] == 0
+
+
+def test_slow_answer_replaces_the_provisional_one(mongo, monkeypatch):
+    async def answer(*args):
+        await asyncio.sleep(0.2)
+        return "Sow in June"
+
+    ai_message, saved = _send(mongo, monkeypatch, answer)
+
+    assert (ai_message.content, ai_message.is_provisional) == ("Local advice", True)
+    assert (saved["content"], saved["is_provisional"]) == ("Sow in June", False)
+    assert chat.hedge_metrics == {"provisional": 1, "upgraded": 1, "abandoned": 0}
+
+
+def test_failed_slow_answer_keeps_the_fallback(mongo, monkeypatch):
+    async def answer(*args):
+        await asyncio.sleep(0.2)
+        raise chat.GraniteUnavailableError("upstream down")
+
+    ai_message, saved = _send(mongo, monkeypatch, answer)
+
+    assert (saved["content"], saved["is_provisional"]) == ("Local advice", False)
+    assert chat.hedge_metrics["abandoned"] == 1
+
+
+def test_unavailable_llm_falls_back_without_an_upgrade(mongo, monkeypatch):
+    async def answer(*args):
+        raise chat.GraniteUnavailableError("circuit open")
+
+    ai_message, saved = _send(mongo, monkeypatch, answer)
+
+    assert (ai_message.content, ai_message.is_provisional) == ("Local advice", False)
+    assert chat.hedge_metrics["provisional"] == 0
+
+
+def _pipeline_calls(monkeypatch, granite_answer):
+    """Record Granite and Translate calls made while answering"""
+    calls = []
+
+    async def generate(prompt, context=None, language="en"):
+        calls.append(("generate", language))
+        return granite_answer
+
+    async def translate(text, source, target):
+        calls.append(("translate", source, target))
+        return "തർജ്ജമ"
+    monkeypatch.setattr(chat.granite_service, "generate", generate)
+    monkeypatch.setattr(chat.translation_service, "translate_text", translate)
+    return calls
+
+
+def test_native_pipeline_keeps_a_malayalam_answer(monkeypatch):
+    calls = _pipeline_calls(monkeypatch, "ജൂണിൽ വിതയ്ക്കുക")
+
+    assert asyncio.run(chat._generate_answer("എപ്പോൾ വിതയ്ക്കണം", {}, "ml_native")) == "ജൂണിൽ വിതയ്ക്കുക"
+    assert calls == [("generate", "ml")]
+
+
+def test_native_pipeline_translates_an_english_answer(monkeypatch):
+    calls = _pipeline_calls(monkeypatch, "Sow in June")
+
+    assert asyncio.run(chat._generate_answer("എപ്പോൾ വിതയ്ക്കണം", {}, "ml_native")) == "തർജ്ജമ"
+    assert calls == [("generate", "ml"), ("translate", "en", "ml")]
+
+
+def test_translate_pipeline_wraps_an_english_answer(monkeypatch):
+    calls = _pipeline_calls(monkeypatch, "Sow in June")
+
+    assert asyncio.run(chat._prepare_prompt("എപ്പോൾ വിതയ്ക്കണം", "ml_translate")) == "തർജ്ജമ"
+    assert asyncio.run(chat._generate_answer("When to sow?", {}, "ml_translate")) == "തർജ്ജമ"
+    assert calls == [("translate", "ml", "en"), ("generate", "en"), ("translate", "en", "ml")]
+
+
+def test_english_pipeline_skips_translation(monkeypatch):
+    calls = _pipeline_calls(monkeypatch, "Sow in June")
+
+    assert asyncio.run(chat._prepare_prompt("When to sow?", "en")) == "When to sow?"
+    assert asyncio.run(chat._generate_answer("When to sow?", {}, "en")) == "Sow in June"
+    assert calls == [("generate", "en")]
@@ -0,0 +1,20 @@
+import asyncio
+
+
+def test_ensure_indexes_is_idempotent_and_drops_nothing(app_db):
+    from app.database import ensure_indexes
+
+    async def run():
+        await app_db.alerts.create_index("location", name="operator_index")
+        await ensure_indexes()
+        first = await app_db.alerts.index_information()
+        await ensure_indexes()
+        return first, await app_db.alerts.index_information()
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert "operator_index" in second
+    assert second["active_alerts_by_user"]["key"] == [
+        ("user_id", 1), ("priority_rank", 1), ("created_at", -1), ("_id", -1)
+    ]
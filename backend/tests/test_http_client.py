@@ -0,0 +1,60 @@
+import asyncio
+import functools
+
+import httpx
+
+from app.services import http_client
+from app.services.http_client import UPSTREAMS, HTTPClientRegistry
+
+
+def test_clients_are_shared_per_upstream():
+    registry = HTTPClientRegistry()
+
+    assert registry.get("openweathermap") is registry.get("openweathermap")
+    assert registry.get("openweathermap") is not registry.get("ibm_granite")
+
+
+def test_clients_use_the_upstream_limits_and_timeouts():
+    client = HTTPClientRegistry().get("ibm_granite")
+
+    assert client.timeout.read == UPSTREAMS["ibm_granite"]["read_timeout"]
+    assert client.timeout.connect == UPSTREAMS["ibm_granite"]["connect_timeout"]
+
+
+def test_start_and_close_manage_every_pool():
+    registry = HTTPClientRegistry()
+
+    async def run():
+        await registry.start()
+        clients = dict(registry._clients)
+        await registry.close()
+        return clients
+
+    clients = asyncio.run(run())
+    assert set(clients) == set(UPSTREAMS)
+    assert all(client.is_closed for client in clients.values())
+    assert registry._clients == {}
+
+
+def test_closed_client_is_replaced():
+    registry = HTTPClientRegistry()
+    client = registry.get("ibm_iam")
+    asyncio.run(client.aclose())
+
+    assert registry.get("ibm_iam") is not client
+
+
+def test_requests_are_counted_per_upstream(monkeypatch):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+    monkeypatch.setattr(http_client.httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=transport))
+    registry = HTTPClientRegistry()
+
+    async def run():
+        for _ in range(3):
+            await registry.get("openweathermap").get("https://api.openweathermap.org/data/2.5/weather")
+        await registry.get("ibm_iam").post("https://iam.cloud.ibm.com/identity/token")
+
+    asyncio.run(run())
+    stats = registry.get_stats()
+    assert stats["openweathermap"]["requests"] == 3
+    assert stats["ibm_iam"]["requests"] == 1
@@ -0,0 +1,46 @@
+from app.services.knowledge_base import KnowledgeBase, tokenize
+from app.services.llm_service import granite_service
+
+
+def _top(query, crop=None):
+    kb = KnowledgeBase()
+    kb.build()
+    return kb.search(query, crop=crop, limit=1)[0]
+
+
+def test_tokenize_keeps_malayalam_words():
+    assert "കീടം" in tokenize("കീടം ശല്യം")
+
+
+def test_specific_questions_find_their_advisory():
+    for query, expected in [
+        ("stem borer in my paddy", "paddy-stem-borer"),
+        ("coconut bud rot", "coconut-bud-rot"),
+        ("thrips in cardamom", "cardamom-thrips"),
+        ("banana leaf spot", "banana-sigatoka"),
+    ]:
+        hit = _top(query)
+        assert hit.entry["id"] == expected
+        assert hit.confidence >= 0.7
+
+
+def test_farm_crop_boosts_matching_entries():
+    assert _top("leaf spot", crop="banana").entry["crop"] == "banana"
+    assert _top("leaf spot", crop="turmeric").entry["crop"] == "turmeric"
+
+
+def test_vague_questions_have_low_confidence():
+    assert _top("paddy").confidence < 0.1
+    assert _top("my coconut tree", crop="coconut").confidence < 0.1
+
+
+def test_fallback_skips_weak_matches():
+    generic = granite_service.get_fallback_response("something unrelated entirely")
+    assert granite_service.get_fallback_response("paddy") == generic
+    assert granite_service.get_fallback_response("my coconut tree") == generic
+    assert granite_service.get_fallback_response("my coconut tree", {"current_crop": "coconut"}) == generic
+
+
+def test_fallback_uses_confident_match():
+    answer = granite_service.get_fallback_response("coconut bud rot", language="en")
+    assert answer == _top("coconut bud rot").text("en")
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.models.chat import ChatRequest
+from app.routers import chat
+from app.services.language_detection import MANGLISH, detect_script_language
+from benchmarks import language_detection as benchmark
+
+
+def test_malayalam_script():
+    language, confidence = detect_script_language("തെങ്ങിന് എപ്പോൾ വളം ഇടണം?")
+    assert language == "ml"
+    assert confidence >= 0.9
+
+
+def test_manglish_is_not_labelled_malayalam_script():
+    assert detect_script_language("coconut valam")[0] == MANGLISH
+    assert detect_script_language("thenginu enthu valam idanam")[0] == MANGLISH
+
+
+def test_english():
+    assert detect_script_language("How to control stem borer in paddy")[0] == "en"
+
+
+def test_crop_names_are_neutral():
+    assert detect_script_language("brinjal fruit borer")[0] == "en"
+
+
+def test_empty_text_is_unsure_english():
+    assert detect_script_language("123 ?!") == ("en", 0.0)
+
+
+def test_labelled_sample_accuracy():
+    assert benchmark.run(repeat=1)["accuracy"] >= 0.95
+
+
+def _request(message, language, pipeline=None):
+    request = ChatRequest(message=message, pipeline=pipeline)
+    request.language = language
+    return request
+
+
+def test_manglish_goes_native_and_is_stored_as_malayalam(monkeypatch):
+    async def detect(text):
+        return MANGLISH
+    monkeypatch.setattr(chat.translation_service, "detect_language", detect)
+
+    request = _request("coconut valam", "auto")
+    assert asyncio.run(chat._resolve_pipeline(request)) == "ml_native"
+    assert request.language == "ml"
+
+
+def test_latin_text_marked_malayalam_is_never_translated():
+    assert chat._choose_pipeline(_request("coconut valam", "ml", pipeline="translate")) == "ml_native"
+
+
+def test_malayalam_script_uses_configured_pipeline():
+    message = "തെങ്ങിന് എപ്പോൾ വളം ഇടണം?"
+    assert chat._choose_pipeline(_request(message, "ml", pipeline="translate")) == "ml_translate"
+    assert chat._choose_pipeline(_request(message, "ml", pipeline="native")) == "ml_native"
+    assert chat._choose_pipeline(_request("How to water coconut", "en")) == "en"
@@ -0,0 +1,188 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.resilience import ConcurrencyLimiter
+from app.services.http_client import http_clients
+from app.services.llm_service import GraniteUnavailableError, IAMTokenManager, IBMGraniteService
+
+
+@pytest.fixture
+def granite(app_db, monkeypatch):
+    """A Granite service that skips retrieval and streams from a fake upstream"""
+    service = IBMGraniteService()
+    monkeypatch.setattr(service, "_retrieve", lambda prompt, context, language: (None, []))
+    return service
+
+
+def _consume(service, prompt="how do I grow pepper", observe=None):
+    async def run():
+        chunks = []
+        async for text in service.generate_response_stream(prompt):
+            chunks.append(text)
+            if observe:
+                observe(service)
+        return chunks
+    return asyncio.run(run())
+
+
+def test_stream_holds_its_slot_until_it_finishes(granite, monkeypatch):
+    async def upstream(*args):
+        yield "Pepper "
+        yield "needs shade."
+    monkeypatch.setattr(granite, "_request_generation_stream", upstream)
+    in_flight = []
+
+    chunks = _consume(granite, observe=lambda service: in_flight.append(service.stream_limiter.get_stats()["in_flight"]))
+
+    assert chunks == ["Pepper ", "needs shade."]
+    assert in_flight == [1, 1]
+    assert granite.stream_limiter.get_stats()["in_flight"] == 0
+    assert granite.circuit_breaker.get_stats()["successes"] == 1
+
+
+def test_streams_beyond_the_limit_fall_back(granite, monkeypatch):
+    monkeypatch.setattr(granite, "stream_limiter", ConcurrencyLimiter("test", 1, 0, 0.01))
+    release = asyncio.Event()
+
+    async def upstream(*args):
+        yield "Pepper "
+        await release.wait()
+        yield "needs shade."
+    monkeypatch.setattr(granite, "_request_generation_stream", upstream)
+
+    async def run():
+        first = granite.generate_response_stream("how do I grow pepper")
+        assert await first.__anext__() == "Pepper "
+        second = [text async for text in granite.generate_response_stream("how do I grow pepper")]
+        release.set()
+        return second, [text async for text in first]
+
+    second, rest = asyncio.run(run())
+    assert second == [granite.get_fallback_response("how do I grow pepper")]
+    assert rest == ["needs shade."]
+
+
+def test_breaker_times_only_the_first_token(granite, monkeypatch):
+    monkeypatch.setattr(granite.circuit_breaker, "slow_call_seconds", 0.05)
+
+    async def upstream(*args):
+        yield "Pepper "
+        await asyncio.sleep(0.1)
+        yield "needs shade."
+    monkeypatch.setattr(granite, "_request_generation_stream", upstream)
+
+    _consume(granite)
+
+    assert granite.circuit_breaker.get_stats()["slow_calls"] == 0
+
+
+def test_failure_before_the_first_token_falls_back(granite, monkeypatch):
+    async def upstream(*args):
+        raise RuntimeError("upstream down")
+        yield
+    monkeypatch.setattr(granite, "_request_generation_stream", upstream)
+
+    chunks = _consume(granite)
+
+    assert chunks == [granite.get_fallback_response("how do I grow pepper")]
+    assert granite.circuit_breaker.get_stats()["failures"] == 1
+
+
+def test_stream_cut_short_is_not_cached(granite, monkeypatch):
+    async def upstream(*args):
+        yield "Pepper "
+        raise RuntimeError("connection reset")
+    monkeypatch.setattr(granite, "_request_generation_stream", upstream)
+
+    chunks = []
+
+    async def consume():
+        async for text in granite.generate_response_stream("how do I grow pepper"):
+            chunks.append(text)
+
+    with pytest.raises(GraniteUnavailableError):
+        asyncio.run(consume())
+    assert chunks == ["Pepper "]
+    assert granite.circuit_breaker.get_stats()["failures"] == 1
+    assert granite.circuit_breaker.get_stats()["successes"] == 0
+    cache_key = granite._cache_key("how do I grow pepper")
+    assert asyncio.run(granite.response_cache.get(cache_key)) is None
+
+
+@pytest.fixture
+def iam(monkeypatch):
+    """IAM token endpoint served by an httpx mock transport; returns the request log"""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"access_token": f"token-{len(requests)}", "expires_in": 3600})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_clients, "get", lambda name: client)
+    return requests
+
+
+def _token_manager(margin=60, window=600):
+    return IAMTokenManager("key", refresh_margin=margin, background_refresh_window=window)
+
+
+def test_concurrent_callers_share_one_token_refresh(iam):
+    manager = _token_manager()
+
+    async def run():
+        return await asyncio.gather(*(manager.get_token() for _ in range(10)))
+
+    assert asyncio.run(run()) == ["token-1"] * 10
+    assert len(iam) == 1
+    assert manager.get_stats()["refreshes"] == 1
+
+
+def test_fresh_token_is_served_from_cache(iam):
+    manager = _token_manager()
+
+    async def run():
+        return [await manager.get_token() for _ in range(3)]
+
+    assert asyncio.run(run()) == ["token-1"] * 3
+    assert manager.get_stats()["hits"] == 2
+
+
+def test_token_near_expiry_is_served_while_refreshing_in_background(iam):
+    # The whole lifetime is inside the background window, so every hit refreshes
+    manager = _token_manager(margin=60, window=3600)
+
+    async def run():
+        await manager.get_token()
+        served = await manager.get_token()
+        await manager._refresh_task
+        return served
+
+    assert asyncio.run(run()) == "token-1"
+    assert manager._token == "token-2"
+    assert manager.get_stats()["background_refreshes"] == 1
+    assert len(iam) == 2
+
+
+def test_invalidated_token_is_refetched(iam):
+    manager = _token_manager()
+
+    async def run():
+        await manager.get_token()
+        manager.invalidate()
+        return await manager.get_token()
+
+    assert asyncio.run(run()) == "token-2"
+
+
+def test_failed_refresh_raises_and_is_counted(monkeypatch):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(400, text="bad key")))
+    monkeypatch.setattr(http_clients, "get", lambda name: client)
+    manager = _token_manager()
+
+    with pytest.raises(Exception, match="bad key"):
+        asyncio.run(manager.get_token())
+    assert manager.get_stats()["failures"] == 1
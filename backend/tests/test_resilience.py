@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from app.core import resilience
+from app.core.resilience import CircuitBreaker, ConcurrencyLimiter, QueueTimeoutError, SingleFlight
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_on_failure_rate(clock):
+    breaker = CircuitBreaker("test", min_calls=4, failure_rate_threshold=0.5, open_seconds=30)
+    for failed in (False, True, False, True):
+        breaker.record_failure(0.1) if failed else breaker.record_success(0.1)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+
+
+def test_breaker_opens_on_slow_calls(clock):
+    breaker = CircuitBreaker("test", min_calls=3, slow_call_seconds=5, slow_call_rate_threshold=0.5)
+    for duration in (6, 6, 1):
+        breaker.record_success(duration)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_stays_closed_below_min_calls(clock):
+    breaker = CircuitBreaker("test", min_calls=5)
+    for _ in range(4):
+        breaker.record_failure(0.1)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=30)
+    breaker.record_failure(0.1)
+    clock[0] += 31
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()  # one probe at a time
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock[0] += 31
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_lost_probe_does_not_wedge_the_circuit(clock):
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=30)
+    breaker.record_failure(0.1)
+    clock[0] += 31
+    assert breaker.allow_request()  # probe that never reports back
+
+    clock[0] += 30
+    assert breaker.allow_request()
+
+
+def test_limiter_bounds_in_flight_calls():
+    limiter = ConcurrencyLimiter("test", max_concurrent=2, max_queue=10, max_queue_wait=1)
+    peak = [0]
+
+    async def call():
+        async with limiter.acquire():
+            peak[0] = max(peak[0], limiter.get_stats()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak[0] == 2
+    assert limiter.get_stats()["acquired"] == 6
+
+
+def test_limiter_rejects_when_the_queue_is_full():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=1, max_queue_wait=1)
+
+    async def hold():
+        async with limiter.acquire():
+            await asyncio.sleep(0.05)
+
+    async def run():
+        holding = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        results = await asyncio.gather(hold(), hold(), return_exceptions=True)
+        await holding
+        return [type(result) for result in results]
+
+    assert asyncio.run(run()).count(QueueTimeoutError) == 1
+    assert limiter.get_stats()["rejected"] == 1
+
+
+def test_limiter_times_out_waiting_for_a_slot():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=5, max_queue_wait=0.01)
+
+    async def hold():
+        async with limiter.acquire():
+            await asyncio.sleep(0.1)
+
+    async def run():
+        return await asyncio.gather(hold(), hold(), return_exceptions=True)
+
+    assert isinstance(asyncio.run(run())[1], QueueTimeoutError)
+    assert limiter.get_stats()["timed_out"] == 1
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "payload"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["payload"] * 5
+    assert len(calls) == 1
+    assert flight.get_stats() == {"calls": 1, "shared": 4, "in_flight": 0}
+
+
+def test_single_flight_shares_the_exception_and_then_retries():
+    flight = SingleFlight("test")
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "payload"
+
+    async def run():
+        first = await asyncio.gather(flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True)
+        return first, await flight.do("key", fetch)
+
+    first, retry = asyncio.run(run())
+    assert [type(result) for result in first] == [RuntimeError, RuntimeError]
+    assert retry == "payload"
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "payload"
+
+    async def run():
+        impatient = asyncio.ensure_future(flight.do("key", fetch))
+        patient = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.005)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "payload"
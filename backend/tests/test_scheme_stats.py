@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime
+
+from app.services import scheme_stats
+
+
+async def _counters(mongo):
+    return {
+        (c["scheme_id"], c["month"], c["status"]): c["count"]
+        async for c in mongo.scheme_application_stats.find({})
+    }
+
+
+def test_month_bucket():
+    assert scheme_stats.month_bucket(datetime(2024, 3, 9, 23, 59)) == "2024-03"
+
+
+def test_record_increments_and_moves_counts(mongo):
+    async def scenario():
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "pending")
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "pending")
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "pending", -1)
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "approved", 1)
+        return await _counters(mongo)
+
+    assert asyncio.run(scenario()) == {
+        ("pm-kisan", "2024-03", "pending"): 1,
+        ("pm-kisan", "2024-03", "approved"): 1,
+    }
+
+
+def test_reconcile_heals_drift(mongo):
+    async def scenario():
+        await mongo.scheme_applications.insert_many([
+            {"scheme_id": "pm-kisan", "month_bucket": "2024-03", "status": "pending"},
+            {"scheme_id": "pm-kisan", "month_bucket": "2024-03", "status": "approved"},
+            {"scheme_id": "kisan-credit", "month_bucket": "2024-04", "status": "pending"},
+        ])
+        # A lost record() and a crash between the two writes of a status change
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "pending", 2)
+        corrected = await scheme_stats.reconcile(mongo)
+        return corrected, await _counters(mongo), await scheme_stats.reconcile(mongo)
+
+    corrected, counters, second_pass = asyncio.run(scenario())
+    assert corrected == 3
+    assert counters == {
+        ("pm-kisan", "2024-03", "pending"): 1,
+        ("pm-kisan", "2024-03", "approved"): 1,
+        ("kisan-credit", "2024-04", "pending"): 1,
+    }
+    assert second_pass == 0
+
+
+def test_reconcile_drops_emptied_counters(mongo):
+    async def scenario():
+        await scheme_stats.record(mongo, "pm-kisan", "2024-03", "rejected")
+        await scheme_stats.reconcile(mongo)
+        return await _counters(mongo)
+
+    assert asyncio.run(scenario()) == {}
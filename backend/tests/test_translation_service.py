@@ -0,0 +1,78 @@
+import asyncio
+
+from botocore.exceptions import ClientError
+
+from app.services.translation_service import TranslationService
+from benchmarks import translation_offload as benchmark
+
+
+class FakeTranslateClient:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def translate_text(self, Text, SourceLanguageCode, TargetLanguageCode):
+        self.calls.append((Text, SourceLanguageCode, TargetLanguageCode))
+        if self.error:
+            raise self.error
+        return {"TranslatedText": f"[{TargetLanguageCode}] {Text}"}
+
+
+def _service(client):
+    service = TranslationService()
+    service.translate_client = client
+    return service
+
+
+def _translate(service, *calls):
+    async def run():
+        return [await service.translate_text(*call) for call in calls]
+    return asyncio.run(run())
+
+
+def test_repeated_translations_are_served_from_cache(app_db):
+    client = FakeTranslateClient()
+    service = _service(client)
+
+    results = _translate(service, ("Water daily", "en", "ml"), ("Water daily", "en", "ml"))
+
+    assert results == ["[ml] Water daily"] * 2
+    assert len(client.calls) == 1
+    # A fresh process reads the shared MongoDB tier
+    assert _translate(_service(client), ("Water daily", "en", "ml")) == ["[ml] Water daily"]
+    assert len(client.calls) == 1
+
+
+def test_cache_is_keyed_on_direction():
+    client = FakeTranslateClient()
+    service = _service(client)
+
+    _translate(service, ("Water daily", "en", "ml"), ("Water daily", "ml", "en"))
+
+    assert len(client.calls) == 2
+
+
+def test_same_language_is_not_translated():
+    client = FakeTranslateClient()
+
+    assert _translate(_service(client), ("Water daily", "en", "en")) == ["Water daily"]
+    assert client.calls == []
+
+
+def test_failed_translation_returns_the_text_uncached():
+    error = ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "TranslateText")
+    client = FakeTranslateClient(error)
+    service = _service(client)
+
+    assert _translate(service, ("Water daily", "en", "ml"), ("Water daily", "en", "ml")) == ["Water daily"] * 2
+    assert len(client.calls) == 2
+
+
+def test_slow_translations_do_not_hold_up_other_requests():
+    result = benchmark.run(translations=4, delay=0.05, weather_requests=5, upstream_seconds=0.005)
+
+    # Inline, every weather request waits out all four blocking calls
+    assert result["inline"]["weather_max_ms"] >= 4 * 50
+    assert result["thread_pool"]["weather_max_ms"] < result["no_translations"]["weather_max_ms"] + 50
+    assert {mode["weather_upstream_calls"] for mode in result.values()} == {5}
+    assert result["thread_pool"]["translations_ms"] < 4 * 50
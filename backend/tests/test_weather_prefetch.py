@@ -0,0 +1,61 @@
+import asyncio
+
+from app.core import resilience
+from app.core.resilience import RateLimiter
+from app.services import weather_prefetch
+from app.services.weather_prefetch import WeatherPrefetcher, farm_coordinates
+
+
+def test_farm_coordinates_accept_either_spelling():
+    assert farm_coordinates({"coordinates": {"latitude": "10.5", "longitude": 76.2}}) == (10.5, 76.2)
+    assert farm_coordinates({"coordinates": {"lat": 10.5, "lng": 76.2}}) == (10.5, 76.2)
+    assert farm_coordinates({"location": "Thrissur"}) == (None, None)
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    now = [100.0]
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(resilience.asyncio, "sleep", sleep)
+    limiter = RateLimiter("test", per_minute=60)
+
+    async def run():
+        for _ in range(3):
+            await limiter.wait()
+
+    asyncio.run(run())
+    assert delays == [1.0, 2.0]
+    assert limiter.get_stats() == {"calls": 3, "delayed": 2, "per_minute": 60.0}
+
+
+def test_prefetch_refreshes_each_snapped_location_once(app_db, monkeypatch):
+    refreshed = []
+
+    async def refresh_snapshot(location, lat, lon):
+        refreshed.append((location, lat, lon))
+        return location != "Palakkad"
+    monkeypatch.setattr(weather_prefetch.weather_service, "refresh_snapshot", refresh_snapshot)
+    prefetcher = WeatherPrefetcher()
+    prefetcher.rate_limiter = RateLimiter("test", per_minute=60_000)
+
+    async def run():
+        await app_db.farms.insert_many([
+            {"is_active": True, "location": "Thrissur"},
+            {"is_active": True, "location": " thrissur "},
+            {"is_active": True, "location": "Palakkad"},
+            {"is_active": True, "coordinates": {"lat": 10.51, "lon": 76.21}},
+            {"is_active": True, "coordinates": {"lat": 10.52, "lon": 76.22}},
+            {"is_active": False, "location": "Kollam"},
+            {"is_active": True},
+        ])
+        await prefetcher.run_once()
+
+    asyncio.run(run())
+    assert sorted(str(item) for item in refreshed) == sorted(
+        str(item) for item in [("Thrissur", None, None), ("Palakkad", None, None), (None, 10.51, 76.21)]
+    )
+    stats = prefetcher.get_stats()
+    assert (stats["locations"], stats["refreshed"], stats["failed"]) == (3, 2, 1)
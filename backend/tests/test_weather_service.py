@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.services.http_client import http_clients
+from app.services.weather_service import WeatherService
+from benchmarks import forecast_aggregation as forecast_benchmark
+
+
+def _service(monkeypatch):
+    service = WeatherService()
+    calls = []
+
+    async def upstream(kind, cache_key, params):
+        calls.append(cache_key)
+        return {"source": "upstream", "kind": kind}
+
+    monkeypatch.setattr(service, "_fetch_upstream", upstream)
+    return service, calls
+
+
+async def _snapshot(mongo, key, age_seconds):
+    await mongo.weather_snapshots.insert_one({
+        "_id": key,
+        "current": {"source": "snapshot", "kind": "current"},
+        "forecast": {"source": "snapshot", "kind": "forecast"},
+        "refreshed_at": datetime.utcnow() - timedelta(seconds=age_seconds)
+    })
+
+
+def test_nearby_coordinates_share_a_cache_key():
+    service = WeatherService()
+    key_a, params = service.resolve_location(lat=10.5276, lon=76.2144)
+    key_b, _ = service.resolve_location(location="10.5301,76.2101")
+    assert key_a == key_b
+    assert params == {"lat": 10.55, "lon": 76.2}
+
+
+def test_place_names_are_case_folded():
+    service = WeatherService()
+    assert service.resolve_location("Thrissur")[0] == service.resolve_location(" thrissur ")[0]
+
+
+def test_stale_current_snapshot_falls_through_to_upstream(app_db, monkeypatch):
+    service, calls = _service(monkeypatch)
+
+    async def scenario():
+        key, params = service.resolve_location(lat=10.5, lon=76.2)
+        await _snapshot(app_db, key, age_seconds=service.ttls["current"] + 60)
+        current = await service._fetch("current", key, params)
+        forecast = await service._fetch("forecast", key, params)
+        return current, forecast
+
+    current, forecast = asyncio.run(scenario())
+    assert current["source"] == "upstream"
+    assert forecast["source"] == "snapshot"
+    assert len(calls) == 1
+
+
+def test_fresh_snapshot_serves_both_kinds(app_db, monkeypatch):
+    service, calls = _service(monkeypatch)
+
+    async def scenario():
+        key, params = service.resolve_location(lat=10.5, lon=76.2)
+        await _snapshot(app_db, key, age_seconds=60)
+        return [await service._fetch(kind, key, params) for kind in ("current", "forecast")]
+
+    assert [payload["source"] for payload in asyncio.run(scenario())] == ["snapshot", "snapshot"]
+    assert calls == []
+
+
+def test_get_snapshot_drops_stale_current(app_db):
+    service = WeatherService()
+
+    async def scenario():
+        key, _ = service.resolve_location(lat=10.5, lon=76.2)
+        await _snapshot(app_db, key, age_seconds=service.ttls["current"] + 60)
+        return await service.get_snapshot(lat=10.5, lon=76.2)
+
+    snapshot = asyncio.run(scenario())
+    assert "current" not in snapshot
+    assert snapshot["forecast"]["source"] == "snapshot"
+
+
+def test_batch_aggregation_matches_the_per_location_formatter():
+    result = forecast_benchmark.run(locations=25, repeat=1)
+
+    assert result["identical"]
+
+
+def test_batch_aggregation_keeps_locations_without_items():
+    payloads = forecast_benchmark.make_payloads(locations=2)
+    payloads.insert(1, {"city": {"name": "Empty"}, "list": []})
+
+    results = WeatherService()._aggregate_forecasts(payloads)
+
+    assert [result["location"] for result in results] == ["Location 0", "Empty", "Location 1"]
+    assert results[1]["forecast"] == []
+    assert results[2] == forecast_benchmark.per_location(payloads[2])
+
+
+def test_concurrent_misses_share_one_upstream_call(monkeypatch):
+    service = WeatherService()
+    calls = []
+
+    async def upstream(kind, cache_key, params):
+        calls.append(cache_key)
+        await asyncio.sleep(0.01)
+        return {"source": "upstream"}
+    monkeypatch.setattr(service, "_fetch_upstream", upstream)
+
+    async def run():
+        key, params = service.resolve_location(lat=10.51, lon=76.21)
+        nearby_key, _ = service.resolve_location(lat=10.52, lon=76.22)
+        return await asyncio.gather(*(service._fetch("forecast", k, params) for k in [key] * 3 + [nearby_key] * 3))
+
+    assert asyncio.run(run()) == [{"source": "upstream"}] * 6
+    assert len(calls) == 1
+
+
+def test_upstream_payload_is_cached_per_kind(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"path": request.url.path})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_clients, "get", lambda name: client)
+    service = WeatherService()
+
+    async def run():
+        key, params = service.resolve_location("Thrissur")
+        for kind in ("current", "forecast", "current", "forecast"):
+            await service._fetch(kind, key, params)
+
+    asyncio.run(run())
+    assert requests == ["/data/2.5/weather", "/data/2.5/forecast"]